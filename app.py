@@ -4,21 +4,49 @@ Current stage: base app imported from interview simulator.
 We are only re-skinning UI text in this step (no logic changes yet).
 """
 
+import concurrent.futures
+import functools
 import os
-import re
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 import streamlit as st
-from openai import OpenAI
-from streamlit_js_eval import streamlit_js_eval
-# Optional local dev: load .env if python-dotenv is installed.
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
-except Exception:
-    pass
 
+import context_window
+import response_cache
 import session_store
+import srd_bundle
 import srd_client
+import srd_compliance
+import srd_vocab
+import stream_render
+import turn_metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# Cold start: openai (~0.6 s), streamlit_js_eval, python-dotenv and srd_relevance (numpy) are
+# imported on first use, not here; Streamlit containers scale to zero and pay this on every start.
+
+
+@functools.lru_cache(maxsize=1)
+def load_local_env() -> bool:
+    """Optional local dev: load .env once if python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv  # type: ignore
+    except Exception:
+        return False
+    load_dotenv()
+    return True
+
+
+def streamlit_js_eval(**kwargs):
+    """streamlit_js_eval, imported on first call."""
+    from streamlit_js_eval import streamlit_js_eval as js_eval
+
+    return js_eval(**kwargs)
 
 
 # ---------- Secrets & client setup (unified) ----------
@@ -42,12 +70,35 @@ def get_required_secret(name: str) -> str:
 
 
 @st.cache_resource(show_spinner=False)
-def get_openai_client() -> OpenAI:
-    """Create and cache the OpenAI client using the resolved API key."""
+def get_openai_client() -> "OpenAI":
+    """Create and cache the OpenAI client using the resolved API key (first chat turn, not startup)."""
+    from openai import OpenAI
+
     api_key = get_required_secret("OPENAI_API_KEY")
     return OpenAI(api_key=api_key)
 
 
+@st.cache_resource(show_spinner=False)
+def activate_srd_bundle(srd_base: str) -> str:
+    """Install the offline SRD bundle once per process (version-checked against /meta when reachable)."""
+    _, status = srd_bundle.activate_bundle(srd_base)
+    return status
+
+
+@st.cache_resource(show_spinner=False)
+def start_srd_warm_up(srd_base: str) -> threading.Thread:
+    """Fill the SRD class cache from /meta once per process, in the background (never blocks a render)."""
+    thread = threading.Thread(target=srd_client.warm_up, args=(srd_base,), name="srd-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache() -> response_cache.ResponseCache:
+    """Process-wide draft cache on local disk (DND_RESPONSE_CACHE_DIR)."""
+    return response_cache.ResponseCache()
+
+
 def should_append_assistant_message(text: str) -> bool:
     """Rule: never append empty assistant messages to history."""
     return bool(text.strip())
@@ -56,7 +107,9 @@ def should_append_assistant_message(text: str) -> bool:
 # NOTE (docs-only):
 # - This function defines the SRD-only + Homebrew-toggle contract enforced by tests.
 # - Keep SRD-only rules and the HB ON/OFF behavior consistent with docs/ai-guardrails.md.
-# - The app rebuilds this prompt on start, on load, and on every rerun when constraints change.
+# - The app rebuilds this prompt on start, on load, and on every rerun when constraints change;
+#   it is memoized by (build_level, homebrew), so reruns return the cached string.
+@functools.lru_cache(maxsize=64)
 def build_system_prompt(build_level: int, homebrew: bool) -> str:
     """Build the system prompt (pure function; safe to unit-test)."""
     return (
@@ -100,61 +153,226 @@ def get_optional_setting(name: str, default: str = "") -> str:
         return default
 
 
-def build_grounded_srd_block(class_payload: dict, target_level: int) -> str:
+_N = TypeVar("_N", int, float)
+
+
+def get_number_setting(name: str, default: _N, parse: Callable[[str], _N]) -> _N:
+    """Return optional numeric setting; a malformed value is reported with st.warning and ignored."""
+    raw = get_optional_setting(name, default="").strip()
+    if not raw:
+        return default
+    try:
+        return parse(raw)
+    except ValueError:
+        st.warning(f"Ignoring {name}={raw!r}: not a number. Using the default ({default}).")
+        return default
+
+
+DEFAULT_GROUNDING_DEADLINE_S = 1.0
+# Most classes grounded for one prompt (ranked by srd_vocab).
+MAX_GROUNDED_CLASSES = 3
+# Token budget for the feature list of a concept-ranked grounding block.
+GROUNDING_FEATURE_TOKEN_BUDGET = 160
+
+# Memoized grounding blocks: one precomputed table per class payload (keyed by content digest).
+_GROUNDING_TABLES_MAX = 32
+# Concept-ranked blocks kept per table, keyed by (level, normalized concept).
+_CONCEPT_BLOCKS_MAX = 64
+_MAX_LEVEL = 20
+_grounding_tables: "OrderedDict[str, _ClassGrounding]" = OrderedDict()
+_grounding_lock = threading.Lock()
+
+
+class _ClassGrounding:
+    """Grounding block parts for one class payload, with feature lines precomputed per level.
+
+    The header/footer lines are formatted once and `by_level[L]` holds the (capped) feature
+    list for target level L, so each level lookup is O(1); finished blocks are memoized.
+    With a concept, features and proficiencies are instead ranked by BM25 relevance
+    (srd_relevance; the indexes are built on first use and kept with the table).
+    """
+
+    def __init__(self, class_payload: dict) -> None:
+        name = class_payload.get("name", "Unknown")
+        hit_die = class_payload.get("hit_die", None)
+        primary = class_payload.get("primary_abilities", [])
+        saves = class_payload.get("saving_throw_proficiencies", [])
+        profs = class_payload.get("proficiencies", [])
+
+        lines = [
+            "Grounded SRD Facts (from SRD grounding service):",
+            f"- Class: {name}",
+        ]
+        if isinstance(hit_die, int):
+            lines.append(f"- Hit Die: d{hit_die}")
+        if isinstance(primary, list) and primary:
+            lines.append(f"- Primary abilities: {', '.join(str(x) for x in primary)}")
+        if isinstance(saves, list) and saves:
+            lines.append(f"- Saving throw proficiencies: {', '.join(str(x) for x in saves)}")
+        self.head = lines
+        self.profs = [str(x) for x in profs] if isinstance(profs, list) else []
+
+        # features_by_level is a list like: [{"level": 1, "features": [{"name": "...", ...}, ...]}, ...]
+        self.features = []
+        self.feature_docs = []
+        for entry in class_payload.get("features_by_level", []) or []:
+            lvl = entry.get("level")
+            if isinstance(lvl, int):
+                for f in entry.get("features", []) or []:
+                    fname = f.get("name")
+                    if isinstance(fname, str) and fname.strip():
+                        self.features.append((lvl, f"Level {lvl}: {fname.strip()}"))
+                        desc = f.get("desc", "")
+                        if isinstance(desc, list):
+                            desc = " ".join(str(d) for d in desc)
+                        self.feature_docs.append(f"{fname.strip()} {fname.strip()} {desc}")
+        self.by_level = [self._features_up_to(level) for level in range(_MAX_LEVEL + 1)]
+        self._blocks: dict = {}
+        self._concept_blocks: "OrderedDict[tuple, str]" = OrderedDict()
+        self._feature_index = None
+        self._prof_index = None
+
+    def _features_up_to(self, target_level: int) -> list:
+        return [line for lvl, line in self.features if lvl <= target_level][:20]  # cap for token safety
+
+    def _relevant_features(self, target_level: int, concept: str) -> list:
+        """Eligible features, most relevant first, within GROUNDING_FEATURE_TOKEN_BUDGET (shown in level order)."""
+        if self._feature_index is None:
+            import srd_relevance
+
+            self._feature_index = srd_relevance.BM25Index(self.feature_docs)
+        eligible = [i for i, (lvl, _) in enumerate(self.features) if lvl <= target_level]
+        budget = GROUNDING_FEATURE_TOKEN_BUDGET
+        chosen = []
+        for i in self._feature_index.rank(concept, eligible):
+            cost = context_window.count_tokens(self.features[i][1]) + 2
+            if cost <= budget:
+                chosen.append(i)
+                budget -= cost
+        return [self.features[i][1] for i in sorted(chosen)]
+
+    def _relevant_profs(self, concept: str) -> list:
+        if self._prof_index is None:
+            import srd_relevance
+
+            self._prof_index = srd_relevance.BM25Index(self.profs)
+        return [self.profs[i] for i in sorted(self._prof_index.rank(concept, range(len(self.profs)))[:6])]
+
+    def block(self, target_level: int, concept: str = "") -> str:
+        concept = concept.strip()
+        if not concept:
+            text = self._blocks.get(target_level)
+            if text is not None:
+                return text
+        else:
+            # Relevance ranking only sees lower-cased tokens, so case and spacing do not matter.
+            concept_key = (target_level, " ".join(concept.lower().split()))
+            with _grounding_lock:
+                text = self._concept_blocks.get(concept_key)
+                if text is not None:
+                    self._concept_blocks.move_to_end(concept_key)
+                    return text
+        if concept:
+            feats = self._relevant_features(target_level, concept)
+            profs = self._relevant_profs(concept)
+        else:
+            feats = self.by_level[target_level] if 0 <= target_level <= _MAX_LEVEL else self._features_up_to(target_level)
+            profs = self.profs[:6]
+
+        lines = list(self.head)
+        if profs:
+            # keep short
+            lines.append(f"- Proficiencies (summary): {', '.join(profs)}")
+        if feats:
+            lines.append("- Features (names up to target level):")
+            lines.extend([f"  - {x}" for x in feats])
+        else:
+            lines.append("- Features: (not available from grounding payload)")
+
+        lines.append(
+            "Rule: Treat the Grounded SRD Facts above as authoritative SRD truth. "
+            "If a detail is not present above, do NOT assert it as SRD and do NOT provide mechanics/rules text; "
+            "either omit it or say 'SRD limitation'."
+        )
+        lines.append(
+            "Additional rule: Do NOT name subclasses/archetypes/traditions and do NOT list spells unless they are explicitly present in the grounded payload above; "
+            "otherwise write 'SRD limitation'. (Spells are not provided by the grounding service in this version.)"
+        )
+        lines.append(
+            "Spells: SRD limitation (spells not available from grounding service). "
+            "Do not name spells or spell categories; keep spell discussion generic."
+        )
+        lines.append('Spells: If not grounded, output section (4) exactly as: "SRD limitation (spells not grounded)."')
+        text = "\n".join(lines)
+        if not concept and 0 <= target_level <= _MAX_LEVEL:
+            self._blocks[target_level] = text
+        elif concept:
+            with _grounding_lock:
+                self._concept_blocks[concept_key] = text
+                while len(self._concept_blocks) > _CONCEPT_BLOCKS_MAX:
+                    self._concept_blocks.popitem(last=False)
+        return text
+
+
+def _class_grounding(class_payload: dict) -> _ClassGrounding:
+    """Precomputed grounding table for this payload's content (bounded LRU).
+
+    Keyed by content digest. Payloads from srd_client carry theirs (taken once when the payload
+    was loaded, and read-only after that); any other dict is hashed here on every call.
+    """
+    digest = getattr(class_payload, "digest", None) or srd_client.content_digest(class_payload)
+    with _grounding_lock:
+        table = _grounding_tables.get(digest)
+        if table is None:
+            table = _ClassGrounding(class_payload)
+            _grounding_tables[digest] = table
+        _grounding_tables.move_to_end(digest)
+        while len(_grounding_tables) > _GROUNDING_TABLES_MAX:
+            _grounding_tables.popitem(last=False)
+    return table
+
+
+def grounding_plan(srd_base: str, class_names: list) -> tuple:
+    """(classes to fetch for this turn, whether the SRD service is down), following its circuit breaker.
+
+    Open: fetch nothing instead of waiting on a failing service. Half-open: classes already in
+    the SRD cache are still served, but of the others only the top-ranked one is fetched (the
+    breaker's single probe); turns fan out again once it closes.
+    """
+    if not srd_base or srd_client.active_bundle() is not None:
+        return class_names, False
+    state = srd_client.breaker_state(srd_base)
+    if state == "open":
+        return [], True
+    if state == "half_open":
+        uncached = [n for n in class_names if not srd_client.class_cached(srd_base, n)]
+        return [n for n in class_names if n not in uncached[1:]], False
+    return class_names, False
+
+
+def grounded_names(grounded: dict) -> frozenset:
+    """Class and feature names from this turn's grounding payloads (allowlist for the SRD output check)."""
+    names = set()
+    for class_payload, err in grounded.values():
+        if not class_payload or err:
+            continue
+        names.add(str(class_payload.get("name", "")))
+        for entry in class_payload.get("features_by_level", []) or []:
+            for f in entry.get("features", []) or []:
+                if isinstance(f, dict) and isinstance(f.get("name"), str):
+                    names.add(f["name"].strip())
+    names.discard("")
+    return frozenset(names)
+
+
+def build_grounded_srd_block(class_payload: dict, target_level: int, concept: str = "") -> str:
     """
     Build a short, SRD-safe grounding block from the SRD API class payload.
     Keep this concise: names + brief descriptors only (no long rules text).
+    Memoized by payload content hash and target level. With a `concept`, the features and
+    proficiencies most relevant to it are sent (up to a token budget) instead of the first ones.
     """
-    name = class_payload.get("name", "Unknown")
-    hit_die = class_payload.get("hit_die", None)
-    primary = class_payload.get("primary_abilities", [])
-    saves = class_payload.get("saving_throw_proficiencies", [])
-    profs = class_payload.get("proficiencies", [])
-
-    # features_by_level is a list like: [{"level": 1, "features": [{"name": "...", ...}, ...]}, ...]
-    feats = []
-    for entry in class_payload.get("features_by_level", []) or []:
-        lvl = entry.get("level")
-        if isinstance(lvl, int) and lvl <= int(target_level):
-            for f in entry.get("features", []) or []:
-                fname = f.get("name")
-                if isinstance(fname, str) and fname.strip():
-                    feats.append(f"Level {lvl}: {fname.strip()}")
-
-    lines = [
-        "Grounded SRD Facts (from SRD grounding service):",
-        f"- Class: {name}",
-    ]
-    if isinstance(hit_die, int):
-        lines.append(f"- Hit Die: d{hit_die}")
-    if isinstance(primary, list) and primary:
-        lines.append(f"- Primary abilities: {', '.join(str(x) for x in primary)}")
-    if isinstance(saves, list) and saves:
-        lines.append(f"- Saving throw proficiencies: {', '.join(str(x) for x in saves)}")
-    if isinstance(profs, list) and profs:
-        # keep short
-        lines.append(f"- Proficiencies (summary): {', '.join(str(x) for x in profs[:6])}")
-    if feats:
-        lines.append("- Features (names up to target level):")
-        lines.extend([f"  - {x}" for x in feats[:20]])  # cap for token safety
-    else:
-        lines.append("- Features: (not available from grounding payload)")
-
-    lines.append(
-        "Rule: Treat the Grounded SRD Facts above as authoritative SRD truth. "
-        "If a detail is not present above, do NOT assert it as SRD and do NOT provide mechanics/rules text; "
-        "either omit it or say 'SRD limitation'."
-    )
-    lines.append(
-        "Additional rule: Do NOT name subclasses/archetypes/traditions and do NOT list spells unless they are explicitly present in the grounded payload above; "
-        "otherwise write 'SRD limitation'. (Spells are not provided by the grounding service in this version.)"
-    )
-    lines.append(
-        "Spells: SRD limitation (spells not available from grounding service). "
-        "Do not name spells or spell categories; keep spell discussion generic."
-    )
-    lines.append('Spells: If not grounded, output section (4) exactly as: "SRD limitation (spells not grounded)."')
-    return "\n".join(lines)
+    return _class_grounding(class_payload).block(int(target_level), concept)
 
 
 def main() -> None:
@@ -164,7 +382,36 @@ def main() -> None:
     st.title("🧙 D&D Concept-to-Build")
     st.caption("RP-first concept → build draft (base app imported; re-skin step).")
 
-    client = get_openai_client()
+    load_local_env()
+    # Fail early on a missing key; the client itself is created on the first chat turn.
+    get_required_secret("OPENAI_API_KEY")
+
+    # Optional SRD grounding service (local/dev): set SRD_API_BASE_URL to enable.
+    # An offline bundle (srd_bundle.py) serves grounding without network I/O when present.
+    srd_base = get_optional_setting("SRD_API_BASE_URL", default="").strip()
+    srd_bundle_status = activate_srd_bundle(srd_base)
+    if srd_base and srd_client.active_bundle() is None:
+        start_srd_warm_up(srd_base)
+
+    # SRD names for class detection and the class pickers (bundle, /meta, or the shipped four; cached).
+    srd_vocabulary = srd_vocab.get_vocabulary(srd_base)
+    class_options = ["(auto)"] + [name.title() for name in srd_vocabulary.class_names]
+
+    def class_option_index(hint: str) -> int:
+        return class_options.index(hint) if hint in class_options else 0
+
+    # Streaming output check for non-SRD names: "flag" (default), "cut" or "off".
+    compliance_mode = srd_compliance.get_mode(get_optional_setting("DND_SRD_COMPLIANCE", default=""))
+
+    # Per-turn timing spans (DND_METRICS): "off" (default), "file" (JSONL) or "panel" (+ sidebar).
+    metrics_mode = turn_metrics.get_mode()
+
+    # Longest a chat turn waits for SRD grounding before answering ungrounded.
+    grounding_deadline_s = get_number_setting("SRD_GROUNDING_DEADLINE_S", DEFAULT_GROUNDING_DEADLINE_S, float)
+
+    # Prompt token budget per request (history beyond it is summarized).
+    context_budget = get_number_setting("DND_CONTEXT_TOKEN_BUDGET", context_window.DEFAULT_TOKEN_BUDGET, int)
+    context_keep_turns = get_number_setting("DND_CONTEXT_KEEP_TURNS", context_window.DEFAULT_KEEP_TURNS, int)
 
     # ---------- Session state ----------
     defaults = {
@@ -187,6 +434,11 @@ def main() -> None:
         "session_title": "",
         "build_versions": [],
         "class_hint": "(auto)",
+        # Lazy loading: older turns/versions of a loaded session still on disk (None = all in memory)
+        "history_cursor": None,
+        # Context window: rolling summary of older turns + last request's token stats
+        "context_summary": None,
+        "context_stats": None,
     }
     for k, v in defaults.items():
         if k not in st.session_state:
@@ -234,6 +486,9 @@ def main() -> None:
             loaded_messages[0]["content"] = system_prompt
 
         st.session_state["messages"] = loaded_messages
+        st.session_state["history_cursor"] = pending.get("_history_cursor")
+        st.session_state["context_summary"] = None
+        st.session_state["context_stats"] = None
         st.session_state["setup_complete"] = True
         st.session_state["chat_complete"] = False
         st.session_state["stop_requested"] = False
@@ -262,6 +517,48 @@ def main() -> None:
         st.session_state.build_versions = []
         st.session_state.session_title = ""
         st.session_state.session_id = session_store.new_session_id()
+        st.session_state.history_cursor = None
+        st.session_state.context_summary = None
+        st.session_state.context_stats = None
+
+    def load_earlier_turns() -> None:
+        """Page the previous turns/versions of a lazily loaded session into memory."""
+        cursor = st.session_state.get("history_cursor")
+        if cursor is None:
+            return
+        page = session_store.load_session_page(st.session_state["session_id"], cursor=cursor)
+        messages = st.session_state.messages
+        st.session_state.messages = messages[:1] + page.messages + messages[1:]
+        st.session_state.build_versions = page.versions + st.session_state.build_versions
+        st.session_state.history_cursor = page.cursor
+
+    def session_payload() -> dict:
+        """Full payload for saving; older turns not yet paged in are read from the store."""
+        messages = st.session_state.get("messages", [])
+        versions = st.session_state.get("build_versions", [])
+        cursor = st.session_state.get("history_cursor")
+        if cursor is not None:
+            older = session_store.load_session_page(
+                st.session_state["session_id"], turns=None, versions=None, cursor=cursor
+            )
+            messages = messages[:1] + older.messages + messages[1:]
+            versions = older.versions + versions
+            # Indexes as they will be on disk after this save (the system message is always first).
+            st.session_state.history_cursor = session_store.PageCursor(
+                messages_before=1 + len(older.messages), versions_before=len(older.versions)
+            )
+        return {
+            "session_id": st.session_state.get("session_id"),
+            "title": st.session_state.get("session_title", ""),
+            "params": {
+                "build_level": int(st.session_state.get("build_level", 5)),
+                "homebrew": bool(st.session_state.get("homebrew", False)),
+                "openai_model": st.session_state.get("openai_model", ""),
+                "class_hint": st.session_state.get("class_hint", "(auto)"),
+            },
+            "messages": messages,
+            "versions": versions,
+        }
 
     # ---------- Setup stage ----------
     if not st.session_state.setup_complete:
@@ -278,12 +575,19 @@ def main() -> None:
         )
 
         st.caption("Sources: SRD-only (public repo).")
+        if srd_client.active_bundle() is not None:
+            st.caption(srd_bundle_status)
+        elif srd_base and srd_client.breaker_state(srd_base) != "closed":
+            breaker = srd_client.breaker_stats(srd_base)
+            st.caption(
+                "SRD service unavailable: answering ungrounded "
+                f"(circuit {breaker['state'].replace('_', '-')}, {breaker['consecutive_failures']} failed fetches in a row)."
+            )
 
         st.session_state["class_hint"] = st.selectbox(
             "Class (optional, improves SRD grounding)",
-            options=["(auto)", "Barbarian", "Bard", "Fighter", "Wizard"],
-            index=["(auto)", "Barbarian", "Bard", "Fighter", "Wizard"].index(
-                st.session_state.get("class_hint", "(auto)")),
+            options=class_options,
+            index=class_option_index(st.session_state.get("class_hint", "(auto)")),
         )
 
         if st.button("Start Build", on_click=complete_setup):
@@ -304,6 +608,16 @@ def main() -> None:
                 }
             ]
 
+        # A sidebar class hint is known before the prompt: start grounding now (it lands in the SRD cache).
+        hint = str(st.session_state.get("sidebar_class_hint", st.session_state.get("class_hint", "(auto)"))).strip()
+        if srd_base and srd_client.active_bundle() is None and hint != "(auto)":
+            if st.session_state.get("_prefetched_hint") != (hint, srd_base):
+                st.session_state["_prefetched_hint"] = (hint, srd_base)
+                srd_client.prefetch_many(srd_base, [hint.lower()])
+
+        if st.session_state.get("history_cursor") is not None:
+            st.button("⬆ Show earlier turns", on_click=load_earlier_turns, key="load_earlier_btn")
+
         for message in st.session_state.messages:
             if message["role"] != "system":
                 with st.chat_message(message["role"]):
@@ -326,9 +640,8 @@ def main() -> None:
 
             st.session_state["class_hint"] = st.selectbox(
                 "Class (grounding)",
-                options=["(auto)", "Barbarian", "Bard", "Fighter", "Wizard"],
-                index=["(auto)", "Barbarian", "Bard", "Fighter", "Wizard"].index(
-                    st.session_state.get("class_hint", "(auto)")),
+                options=class_options,
+                index=class_option_index(st.session_state.get("class_hint", "(auto)")),
                 key="sidebar_class_hint",
             )
 
@@ -349,6 +662,37 @@ def main() -> None:
                 disabled=st.session_state.get("is_generating", False),
             )
 
+            st.toggle(
+                "Bypass response cache",
+                key="bypass_response_cache",
+                help="Always request a fresh draft, even if an identical request was answered before.",
+            )
+
+            if st.session_state.get("grounding_status") == "late":
+                st.caption(
+                    f"SRD grounding missed the {grounding_deadline_s:.1f}s deadline last turn "
+                    "(answered ungrounded; it will be cached for the next turn)."
+                )
+            elif st.session_state.get("grounding_status") == "unavailable":
+                st.caption("SRD grounding skipped last turn: the SRD service is failing (circuit open).")
+            elif st.session_state.get("grounding_status") == "ok":
+                st.caption(f"SRD grounding wait: {st.session_state.get('grounding_wait_ms', 0.0):.0f} ms")
+
+            context_stats = st.session_state.get("context_stats")
+            if context_stats is not None:
+                st.caption(
+                    f"Last request: {context_stats.sent_tokens} prompt tokens "
+                    f"({context_stats.saved_tokens} saved; {context_stats.summarized_turns} turns summarized)"
+                )
+
+            last_metrics = st.session_state.get("last_turn_metrics")
+            if metrics_mode == "panel" and last_metrics:
+                with st.expander("Turn timings (debug)"):
+                    st.caption(f"{last_metrics['kind']}: {last_metrics['duration_ms']:.0f} ms total")
+                    st.table([{"stage": s["name"], "start ms": s["start_ms"], "ms": s["dur_ms"]} for s in last_metrics["spans"]])
+                    fields = {k: v for k, v in last_metrics.items() if k not in ("ts", "kind", "duration_ms", "spans")}
+                    st.json(fields, expanded=False)
+
             st.markdown("### Persistence")
             st.text_input("Session title", key="session_title")
 
@@ -356,24 +700,14 @@ def main() -> None:
             notice_kind = "success"
 
             if st.button("💾 Save", key="save_session_btn"):
-                payload = {
-                    "session_id": st.session_state.get("session_id"),
-                    "title": st.session_state.get("session_title", ""),
-                    "params": {
-                        "build_level": int(st.session_state.get("build_level", 5)),
-                        "homebrew": bool(st.session_state.get("homebrew", False)),
-                        "openai_model": st.session_state.get("openai_model", ""),
-                        "class_hint": st.session_state.get("class_hint", "(auto)"),
-                    },
-                    "messages": st.session_state.get("messages", []),
-                    "versions": st.session_state.get("build_versions", []),
-                }
+                save_metrics = turn_metrics.begin("save", session_id=st.session_state.get("session_id"))
                 try:
-                    session_store.save_session(payload)
+                    session_store.save_session(session_payload())
                     notice = "Saved ✅"
                 except Exception as e:
                     notice_kind = "error"
                     notice = f"Save failed: {e}"
+                st.session_state["last_turn_metrics"] = turn_metrics.finish(save_metrics) or last_metrics
 
             if st.button("➕ Save version", key="save_version_btn"):
                 version = session_store.create_build_version(
@@ -387,24 +721,14 @@ def main() -> None:
                     notice = "No assistant build draft yet to version."
                 else:
                     st.session_state.build_versions.append(version)
-                    payload = {
-                        "session_id": st.session_state.get("session_id"),
-                        "title": st.session_state.get("session_title", ""),
-                        "params": {
-                            "build_level": int(st.session_state.get("build_level", 5)),
-                            "homebrew": bool(st.session_state.get("homebrew", False)),
-                            "openai_model": st.session_state.get("openai_model", ""),
-                            "class_hint": st.session_state.get("class_hint", "(auto)"),
-                        },
-                        "messages": st.session_state.get("messages", []),
-                        "versions": st.session_state.get("build_versions", []),
-                    }
+                    save_metrics = turn_metrics.begin("save", session_id=st.session_state.get("session_id"))
                     try:
-                        session_store.save_session(payload)
+                        session_store.save_session(session_payload())
                         notice = "Version saved ✅"
                     except Exception as e:
                         notice_kind = "error"
                         notice = f"Save failed: {e}"
+                    st.session_state["last_turn_metrics"] = turn_metrics.finish(save_metrics) or last_metrics
 
             if notice:
                 if notice_kind == "success":
@@ -414,27 +738,38 @@ def main() -> None:
                 else:
                     st.error(notice)
 
-            summaries = session_store.list_sessions()
-            if not summaries:
-                st.caption("No saved sessions yet.")
-            else:
-                options = {}
-                for s in summaries:
-                    label = f"{s.title or s.session_id} • {s.updated_at[:19]}"
-                    options[label] = s.session_id
-
-                selected_label = st.selectbox(
-                    "Load saved session",
-                    options=list(options.keys()),
-                    key="load_session_select",
+            # The store is only listed once the user asks for it, not on every rerun of the chat.
+            if st.toggle("Browse saved sessions", key="browse_sessions"):
+                session_filter = st.text_input(
+                    "Filter saved sessions", key="session_filter", placeholder="title contains…"
                 )
-                if st.button("Load", key="load_session_btn"):
-                    try:
-                        payload = session_store.load_session(options[selected_label])
-                        st.session_state["_pending_load_payload"] = payload
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Load failed: {e}")
+                summaries = session_store.list_sessions(title_contains=session_filter)
+                if not summaries:
+                    st.caption("No saved sessions yet.")
+                else:
+                    options = {}
+                    for s in summaries:
+                        label = f"{s.title or s.session_id} • {s.updated_at[:19]}"
+                        options[label] = s.session_id
+
+                    selected_label = st.selectbox(
+                        "Load saved session",
+                        options=list(options.keys()),
+                        key="load_session_select",
+                    )
+                    if st.button("Load", key="load_session_btn"):
+                        try:
+                            # Only the newest turns/versions are loaded; older ones page in on demand.
+                            page = session_store.load_session_page(options[selected_label])
+                            st.session_state["_pending_load_payload"] = {
+                                **page.meta,
+                                "messages": ([page.system] if page.system else []) + page.messages,
+                                "versions": page.versions,
+                                "_history_cursor": page.cursor,
+                            }
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Load failed: {e}")
 
         # Always refresh the system prompt from current constraints
         if st.session_state.messages and st.session_state.messages[0].get("role") == "system":
@@ -463,60 +798,162 @@ def main() -> None:
             if not st.session_state.get("is_generating", False):
                 if prompt := st.chat_input("Your concept / refinement", max_chars=1000):
                     st.session_state.is_generating = True
+                    # Timing spans for this turn (None and no-op when DND_METRICS is off).
+                    metrics_turn = turn_metrics.begin(
+                        "turn", session_id=st.session_state.get("session_id"), model=st.session_state["openai_model"]
+                    )
                     try:
+                        # Detect the SRD classes named (or implied by feature names) in the user prompt in one
+                        # automaton pass. Multiclass concepts ground the top-ranked classes, fetched concurrently
+                        # on a worker thread that overlaps with rendering and request preparation below.
+                        grounding_started = time.perf_counter()
+                        grounding_future = None
+                        class_names = []
+                        hint = str(st.session_state.get("class_hint", "(auto)")).strip()
+                        if hint and hint != "(auto)":
+                            class_names = [hint.lower()]
+                        else:
+                            class_names = srd_vocabulary.rank_classes(prompt)[:MAX_GROUNDED_CLASSES]
+                        fetch_names, srd_down = grounding_plan(srd_base, class_names)
+                        if (srd_base or srd_client.active_bundle() is not None) and fetch_names:
+                            grounding_future = srd_client.prefetch_many(srd_base, fetch_names)
+
                         st.session_state.messages.append({"role": "user", "content": prompt})
                         with st.chat_message("user"):
                             st.markdown(prompt)
 
                         with st.chat_message("assistant"):
-                            # Optional SRD grounding service (local/dev): set SRD_API_BASE_URL to enable.
-                            srd_base = get_optional_setting("SRD_API_BASE_URL", default="").strip()
-
-                            # Detect one of the shipped SRD classes from the user prompt (minimal, deterministic).
+                            # Wait for grounding only until the deadline; past it the turn goes ungrounded and
+                            # the fetch finishes in the background into the SRD cache for the next turn.
                             grounding_block = ""
-                            class_name = ""
-                            hint = str(st.session_state.get("class_hint", "(auto)")).strip()
-                            if hint and hint != "(auto)":
-                                class_name = hint.lower()
+                            grounding_status = "unavailable" if srd_down and class_names else "none"
+                            grounded = {}
+                            if grounding_future is not None:
+                                remaining = grounding_deadline_s - (time.perf_counter() - grounding_started)
+                                wait_started = time.perf_counter()
+                                with turn_metrics.span("srd.grounding_wait", classes=fetch_names):
+                                    try:
+                                        grounded = grounding_future.result(timeout=max(0.0, remaining))
+                                    except concurrent.futures.TimeoutError:
+                                        grounded = {}
+                                        grounding_status = "late"
+                                    else:
+                                        grounding_status = "ok"
+                                with turn_metrics.span("grounding_block"):
+                                    blocks = []
+                                    for class_payload, err in grounded.values():
+                                        if class_payload and not err:
+                                            blocks.append(build_grounded_srd_block(class_payload, target_level=int(
+                                                st.session_state["build_level"]), concept=prompt))
+                                    grounding_block = "\n\n".join(blocks)
+                                st.session_state["grounding_wait_ms"] = (time.perf_counter() - wait_started) * 1000.0
                             else:
-                                m = re.search(r"\b(barbarian|bard|fighter|wizard)\b", prompt.lower())
-                                if m:
-                                    class_name = m.group(1)
-
-                            if srd_base and class_name:
-                                class_payload, err = srd_client.get_class(srd_base, class_name)
-                                if class_payload and not err:
-                                    grounding_block = build_grounded_srd_block(class_payload, target_level=int(
-                                        st.session_state["build_level"]))
+                                st.session_state["grounding_wait_ms"] = 0.0
+                            st.session_state["grounding_status"] = grounding_status
+                            turn_metrics.set_field("grounding_status", grounding_status)
 
                             # Build messages for the API call: system prompt + optional grounding appended (without mutating stored history).
-                            api_messages = [{"role": mm["role"], "content": mm["content"]} for mm in
-                                            st.session_state.messages]
-                            if api_messages and api_messages[0]["role"] == "system" and grounding_block:
-                                api_messages[0]["content"] = api_messages[0]["content"] + "\n\n" + grounding_block
-
-                            stream = client.chat.completions.create(
-                                model=st.session_state["openai_model"],
-                                messages=api_messages,
-                                stream=True,
+                            # Within the token budget; older turns beyond it are condensed into a cached rolling summary.
+                            with turn_metrics.span("prompt_assembly"):
+                                api_messages, context_stats, st.session_state["context_summary"] = context_window.build_context(
+                                    st.session_state.messages,
+                                    grounding_block=grounding_block,
+                                    budget=context_budget,
+                                    keep_turns=context_keep_turns,
+                                    cache=st.session_state.get("context_summary"),
+                                )
+                            st.session_state["context_stats"] = context_stats
+                            turn_metrics.set_field("prompt_tokens", context_stats.sent_tokens)
+
+                            # Identical inputs (normalized prompt, constraints, prompts, prior turns) reuse a stored draft.
+                            drafts = get_response_cache()
+                            cache_key = response_cache.make_key(
+                                prompt=prompt,
+                                build_level=int(st.session_state["build_level"]),
+                                homebrew=bool(st.session_state["homebrew"]),
+                                class_hint=str(st.session_state.get("class_hint", "(auto)")),
+                                openai_model=st.session_state["openai_model"],
+                                system_prompt=st.session_state.messages[0]["content"],
+                                grounding_block=grounding_block,
+                                history=st.session_state.messages[:-1],
                             )
+                            cached_response = None
+                            if not st.session_state.get("bypass_response_cache", False):
+                                with turn_metrics.span("response_cache.get"):
+                                    cached_response = drafts.get(cache_key)
+                                turn_metrics.count("response_cache.hits" if cached_response is not None else "response_cache.misses")
 
+                            # Re-render at most every 50 ms / 200 chars instead of once per token.
                             placeholder = st.empty()
-                            full_response = ""
-                            for chunk in stream:
-                                if st.session_state.stop_requested:
-                                    break
-                                delta = getattr(chunk.choices[0].delta, "content", None)
-                                if delta:
-                                    full_response += delta
-                                    placeholder.markdown(full_response)
+                            renderer = stream_render.StreamRenderer(placeholder.markdown)
+                            if cached_response is not None:
+                                # Replay the stored draft through the same placeholder.
+                                with turn_metrics.span("response_cache.replay"):
+                                    for start in range(0, len(cached_response), stream_render.DEFAULT_FLUSH_CHARS):
+                                        if st.session_state.stop_requested:
+                                            break
+                                        renderer.feed(cached_response[start:start + stream_render.DEFAULT_FLUSH_CHARS])
+                                    full_response = renderer.flush()
+                            else:
+                                model_started = time.monotonic()
+                                model_first_token = None
+                                stream = get_openai_client().chat.completions.create(
+                                    model=st.session_state["openai_model"],
+                                    messages=api_messages,
+                                    stream=True,
+                                )
+                                # Non-SRD names in the output are checked as it streams (one pass per chunk);
+                                # names inside grounded class/feature names are allowed.
+                                checker = None
+                                if compliance_mode != "off":
+                                    checker = srd_compliance.ComplianceChecker(
+                                        srd_compliance.get_matcher(grounded_names(grounded))
+                                    )
+                                cut = False
+                                for chunk in stream:
+                                    if st.session_state.stop_requested:
+                                        break
+                                    delta = getattr(chunk.choices[0].delta, "content", None)
+                                    if delta:
+                                        if model_first_token is None:
+                                            model_first_token = time.monotonic()
+                                            turn_metrics.add_span("model.ttft", model_started, model_first_token)
+                                        found = checker.feed(delta) if checker is not None else []
+                                        renderer.feed(delta)
+                                        if found and compliance_mode == "cut":
+                                            cut = True
+                                            break
+                                if checker is not None and checker.finish() and compliance_mode == "cut":
+                                    cut = True
+                                if cut:
+                                    renderer.truncate(checker.violations[0].start)
+                                    renderer.feed("\n\n_(Response stopped: it started naming non-SRD content.)_")
+                                full_response = renderer.flush()
+                                turn_metrics.add_span(
+                                    "model.stream", model_started, time.monotonic(), frames=renderer.frames
+                                )
+                                if checker is not None and checker.violations:
+                                    st.warning(f"SRD check: this draft names non-SRD content: {', '.join(checker.names())}")
+                                # Only complete, compliant drafts are reused; with the cache bypassed nothing is stored.
+                                if (
+                                    not st.session_state.get("bypass_response_cache", False)
+                                    and not st.session_state.stop_requested
+                                    and not (checker is not None and checker.violations)
+                                    and should_append_assistant_message(full_response)
+                                ):
+                                    drafts.put(cache_key, full_response)
 
                         if should_append_assistant_message(full_response):
                             st.session_state.messages.append({"role": "assistant", "content": full_response})
                         else:
                             st.warning("No assistant text was received (empty stream). Please try again.")
+                        if metrics_turn is not None:
+                            turn_metrics.set_field("completion_tokens", context_window.count_tokens(full_response))
                     finally:
                         st.session_state.is_generating = False
+                        record = turn_metrics.finish(metrics_turn)
+                        if record is not None:
+                            st.session_state["last_turn_metrics"] = record
 
         if st.session_state.stop_requested:
             st.session_state.chat_complete = True
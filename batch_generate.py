@@ -0,0 +1,447 @@
+"""Headless batch generation of build drafts from a concept list.
+
+Reads concepts from JSONL or CSV (fields: concept, level, homebrew, class_hint, optional id
+and title; ids outside [A-Za-z0-9_-] are hashed, malformed rows are reported and skipped),
+builds each request exactly like the chat app (build_system_prompt +
+build_grounded_srd_block over srd_client) and runs them concurrently on asyncio:
+
+- at most --concurrency requests in flight
+- --rpm / --tpm token buckets for requests and tokens per minute
+- --retries with jittered exponential backoff on transient API errors
+- progress appended to <input>.progress.jsonl; a rerun skips concepts already done
+- each draft is saved straight away as a session_store record (session id "batch-<id>")
+
+Usage:
+    python batch_generate.py concepts.jsonl --concurrency 8 --rpm 500 --tpm 200000
+    python batch_generate.py concepts.csv --dry-run        # FakeOpenAI, no API key needed
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import context_window
+import session_store
+import srd_client
+import srd_vocab
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF_S = 1.0
+MAX_BACKOFF_S = 30.0
+# Completion tokens charged to the token bucket before the real count is known.
+COMPLETION_TOKEN_ESTIMATE = 900
+# API errors with these statuses are not retried (bad request, auth, not found, unprocessable).
+_PERMANENT_STATUSES = frozenset({400, 401, 403, 404, 422})
+# Concept ids become part of a session id, and so of a file name in the session store.
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@dataclass(frozen=True)
+class Concept:
+    concept_id: str
+    concept: str
+    level: int = 5
+    homebrew: bool = False
+    class_hint: str = "(auto)"
+    title: str = ""
+
+    @property
+    def session_id(self) -> str:
+        return f"batch-{self.concept_id}"
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on", "hb")
+
+
+def _safe_id(raw: str) -> str:
+    """`raw` if it is [A-Za-z0-9_-] (at most 64 chars), else a readable prefix plus a hash of it."""
+    if _SAFE_ID.fullmatch(raw):
+        return raw
+    prefix = re.sub(r"[^A-Za-z0-9_-]+", "_", raw).strip("_")[:40]
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+    return f"{prefix}-{digest}" if prefix else digest
+
+
+def _concept_from_row(row: Dict[str, Any]) -> Optional[Concept]:
+    """The concept in one input row; None for a row without one, ValueError for a malformed row."""
+    if not isinstance(row, dict):
+        raise ValueError("expected an object")
+    text = str(row.get("concept") or row.get("prompt") or "").strip()
+    if not text:
+        return None
+    # An explicit 0 is a level (clamped to 1 below); only a missing or empty field means the default.
+    raw_level = next((row[k] for k in ("level", "build_level") if row.get(k) not in (None, "")), 5)
+    try:
+        level = max(1, min(20, int(str(raw_level).strip())))
+    except ValueError:
+        raise ValueError(f"level must be a whole number, got {raw_level!r}") from None
+    homebrew = _as_bool(row.get("homebrew", False))
+    hint = str(row.get("class_hint") or "").strip() or "(auto)"
+    raw_id = str(row.get("id") or "").strip()
+    if raw_id:
+        concept_id = _safe_id(raw_id)
+    else:
+        key = json.dumps([text, level, homebrew, hint.lower()], ensure_ascii=False)
+        concept_id = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return Concept(concept_id, text, level, homebrew, hint, str(row.get("title") or "").strip())
+
+
+def read_concepts(path: str | Path, rejected: Optional[List[str]] = None) -> List[Concept]:
+    """Concepts from a .csv (header row) or JSONL file.
+
+    Rows without a concept and repeated concepts are skipped. Malformed rows (bad JSON, a
+    non-numeric level) are skipped too, with "line N: reason" appended to `rejected`.
+    """
+    path = Path(path)
+    rows: List[Tuple[int, Any]] = []
+    problems: List[Tuple[int, str]] = []
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            rows = [(reader.line_num, row) for row in reader]
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append((line_no, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    problems.append((line_no, f"invalid JSON ({e.msg})"))
+    concepts = []
+    seen: Set[str] = set()
+    for line_no, row in rows:
+        try:
+            c = _concept_from_row(row)
+        except ValueError as e:
+            problems.append((line_no, str(e)))
+            continue
+        if c is not None and c.concept_id not in seen:
+            seen.add(c.concept_id)
+            concepts.append(c)
+    if rejected is not None:
+        rejected.extend(f"line {line_no}: {reason}" for line_no, reason in sorted(problems))
+    return concepts
+
+
+class RateLimiter:
+    """Token bucket refilled continuously at `per_minute`; capacity is one minute's worth."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+    ) -> None:
+        self.per_minute = float(per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._level = self.per_minute
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.per_minute, self._level + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        if self.per_minute <= 0:
+            return
+        amount = min(float(amount), self.per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await self._sleep((amount - self._level) * 60.0 / self.per_minute)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, if negative) `amount` after the fact, e.g. actual vs estimated tokens."""
+        if self.per_minute > 0:
+            self._refill()
+            self._level = min(self.per_minute, self._level - amount)
+
+
+@dataclass
+class BatchReport:
+    total: int
+    skipped: int = 0
+    done: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed_s: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def drafts_per_minute(self) -> float:
+        return self.done * 60.0 / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def _is_permanent(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status in _PERMANENT_STATUSES
+
+
+def load_progress(path: str | Path) -> Set[str]:
+    """Concept ids already generated according to a progress file."""
+    done: Set[str] = set()
+    try:
+        with Path(path).open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if entry.get("status") == "done":
+                    done.add(str(entry.get("id")))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class BatchGenerator:
+    """Generates drafts for many concepts; see the module docstring for the knobs."""
+
+    def __init__(
+        self,
+        client: Any,
+        model: str = DEFAULT_MODEL,
+        srd_base: str = "",
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: float = 0.0,
+        tpm: float = 0.0,
+        retries: int = DEFAULT_RETRIES,
+        backoff_s: float = DEFAULT_BACKOFF_S,
+        store_dir: Optional[str | Path] = None,
+        progress_path: Optional[str | Path] = None,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        # Local import: app pulls in Streamlit, which the rest of this module does not need.
+        import app
+
+        self._app = app
+        self.client = client
+        self.model = model
+        self.srd_base = srd_base
+        self.concurrency = int(concurrency)
+        self.requests = RateLimiter(rpm)
+        self.tokens = RateLimiter(tpm)
+        self.retries = int(retries)
+        self.backoff_s = float(backoff_s)
+        self.store_dir = store_dir
+        self.progress_path = Path(progress_path) if progress_path else None
+        self._sleep = sleep
+        self._async_client = asyncio.iscoroutinefunction(client.chat.completions.create)
+        self._srd = srd_client.AsyncSrdClient(srd_base) if srd_base or srd_client.active_bundle() is not None else None
+        self._vocabulary = srd_vocab.get_vocabulary(srd_base, wait=True)
+        # One writer thread: session saves and progress lines never interleave.
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-writer")
+
+    async def _grounding(self, concept: Concept) -> str:
+        if self._srd is None:
+            return ""
+        if concept.class_hint != "(auto)":
+            names = [concept.class_hint.lower()]
+        else:
+            names = self._vocabulary.rank_classes(concept.concept)[: self._app.MAX_GROUNDED_CLASSES]
+        if not names:
+            return ""
+        grounded = await self._srd.get_many(names)
+        blocks = [
+            self._app.build_grounded_srd_block(payload, target_level=concept.level, concept=concept.concept)
+            for payload, err in grounded.values()
+            if payload and not err
+        ]
+        return "\n\n".join(blocks)
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        create = self.client.chat.completions.create
+        if self._async_client:
+            response = await create(model=self.model, messages=messages)
+        else:
+            response = await asyncio.to_thread(create, model=self.model, messages=messages)
+        return (response.choices[0].message.content or "").strip()
+
+    async def generate(self, concept: Concept, report: BatchReport) -> Dict[str, Any]:
+        """Generate one draft (with retries) and return its session payload."""
+        system_prompt = self._app.build_system_prompt(concept.level, concept.homebrew)
+        grounding = await self._grounding(concept)
+        api_messages = [
+            {"role": "system", "content": system_prompt + ("\n\n" + grounding if grounding else "")},
+            {"role": "user", "content": concept.concept},
+        ]
+        estimate = context_window.message_tokens(api_messages) + COMPLETION_TOKEN_ESTIMATE
+
+        for attempt in range(self.retries + 1):
+            await self.requests.acquire()
+            await self.tokens.acquire(estimate)
+            try:
+                text = await self._complete(api_messages)
+            except Exception as e:
+                self.tokens.adjust(-estimate)  # a failed attempt used no completion tokens
+                if attempt >= self.retries or _is_permanent(e):
+                    raise
+                report.retries += 1
+                delay = min(MAX_BACKOFF_S, self.backoff_s * 2**attempt)
+                await self._sleep(random.uniform(0, delay))  # full jitter
+                continue
+            self.tokens.adjust(context_window.count_tokens(text) - COMPLETION_TOKEN_ESTIMATE)
+            break
+        if not text:
+            raise RuntimeError("empty draft")
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": concept.concept},
+            {"role": "assistant", "content": text},
+        ]
+        version = session_store.create_build_version(
+            messages=messages, build_level=concept.level, homebrew=concept.homebrew, label="Batch draft"
+        )
+        return {
+            "session_id": concept.session_id,
+            "title": concept.title or concept.concept[:60],
+            "params": {
+                "build_level": concept.level,
+                "homebrew": concept.homebrew,
+                "openai_model": self.model,
+                "class_hint": concept.class_hint.title() if concept.class_hint != "(auto)" else "(auto)",
+            },
+            "messages": messages,
+            "versions": [version] if version else [],
+        }
+
+    def _record(self, entry: Dict[str, Any], payload: Optional[Dict[str, Any]]) -> None:
+        if payload is not None:
+            session_store.save_session(payload, store_dir=self.store_dir)
+        if self.progress_path is not None:
+            with self.progress_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def run(self, concepts: List[Concept], on_result: Optional[Callable[[Concept, str], None]] = None) -> BatchReport:
+        """Generate every concept not already done; returns counts and drafts per minute."""
+        report = BatchReport(total=len(concepts))
+        done = load_progress(self.progress_path) if self.progress_path is not None else set()
+        queue: "asyncio.Queue[Concept]" = asyncio.Queue()
+        for c in concepts:
+            if c.concept_id in done:
+                report.skipped += 1
+            else:
+                queue.put_nowait(c)
+        loop = asyncio.get_running_loop()
+
+        async def worker() -> None:
+            while True:
+                try:
+                    concept = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    payload = await self.generate(concept, report)
+                except Exception as e:
+                    report.failed += 1
+                    report.errors[concept.concept_id] = f"{type(e).__name__}: {e}"
+                    entry = {"id": concept.concept_id, "status": "failed", "error": report.errors[concept.concept_id]}
+                    await loop.run_in_executor(self._writer, self._record, entry, None)
+                    status = "failed"
+                else:
+                    entry = {"id": concept.concept_id, "status": "done", "session_id": concept.session_id}
+                    await loop.run_in_executor(self._writer, self._record, entry, payload)
+                    report.done += 1
+                    status = "done"
+                if on_result is not None:
+                    on_result(concept, status)
+
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, max(1, queue.qsize())))))
+        finally:
+            report.elapsed_s = time.monotonic() - started
+            self._writer.shutdown(wait=True)
+        return report
+
+
+def _make_client(args: argparse.Namespace) -> Any:
+    if args.dry_run:
+        import fake_openai
+
+        timing = fake_openai.StreamTiming(ttft_s=args.fake_latency_ms / 1e3)
+        return fake_openai.FakeOpenAI(timing=timing)
+    from openai import AsyncOpenAI
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise SystemExit("OPENAI_API_KEY is not set (or use --dry-run)")
+    # Retries are handled here (with the rate limiters), not inside the SDK.
+    return AsyncOpenAI(api_key=api_key, max_retries=0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate build drafts for a JSONL/CSV concept list.")
+    parser.add_argument("input", help="concepts (.jsonl or .csv): concept, level, homebrew, class_hint[, id, title]")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="max requests in flight")
+    parser.add_argument("--rpm", type=float, default=0.0, help="max requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=0.0, help="max tokens per minute (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--progress", default=None, help="progress file (default: <input>.progress.jsonl)")
+    parser.add_argument("--store-dir", default=None, help="session store (default: $DND_SESSION_STORE_DIR)")
+    parser.add_argument("--srd-base-url", default=os.getenv("SRD_API_BASE_URL", ""))
+    parser.add_argument("--dry-run", action="store_true", help="use FakeOpenAI instead of the API")
+    parser.add_argument("--fake-latency-ms", type=float, default=800.0, help="FakeOpenAI latency with --dry-run")
+    args = parser.parse_args(argv)
+
+    rejected: List[str] = []
+    concepts = read_concepts(args.input, rejected)
+    for reason in rejected:
+        print(f"skipped {reason}", flush=True)
+    progress = args.progress or f"{args.input}.progress.jsonl"
+    generator = BatchGenerator(
+        _make_client(args),
+        model=args.model,
+        srd_base=args.srd_base_url.strip(),
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        retries=args.retries,
+        store_dir=args.store_dir,
+        progress_path=progress,
+    )
+
+    def on_result(concept: Concept, status: str) -> None:
+        print(f"{status:<6} {concept.concept_id}  {concept.concept[:70]}", flush=True)
+
+    report = asyncio.run(generator.run(concepts, on_result))
+    print(
+        f"{report.done} drafts, {report.failed} failed, {report.skipped} already done, {report.retries} retries "
+        f"in {report.elapsed_s:.1f}s ({report.drafts_per_minute:.1f} drafts/min); progress: {progress}"
+    )
+    for concept_id, error in report.errors.items():
+        print(f"  {concept_id}: {error}")
+    if rejected:
+        print(f"{len(rejected)} input rows skipped as malformed (see above)")
+    return 1 if report.failed or rejected else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Bytes on disk and save/load time of a realistic session for each DND_SESSION_CODEC.
+
+Builds a 100-turn refinement chat (system prompt, user asks, ~2 KB assistant drafts, one
+build version per draft) and saves/loads it through session_store in a temp dir:
+
+    python benchmarks/bench_session_codecs.py --turns 100 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import session_store  # noqa: E402
+
+_DRAFT = """## {name}, Level {level} Fighter
+
+**Background:** Soldier. **Hit Die:** d10. **Armor:** chain mail, shield.
+
+### Features
+- Fighting Style: Defense (+1 AC while wearing armor)
+- Second Wind: regain 1d10 + {level} hit points as a bonus action
+- Action Surge (from level 2)
+
+### Backstory
+{name} served {years} years on the northern wall before the garrison fell. Revision {rev}
+tightens the hook: the sergeant who ordered the retreat is still alive, and {name} knows where.
+
+### Equipment
+Longsword, shield, light crossbow with 20 bolts, explorer's pack, a dented signet ring.
+"""
+
+
+def _session(turns: int) -> Dict[str, Any]:
+    messages = [{"role": "system", "content": "You are a D&D 5e character builder. " * 40}]
+    versions = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Turn {i}: make the backstory grimmer and mention the wall."})
+        draft = _DRAFT.format(name="Brakka", level=1 + i % 5, years=3 + i, rev=i) * 2
+        messages.append({"role": "assistant", "content": draft})
+        versions.append(session_store.create_build_version(messages=messages, build_level=1 + i % 5, homebrew=False, label=f"Turn {i}"))
+    return {"session_id": "bench", "title": "Brakka the grim", "params": {"class_hint": "fighter"}, "messages": messages, "versions": versions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = _session(args.turns)
+    json_lib = "orjson" if session_store.orjson is not None else "json"
+    print(f"{args.turns} turns, compact body via {json_lib}")
+    print(f"{'codec':<6} {'bytes':>10} {'save ms':>9} {'load ms':>9}")
+    for codec in session_store.CODECS:
+        os.environ["DND_SESSION_CODEC"] = codec
+        with tempfile.TemporaryDirectory() as tmp:
+            store = Path(tmp)
+            saves, loads = [], []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                session_store.save_session(dict(payload), store_dir=store)
+                saves.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                session_store.load_session("bench", store_dir=store)
+                loads.append(time.perf_counter() - t0)
+            size = sum(p.stat().st_size for p in store.iterdir() if p.name.startswith("bench."))
+        print(f"{codec:<6} {size:>10} {statistics.median(saves) * 1e3:>9.2f} {statistics.median(loads) * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-request latency of srd_client.fetch_json: one-shot urllib vs the pooled transport.
+
+Runs against an in-process HTTP/1.1 keep-alive stub on 127.0.0.1, so it needs no SRD service:
+
+    python benchmarks/bench_srd_pool.py --requests 2000
+
+On loopback the gap is the TCP setup alone; behind TLS or a real network the pooled
+transport saves the full handshake per request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import srd_client  # noqa: E402
+
+PAYLOAD = json.dumps(
+    {
+        "name": "Fighter",
+        "hit_die": 10,
+        "features_by_level": [{"level": lvl, "features": [{"name": f"Feature {lvl}"}]} for lvl in range(1, 21)],
+    }
+).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _urllib_fetch(base: str) -> None:
+    req = urllib.request.Request(f"{base}/classes/fighter", headers={"Accept": "application/json"})
+    with urllib.request.urlopen(req, timeout=srd_client.DEFAULT_TIMEOUT_S) as resp:
+        json.loads(resp.read().decode("utf-8"))
+
+
+def _pooled_fetch(base: str) -> None:
+    _, err = srd_client.fetch_json(base, "/classes/fighter")
+    if err:
+        raise RuntimeError(err)
+
+
+def _measure(fn: Callable[[str], None], base: str, n: int) -> List[float]:
+    fn(base)  # warm-up
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(base)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def _report(label: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<18} mean {statistics.mean(samples) * 1e6:8.1f} us   p50 {statistics.median(samples) * 1e6:8.1f} us   p95 {p95 * 1e6:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        _report("urllib (before)", _measure(_urllib_fetch, base, args.requests))
+        _report("pooled (after)", _measure(_pooled_fetch, base, args.requests))
+        print(f"pool stats: {srd_client.pool_stats()}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold start of the app: `import app` (from -X importtime) and the first render under AppTest.
+
+Every sample runs in a fresh interpreter, the way a container scaled up from zero would:
+
+    python benchmarks/bench_startup.py --rounds 5 --top 10
+
+Prints the median import time of `app` with its heaviest direct imports, then the median
+time to the first rendered page (interpreter start to AppTest run finished, Streamlit import
+included).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs in the child: time from interpreter start (minus the time before this line) to the end of
+# the first script run of app.main().
+_FIRST_RENDER = """
+import time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_string("import app; app.main()", default_timeout=60)
+at.secrets["OPENAI_API_KEY"] = "sk-fake"
+at.run()
+if at.exception:
+    raise SystemExit(f"app raised: {at.exception[0].value}")
+print(time.perf_counter() - t0)
+"""
+
+
+def import_times(module: str = "app") -> Tuple[float, Dict[str, float]]:
+    """(total seconds, {direct import: cumulative seconds}) for `import module` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, direct = 0.0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        seconds = int(cumulative) / 1e6
+        if name.strip() == module and not name.startswith("  "):
+            total = seconds
+        elif name.startswith("   ") and not name.startswith("    "):
+            direct[name.strip()] = seconds  # imported directly by `module` (one level of nesting)
+    return total, direct
+
+
+def first_render_s() -> float:
+    """Seconds from a fresh interpreter to the first finished run of app.main() under AppTest."""
+    env = dict(os.environ, DND_SESSION_STORE_DIR=os.environ.get("DND_SESSION_STORE_DIR", ".local/bench_store"))
+    env.pop("SRD_API_BASE_URL", None)
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_RENDER], cwd=ROOT, capture_output=True, text=True, env=env, check=True
+    )
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="heaviest direct imports to list")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    per_import: Dict[str, List[float]] = {}
+    for _ in range(args.rounds):
+        total, direct = import_times()
+        totals.append(total)
+        for name, seconds in direct.items():
+            per_import.setdefault(name, []).append(seconds)
+    print(f"import app        median {statistics.median(totals) * 1e3:8.1f} ms  (min {min(totals) * 1e3:.1f} ms)")
+    heaviest = sorted(((statistics.median(v), k) for k, v in per_import.items()), reverse=True)[: args.top]
+    for seconds, name in heaviest:
+        print(f"  {name:<22} {seconds * 1e3:8.1f} ms")
+
+    renders = [first_render_s() for _ in range(args.rounds)]
+    print(f"first render      median {statistics.median(renders) * 1e3:8.1f} ms  (min {min(renders) * 1e3:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Frames and CPU per streamed response: render-per-token vs stream_render.StreamRenderer.
+
+Replays a long synthetic draft as small token chunks arriving every --token-ms (virtual time,
+so the run is fast) into a render callable that serializes the full text the way a
+Streamlit markdown delta does:
+
+    python benchmarks/bench_stream_render.py --chars 12000 --token-ms 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import stream_render  # noqa: E402
+
+_LINE = "- **Second Wind** (level 1): regain 1d10 + fighter level hit points as a bonus action.\n"
+
+
+def _tokens(chars: int) -> List[str]:
+    text = (_LINE * (chars // len(_LINE) + 1))[:chars]
+    return [text[i : i + 4] for i in range(0, len(text), 4)]
+
+
+class _Frames:
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes = 0
+
+    def __call__(self, text: str) -> None:
+        self.frames += 1
+        self.bytes += len(json.dumps({"markdown": {"body": text}}).encode("utf-8"))
+
+
+def _run(label: str, tokens: List[str], token_s: float, make: Callable) -> None:
+    now = [0.0]
+    sink = _Frames()
+    feed, finish = make(sink, lambda: now[0])
+    t0 = time.process_time()
+    for tok in tokens:
+        now[0] += token_s
+        feed(tok)
+    finish()
+    cpu = time.process_time() - t0
+    print(f"{label:<16} frames {sink.frames:6d}   sent {sink.bytes / 1e6:8.2f} MB   cpu {cpu * 1e3:8.1f} ms")
+
+
+def _per_token(sink, clock):
+    state = {"text": ""}
+
+    def feed(tok: str) -> None:
+        state["text"] += tok
+        sink(state["text"])
+
+    return feed, lambda: None
+
+
+def _throttled(sink, clock):
+    r = stream_render.StreamRenderer(sink, clock=clock)
+    return r.feed, r.flush
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, default=12000)
+    parser.add_argument("--token-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    tokens = _tokens(args.chars)
+    print(f"{len(tokens)} chunks, {args.chars} chars, one chunk per {args.token_ms} ms")
+    _run("per token", tokens, args.token_ms / 1e3, _per_token)
+    _run("throttled", tokens, args.token_ms / 1e3, _throttled)
+
+
+if __name__ == "__main__":
+    main()
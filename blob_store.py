@@ -0,0 +1,190 @@
+"""Content-addressed blob storage for assistant drafts.
+
+Assistant texts are stored once under <store>/_blobs/<sha256[:2]>/<sha256[2:]>, and session
+files reference them by hash: the same draft saved in `messages` and in any number of build
+versions costs one blob. Optionally a blob is written as a line delta against the previous
+draft (consecutive drafts in a refinement chat share most of their lines); delta chains are
+capped at MAX_DELTA_CHAIN so a read never replays more than that many steps.
+
+Blob file format: b"F" + UTF-8 text, or b"D" + JSON {"base": hash, "depth": n, "ops": [...]}
+where each op is [start, end] (copy base lines) or a string (new text).
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+BLOB_DIRNAME = "_blobs"
+MAX_DELTA_CHAIN = 8
+# Only keep a delta if it is at most this fraction of the full text.
+_DELTA_MAX_RATIO = 0.5
+_TEXT_CACHE_SIZE = 256
+
+
+def blob_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._known: set = set()
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def exists(self, digest: str) -> bool:
+        if digest in self._known:
+            return True
+        if self._path(digest).exists():
+            self._known.add(digest)
+            return True
+        return False
+
+    def put(self, text: str, base: Optional[str] = None) -> str:
+        """Store text (once) and return its hash; with base, try to store it as a delta."""
+        digest = blob_hash(text)
+        if self.exists(digest):
+            return digest
+
+        data = b"F" + text.encode("utf-8")
+        if base and base != digest and self.exists(base):
+            delta = self._make_delta(text, base)
+            if delta is not None:
+                data = delta
+
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        with self._lock:
+            self._known.add(digest)
+            self._remember(digest, text)
+        return digest
+
+    def get(self, digest: str) -> str:
+        cached = self._texts.get(digest)
+        if cached is not None:
+            return cached
+        data = self._path(digest).read_bytes()
+        if data[:1] == b"F":
+            text = data[1:].decode("utf-8")
+        elif data[:1] == b"D":
+            delta = json.loads(data[1:].decode("utf-8"))
+            text = _apply_delta(self.get(delta["base"]), delta["ops"])
+        else:
+            raise ValueError(f"corrupt blob: {digest}")
+        with self._lock:
+            self._remember(digest, text)
+        return text
+
+    def _depth(self, digest: str) -> int:
+        data = self._path(digest).read_bytes()
+        if data[:1] != b"D":
+            return 0
+        return int(json.loads(data[1:].decode("utf-8")).get("depth", 1))
+
+    def _make_delta(self, text: str, base: str) -> Optional[bytes]:
+        depth = self._depth(base) + 1
+        if depth > MAX_DELTA_CHAIN:
+            return None
+        ops = _make_ops(self.get(base), text)
+        encoded = b"D" + json.dumps(
+            {"base": base, "depth": depth, "ops": ops}, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        if len(encoded) > _DELTA_MAX_RATIO * len(text.encode("utf-8")):
+            return None
+        return encoded
+
+    def _remember(self, digest: str, text: str) -> None:
+        self._texts[digest] = text
+        self._texts.move_to_end(digest)
+        while len(self._texts) > _TEXT_CACHE_SIZE:
+            self._texts.popitem(last=False)
+
+
+def _make_ops(old: str, new: str) -> List[Union[List[int], str]]:
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops: List[Union[List[int], str]] = []
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def _apply_delta(base: str, ops: List[Union[List[int], str]]) -> str:
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.append("".join(base_lines[op[0] : op[1]]))
+    return "".join(parts)
+
+
+def externalize(payload: Dict[str, Any], blobs: BlobStore, deltas: bool = False) -> Dict[str, Any]:
+    """Return a copy of payload with assistant texts replaced by blob references.
+
+    messages[i].content (assistant) -> messages[i].content_ref
+    versions[i].assistant_text      -> versions[i].assistant_text_ref
+    """
+    out = dict(payload)
+    prev: Optional[str] = None
+    messages = []
+    for m in payload.get("messages") or []:
+        content = m.get("content")
+        if m.get("role") == "assistant" and isinstance(content, str) and content:
+            digest = blobs.put(content, base=prev if deltas else None)
+            prev = digest
+            m = {k: v for k, v in m.items() if k != "content"}
+            m["content_ref"] = digest
+        messages.append(m)
+    if "messages" in payload:
+        out["messages"] = messages
+
+    prev = None
+    versions = []
+    for v in payload.get("versions") or []:
+        text = v.get("assistant_text")
+        if isinstance(text, str) and text:
+            digest = blobs.put(text, base=prev if deltas else None)
+            prev = digest
+            v = {k: val for k, val in v.items() if k != "assistant_text"}
+            v["assistant_text_ref"] = digest
+        versions.append(v)
+    if "versions" in payload:
+        out["versions"] = versions
+    return out
+
+
+def internalize(stored: Dict[str, Any], blobs: BlobStore) -> Dict[str, Any]:
+    """Inverse of externalize. Payloads without references (legacy files) pass through unchanged."""
+    messages = stored.get("messages")
+    if isinstance(messages, list):
+        for i, m in enumerate(messages):
+            if isinstance(m, dict) and "content_ref" in m:
+                m = dict(m)
+                m["content"] = blobs.get(m.pop("content_ref"))
+                messages[i] = m
+    versions = stored.get("versions")
+    if isinstance(versions, list):
+        for i, v in enumerate(versions):
+            if isinstance(v, dict) and "assistant_text_ref" in v:
+                v = dict(v)
+                v["assistant_text"] = blobs.get(v.pop("assistant_text_ref"))
+                versions[i] = v
+    return stored
@@ -0,0 +1,191 @@
+"""Token-budgeted context window for the chat completion request.
+
+The stored history grows every turn; the request does not have to. build_context() keeps the
+system prompt (with the grounding block appended), and the latest `keep_turns` turns verbatim, and
+once the full history no longer fits `budget` tokens it replaces the older turns with a
+rolling extractive summary (one line per turn: the request and the draft's headings).
+
+The summary is deterministic and incremental: the caller keeps the returned SummaryCache
+(e.g. in st.session_state) and passes it back, so each turn only summarizes turns that have
+newly fallen out of the verbatim window.
+
+Token counts use tiktoken when installed, else a chars/4 estimate.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional exact tokenizer.
+try:
+    import tiktoken  # type: ignore
+except Exception:
+    tiktoken = None
+
+DEFAULT_TOKEN_BUDGET = 8000
+DEFAULT_KEEP_TURNS = 4
+# Per-message overhead of the chat format (role, separators).
+_MESSAGE_OVERHEAD_TOKENS = 4
+_SUMMARY_HEADER = "Summary of earlier turns (condensed; the latest turns follow verbatim):"
+_USER_CHARS = 160
+_DRAFT_ITEM_CHARS = 80
+_DRAFT_ITEMS = 4
+
+_encoding: Any = None
+
+
+def _tiktoken_encoding() -> Any:
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Tokens in `text` (tiktoken o200k_base when installed, else ceil(chars / 4))."""
+    enc = _tiktoken_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(count_tokens(str(m.get("content") or "")) + _MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+@dataclass
+class SummaryCache:
+    """Rolling summary of history messages [first, upto); `digest` guards against a changed history."""
+
+    upto: int = 0
+    digest: str = ""
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ContextStats:
+    full_tokens: int
+    sent_tokens: int
+    summarized_turns: int
+    verbatim_turns: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.full_tokens - self.sent_tokens)
+
+
+def _split_turns(messages: List[Dict[str, Any]], start: int) -> List[Tuple[int, int]]:
+    """(begin, end) index ranges of turns in messages[start:]; a turn starts at a user message."""
+    bounds: List[int] = []
+    for i in range(start, len(messages)):
+        if messages[i].get("role") == "user" or not bounds:
+            bounds.append(i)
+    return [(b, bounds[k + 1] if k + 1 < len(bounds) else len(messages)) for k, b in enumerate(bounds)]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+_ITEM_RE = re.compile(r"^\s*(?:#{1,6}\s+|\*\*[^*]+\*\*)")
+
+
+def summarize_turn(turn: List[Dict[str, Any]], number: int) -> str:
+    """One deterministic line: the user's request plus the draft's headings / bold labels."""
+    asks = [_clip(str(m.get("content") or ""), _USER_CHARS) for m in turn if m.get("role") == "user"]
+    items: List[str] = []
+    for m in turn:
+        if m.get("role") != "assistant":
+            continue
+        lines = [ln for ln in str(m.get("content") or "").splitlines() if ln.strip()]
+        picked = [ln for ln in lines if _ITEM_RE.match(ln)] or lines[:1]
+        items.extend(_clip(ln.strip().lstrip("#").strip(), _DRAFT_ITEM_CHARS) for ln in picked[:_DRAFT_ITEMS])
+    line = f"- Turn {number}: asked: {' / '.join(asks) or '(none)'}"
+    if items:
+        line += f" | draft: {'; '.join(items)}"
+    return line
+
+
+def _digest(messages: List[Dict[str, Any]]) -> str:
+    last = messages[-1] if messages else {}
+    key = json.dumps([len(messages), last.get("role"), last.get("content")], ensure_ascii=False)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _update_summary(
+    messages: List[Dict[str, Any]],
+    turns: List[Tuple[int, int]],
+    upto: int,
+    cache: Optional[SummaryCache],
+) -> SummaryCache:
+    """Summary of all turns ending at or before `upto`, extending `cache` when it still applies."""
+    if cache is not None and cache.upto <= upto and cache.digest == _digest(messages[: cache.upto]):
+        lines, done = list(cache.lines), cache.upto
+    else:
+        lines, done = [], 0
+    for number, (begin, end) in enumerate(turns, start=1):
+        if end > upto:
+            break
+        if begin >= done:
+            lines.append(summarize_turn(messages[begin:end], number))
+    return SummaryCache(upto=upto, digest=_digest(messages[:upto]), lines=lines)
+
+
+def build_context(
+    messages: List[Dict[str, Any]],
+    grounding_block: str = "",
+    budget: int = DEFAULT_TOKEN_BUDGET,
+    keep_turns: int = DEFAULT_KEEP_TURNS,
+    cache: Optional[SummaryCache] = None,
+) -> Tuple[List[Dict[str, str]], ContextStats, Optional[SummaryCache]]:
+    """Return (api_messages, stats, summary cache) for one request.
+
+    The stored `messages` are not modified. The full history is sent unchanged while it fits
+    `budget`; otherwise older turns collapse into a summary message right after the system
+    prompt, and the verbatim window shrinks (never below the latest turn) until it fits.
+    The summary keeps its newest lines when it alone would overflow the budget.
+    """
+    api = [{"role": str(m.get("role", "")), "content": str(m.get("content") or "")} for m in messages]
+    has_system = bool(api) and api[0]["role"] == "system"
+    if has_system and grounding_block:
+        api[0]["content"] = api[0]["content"] + "\n\n" + grounding_block
+    head = api[:1] if has_system else []
+    turns = _split_turns(api, len(head))
+
+    full_tokens = message_tokens(api)
+    if full_tokens <= budget or len(turns) <= 1:
+        return api, ContextStats(full_tokens, full_tokens, 0, len(turns)), cache
+
+    head_tokens = message_tokens(head)
+    keep = max(1, min(keep_turns, len(turns) - 1))
+    while keep > 1 and head_tokens + message_tokens(api[turns[-keep][0] :]) > budget:
+        keep -= 1
+    split = turns[-keep][0]
+    cache = _update_summary(api, turns, split, cache)
+
+    tail = api[split:]
+    room = budget - head_tokens - message_tokens(tail) - count_tokens(_SUMMARY_HEADER) - _MESSAGE_OVERHEAD_TOKENS
+    lines: List[str] = []
+    for line in reversed(cache.lines):
+        cost = count_tokens(line) + 1
+        if cost > room:
+            break
+        lines.append(line)
+        room -= cost
+    lines.reverse()
+
+    out = list(head)
+    if lines:
+        out.append({"role": "system", "content": _SUMMARY_HEADER + "\n" + "\n".join(lines)})
+    out.extend(tail)
+    return out, ContextStats(full_tokens, message_tokens(out), len(turns) - keep, keep), cache
@@ -0,0 +1,223 @@
+"""Offline stand-in for the OpenAI chat-completions client.
+
+FakeOpenAI has the shape app.main() uses from get_openai_client():
+`client.chat.completions.create(model=..., messages=..., stream=True)` returns an iterator of
+chunks with `chunk.choices[0].delta.content`. Streams are replayed from a recording or
+synthesized from text, with configurable time-to-first-token, inter-chunk delay and chunk
+size, so streaming and rendering changes can be measured without an API key.
+
+Recordings are JSONL, one chunk per line: {"content": "...", "t": seconds since request}.
+record_stream() captures one from a live stream; "t" is optional on replay (without it the
+configured delays apply).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+DEFAULT_TTFT_S = 0.4
+DEFAULT_INTER_CHUNK_S = 0.015
+DEFAULT_CHUNK_CHARS = 4
+
+SAMPLE_DRAFT = """**(1) Concept summary**
+A grim dwarf veteran who held the northern wall long after the garrison fell, now hunting the sergeant who ordered the retreat.
+
+**(2) Class:** Fighter. **Subclass:** SRD limitation (not specified). RP rationale: disciplined, armored and built to hold a line.
+
+**(3) Key feature milestones**
+- Level 1: Fighting Style (Defense), Second Wind
+- Level 2: Action Surge
+- Level 3: Martial Archetype (SRD limitation: not specified)
+- Level 4: Ability Score Improvement (+2 Constitution)
+- Level 5: Extra Attack
+
+**(4) Spell suggestions:** SRD limitation (spells not grounded).
+
+**(5) ASIs / feats:** Prefer ASIs: Strength first, then Constitution. Feats skipped (SRD-only).
+
+**(6) RP hooks**
+- The signet ring of the fallen garrison commander never leaves his hand.
+- He counts the bolts in his quiver every night, out loud.
+- Somewhere south, the sergeant has a new name and a new post.
+"""
+
+
+@dataclass(frozen=True)
+class Delta:
+    content: Optional[str] = None
+    role: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Choice:
+    delta: Delta
+    index: int = 0
+    finish_reason: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ChatCompletionChunk:
+    choices: List[Choice]
+    model: str = ""
+    id: str = "chatcmpl-fake"
+    object: str = "chat.completion.chunk"
+
+
+@dataclass(frozen=True)
+class Message:
+    content: str
+    role: str = "assistant"
+
+
+@dataclass(frozen=True)
+class CompletionChoice:
+    message: Message
+    index: int = 0
+    finish_reason: str = "stop"
+
+
+@dataclass(frozen=True)
+class ChatCompletion:
+    choices: List[CompletionChoice]
+    model: str = ""
+    id: str = "chatcmpl-fake"
+    object: str = "chat.completion"
+
+
+@dataclass(frozen=True)
+class RecordedChunk:
+    content: str
+    t: Optional[float] = None
+
+
+def split_text(text: str, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> List[RecordedChunk]:
+    """Cut text into chunk_chars-sized pieces (roughly one token each at the default 4)."""
+    size = max(1, int(chunk_chars))
+    return [RecordedChunk(text[i : i + size]) for i in range(0, len(text), size)]
+
+
+def load_recording(path: Union[str, Path]) -> List[RecordedChunk]:
+    chunks = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                chunks.append(RecordedChunk(str(data.get("content") or ""), data.get("t")))
+    return chunks
+
+
+def record_stream(stream: Iterable[Any], path: Union[str, Path], clock: Callable[[], float] = time.monotonic) -> str:
+    """Consume a (live) chat-completions stream into a JSONL recording; returns the full text."""
+    started = clock()
+    parts = []
+    with Path(path).open("w", encoding="utf-8") as f:
+        for chunk in stream:
+            content = getattr(chunk.choices[0].delta, "content", None) if chunk.choices else None
+            if content:
+                parts.append(content)
+                f.write(json.dumps({"content": content, "t": round(clock() - started, 6)}) + "\n")
+    return "".join(parts)
+
+
+@dataclass
+class StreamTiming:
+    """Configurable stream pacing. `respect_recorded_times` replays a recording's own "t" offsets."""
+
+    ttft_s: float = DEFAULT_TTFT_S
+    inter_chunk_s: float = DEFAULT_INTER_CHUNK_S
+    chunk_chars: int = DEFAULT_CHUNK_CHARS
+    respect_recorded_times: bool = True
+
+
+@dataclass
+class CallRecord:
+    model: str
+    messages: List[Dict[str, Any]]
+    stream: bool
+    started: float
+    first_chunk: Optional[float] = None
+    finished: Optional[float] = None
+    chunks: int = 0
+
+
+class _Completions:
+    def __init__(self, client: "FakeOpenAI") -> None:
+        self._client = client
+
+    def create(self, *, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs: Any) -> Any:
+        return self._client._create(model, messages, stream)
+
+
+class _Chat:
+    def __init__(self, client: "FakeOpenAI") -> None:
+        self.completions = _Completions(client)
+
+
+class FakeOpenAI:
+    """Replays responses in order (the last one repeats) with StreamTiming pacing.
+
+    responses: texts, recordings (lists of RecordedChunk) or a callable(messages) -> text.
+    Every create() call is logged in `calls` (with first-chunk and finish timestamps).
+    """
+
+    def __init__(
+        self,
+        responses: Union[None, str, List[Union[str, List[RecordedChunk]]], Callable[[List[Dict[str, Any]]], str]] = None,
+        timing: Optional[StreamTiming] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if responses is None:
+            responses = [SAMPLE_DRAFT]
+        elif isinstance(responses, str):
+            responses = [responses]
+        self.responses = responses
+        self.timing = timing or StreamTiming()
+        self.calls: List[CallRecord] = []
+        self.chat = _Chat(self)
+        self._sleep = sleep
+        self._clock = clock
+
+    def _next_chunks(self, messages: List[Dict[str, Any]]) -> List[RecordedChunk]:
+        if callable(self.responses):
+            response: Union[str, List[RecordedChunk]] = self.responses(messages)
+        else:
+            if not self.responses:
+                raise ValueError("FakeOpenAI has no responses to replay")
+            response = self.responses[min(len(self.calls) - 1, len(self.responses) - 1)]
+        if isinstance(response, str):
+            return split_text(response, self.timing.chunk_chars)
+        return list(response)
+
+    def _create(self, model: str, messages: List[Dict[str, Any]], stream: bool) -> Any:
+        call = CallRecord(model=model, messages=list(messages), stream=stream, started=self._clock())
+        self.calls.append(call)
+        chunks = self._next_chunks(messages)
+        if not stream:
+            self._sleep(self.timing.ttft_s)
+            call.first_chunk = call.finished = self._clock()
+            call.chunks = len(chunks)
+            text = "".join(c.content for c in chunks)
+            return ChatCompletion(choices=[CompletionChoice(Message(text))], model=model)
+        return self._stream(call, chunks)
+
+    def _stream(self, call: CallRecord, chunks: List[RecordedChunk]) -> Iterator[ChatCompletionChunk]:
+        timing = self.timing
+        yield ChatCompletionChunk(choices=[Choice(Delta(role="assistant"))], model=call.model)
+        for i, chunk in enumerate(chunks):
+            if timing.respect_recorded_times and chunk.t is not None:
+                delay = call.started + chunk.t - self._clock()
+            else:
+                delay = timing.ttft_s if i == 0 else timing.inter_chunk_s
+            if delay > 0:
+                self._sleep(delay)
+            if call.first_chunk is None:
+                call.first_chunk = self._clock()
+            call.chunks += 1
+            yield ChatCompletionChunk(choices=[Choice(Delta(content=chunk.content))], model=call.model)
+        call.finished = self._clock()
+        yield ChatCompletionChunk(choices=[Choice(Delta(), finish_reason="stop")], model=call.model)
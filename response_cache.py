@@ -0,0 +1,180 @@
+"""Response cache for build drafts (exact match on normalized inputs).
+
+A draft is reused when everything that shaped it matches: the normalized prompt, build_level,
+homebrew, class_hint, openai_model, and hashes of the system prompt, the grounding block and
+the prior conversation (so a refinement like "make it grimmer" only hits within the same
+history; first-turn concepts hit across sessions).
+
+Entries persist as one small JSON file each under DND_RESPONSE_CACHE_DIR (default
+.local/response_cache) and are bounded by count and total bytes (least recently used go
+first) and by a per-entry TTL. The in-memory index is rebuilt from file mtimes on start.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_TTL_S = 7 * 24 * 3600.0
+_KEY_VERSION = 1
+_TRAILING_PUNCT = re.compile(r"[\s.!?…]+$")
+
+
+def get_cache_dir(cache_dir: Optional[str | Path] = None) -> Path:
+    if cache_dir is None:
+        cache_dir = os.getenv("DND_RESPONSE_CACHE_DIR", ".local/response_cache")
+    path = Path(cache_dir).expanduser().resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-, width- and whitespace-insensitive form of a prompt (trailing punctuation dropped)."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return _TRAILING_PUNCT.sub("", " ".join(text.split()))
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(
+    *,
+    prompt: str,
+    build_level: int,
+    homebrew: bool,
+    class_hint: str,
+    openai_model: str,
+    system_prompt: str,
+    grounding_block: str,
+    history: List[Dict[str, Any]],
+) -> str:
+    """Cache key for one request; `history` is the conversation before this prompt (no system message)."""
+    turns = [[str(m.get("role", "")), str(m.get("content") or "")] for m in history if m.get("role") != "system"]
+    fields = [
+        _KEY_VERSION,
+        normalize_prompt(prompt),
+        int(build_level),
+        bool(homebrew),
+        str(class_hint),
+        str(openai_model),
+        _sha(system_prompt),
+        _sha(grounding_block),
+        _sha(json.dumps(turns, ensure_ascii=False)),
+    ]
+    return _sha(json.dumps(fields, ensure_ascii=False))
+
+
+class ResponseCache:
+    """Disk-backed LRU of response texts, bounded by entries and bytes, with per-entry TTL. Thread-safe."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str | Path] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: float = DEFAULT_TTL_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.dir = get_cache_dir(cache_dir)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> file size, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "puts": 0, "evictions": 0}
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        found = []
+        for de in os.scandir(self.dir):
+            if de.name.endswith(".json") and de.is_file():
+                st = de.stat()
+                found.append((st.st_mtime_ns, de.name[: -len(".json")], st.st_size))
+        for _, key, size in sorted(found):
+            self._index[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for key, or None on a miss / expired entry."""
+        with self._lock:
+            if key not in self._index:
+                self._stats["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._drop(key)
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        if self._clock() - float(entry.get("created_at", 0)) > self.ttl_s:
+            self._drop(key)
+            with self._lock:
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)  # keeps LRU order across restarts
+        except OSError:
+            pass
+        with self._lock:
+            self._stats["hits"] += 1
+        return str(entry.get("text", ""))
+
+    def put(self, key: str, text: str) -> None:
+        data = json.dumps({"created_at": self._clock(), "text": text}, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._stats["puts"] += 1
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._index)
+        for key in keys:
+            self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._index), "bytes": self._bytes}
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within bounds (caller holds the lock)."""
+        while self._index and (len(self._index) > self.max_entries or self._bytes > self.max_bytes):
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self._stats["evictions"] += 1
+            self._path(key).unlink(missing_ok=True)
@@ -0,0 +1,272 @@
+"""Append-only journal session backend.
+
+Enable with DND_SESSION_BACKEND=journal.
+
+Each session is a snapshot `<id>.json` (same shape as the JSON backend, plus `_journal_seq`)
+and a journal `<id>.journal` of compact JSON-lines records. A save appends only what changed
+since the last save:
+
+- {"seq": n, "op": "meta", "data": {...}}          top-level fields except messages/versions
+- {"seq": n, "op": "msg", "i": idx, "m": {...}}     message appended or replaced at idx
+- {"seq": n, "op": "trunc_msgs", "n": count}        history shortened to count messages
+- {"seq": n, "op": "ver", "i": idx, "v": {...}}     version appended or replaced at idx
+- {"seq": n, "op": "trunc_vers", "n": count}
+
+Every COMPACT_EVERY_RECORDS records the session is compacted: the full payload is written
+atomically as the snapshot (recording the last seq it contains) and the journal is emptied.
+Replay applies only records newer than the snapshot, so a crash between those two steps is
+harmless, and a torn final line from a crash mid-append is discarded (and trimmed before the
+next append).
+
+The backend keeps per-session write state in memory, so a session should have one writing
+process at a time (use the SQLite backend for multi-process writers).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from session_store import JsonSessionBackend, _atomic_write_json, _read_json_file, _session_path
+
+COMPACT_EVERY_RECORDS = 256
+_SEQ_KEY = "_journal_seq"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(_dumps(value).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _JournalState:
+    """What is already on disk for one session, so a save can emit only the difference."""
+
+    seq: int = 0
+    records: int = 0  # records in the journal since the last snapshot
+    meta_digest: str = ""
+    message_digests: List[str] = field(default_factory=list)
+    version_digests: List[str] = field(default_factory=list)
+    # The (key, value) pairs last seen per item. Holding the value objects lets an unchanged
+    # message be recognised by identity instead of re-hashing it, keeping saves O(new turns).
+    message_refs: List[Tuple[Any, ...]] = field(default_factory=list)
+    version_refs: List[Tuple[Any, ...]] = field(default_factory=list)
+
+
+def _split(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    meta = {k: v for k, v in payload.items() if k not in ("messages", "versions", _SEQ_KEY)}
+    return meta, list(payload.get("messages") or []), list(payload.get("versions") or [])
+
+
+def _state_for(payload: Dict[str, Any], seq: int, records: int) -> _JournalState:
+    meta, messages, versions = _split(payload)
+    return _JournalState(
+        seq=seq,
+        records=records,
+        meta_digest=_digest(meta),
+        message_digests=[_digest(m) for m in messages],
+        version_digests=[_digest(v) for v in versions],
+        message_refs=[tuple(m.items()) for m in messages],
+        version_refs=[tuple(v.items()) for v in versions],
+    )
+
+
+class JournalSessionBackend(JsonSessionBackend):
+    name = "journal"
+
+    def __init__(self, base: Path) -> None:
+        super().__init__(base)
+        self._lock = threading.Lock()
+        self._states: Dict[str, _JournalState] = {}
+
+    def _journal_path(self, session_id: str) -> Path:
+        return self.base / f"{session_id}.journal"
+
+    def _page_sources(self, session_id: str) -> List[Path]:
+        return [_session_path(session_id=session_id, store_dir=self.base), self._journal_path(session_id)]
+
+    # ---------- replay ----------
+    def _replay(self, session_id: str) -> Tuple[Dict[str, Any], int, int, int]:
+        """Rebuild the payload from snapshot + journal.
+
+        Returns (payload, last seq, journal records applied, byte offset of the last complete record).
+        Raises FileNotFoundError if neither file exists.
+        """
+        snapshot_path = _session_path(session_id=session_id, store_dir=self.base)
+        journal_path = self._journal_path(session_id)
+        if snapshot_path.exists():
+            payload = _read_json_file(snapshot_path)
+        elif journal_path.exists():
+            payload = {"session_id": session_id}
+        else:
+            raise FileNotFoundError(f"No such session: {session_id}")
+
+        seq = int(payload.pop(_SEQ_KEY, 0) or 0)
+        messages = list(payload.get("messages") or [])
+        versions = list(payload.get("versions") or [])
+        applied = 0
+        good_offset = 0
+
+        if journal_path.exists():
+            with journal_path.open("rb") as f:
+                data = f.read()
+            pos = 0
+            while pos < len(data):
+                end = data.find(b"\n", pos)
+                if end == -1:
+                    break  # torn final record
+                try:
+                    rec = json.loads(data[pos:end].decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    break
+                pos = end + 1
+                good_offset = pos
+                rec_seq = int(rec.get("seq", 0))
+                if rec_seq <= seq:
+                    continue  # already folded into the snapshot
+                seq = rec_seq
+                applied += 1
+                op = rec.get("op")
+                if op == "meta":
+                    payload = {**rec["data"], "messages": messages, "versions": versions}
+                elif op == "msg":
+                    _put(messages, int(rec["i"]), rec["m"])
+                elif op == "trunc_msgs":
+                    del messages[int(rec["n"]) :]
+                elif op == "ver":
+                    _put(versions, int(rec["i"]), rec["v"])
+                elif op == "trunc_vers":
+                    del versions[int(rec["n"]) :]
+
+        payload["messages"] = messages
+        payload["versions"] = versions
+        return payload, seq, applied, good_offset
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        payload, _, _, _ = self._replay(session_id)
+        return payload
+
+    def _read_payload(self, path: Path) -> Dict[str, Any]:
+        return self.load(path.stem)
+
+    # ---------- writes ----------
+    def _current_state(self, session_id: str) -> Optional[_JournalState]:
+        state = self._states.get(session_id)
+        if state is not None:
+            return state
+        try:
+            payload, seq, applied, good_offset = self._replay(session_id)
+        except FileNotFoundError:
+            return None
+        journal_path = self._journal_path(session_id)
+        if journal_path.exists() and journal_path.stat().st_size > good_offset:
+            # Drop a torn tail so the next append starts on a record boundary.
+            with journal_path.open("r+b") as f:
+                f.truncate(good_offset)
+        state = self._states[session_id] = _state_for(payload, seq, applied)
+        return state
+
+    def save(self, payload: Dict[str, Any]) -> None:
+        session_id = str(payload["session_id"])
+        with self._lock:
+            try:
+                self._append(session_id, payload)
+            except BaseException:
+                self._states.pop(session_id, None)  # re-derive from disk on the next save
+                raise
+
+    def _append(self, session_id: str, payload: Dict[str, Any]) -> None:
+        state = self._current_state(session_id)
+        if state is None or state.records >= COMPACT_EVERY_RECORDS:
+            self._write_snapshot(session_id, payload, state.seq if state else 0)
+            return
+
+        meta, messages, versions = _split(payload)
+        records: List[Dict[str, Any]] = []
+        meta_digest = _digest(meta)
+        if meta_digest != state.meta_digest:
+            records.append({"op": "meta", "data": meta})
+        message_digests, message_refs = _diff(
+            records, "msg", "m", "trunc_msgs", messages, state.message_digests, state.message_refs
+        )
+        version_digests, version_refs = _diff(
+            records, "ver", "v", "trunc_vers", versions, state.version_digests, state.version_refs
+        )
+        if records:
+            lines = [_dumps({"seq": state.seq + i, **rec}) for i, rec in enumerate(records, start=1)]
+            snapshot_path = _session_path(session_id=session_id, store_dir=self.base)
+            with self._catalog_update(snapshot_path, payload):
+                with self._journal_path(session_id).open("a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._write_page_index(payload)
+
+        state.seq += len(records)
+        state.records += len(records)
+        state.meta_digest = meta_digest
+        state.message_digests, state.message_refs = message_digests, message_refs
+        state.version_digests, state.version_refs = version_digests, version_refs
+
+    def compact(self, session_id: str) -> None:
+        """Fold the journal into a fresh snapshot now (normally done every COMPACT_EVERY_RECORDS)."""
+        with self._lock:
+            payload, seq, _, _ = self._replay(session_id)
+            self._write_snapshot(session_id, payload, seq)
+
+    def _write_snapshot(self, session_id: str, payload: Dict[str, Any], seq: int) -> None:
+        """Write the full payload atomically as the snapshot, then empty the journal."""
+        snapshot_path = _session_path(session_id=session_id, store_dir=self.base)
+        with self._catalog_update(snapshot_path, payload):
+            _atomic_write_json(snapshot_path, {**payload, _SEQ_KEY: seq})
+            journal_path = self._journal_path(session_id)
+            if journal_path.exists():
+                journal_path.write_bytes(b"")
+            self._write_page_index(payload)
+        self._states[session_id] = _state_for(payload, seq, 0)
+
+
+def _put(items: List[Any], idx: int, value: Any) -> None:
+    if idx < len(items):
+        items[idx] = value
+    else:
+        items.append(value)
+
+
+def _diff(
+    records: List[Dict[str, Any]],
+    op: str,
+    key: str,
+    trunc_op: str,
+    items: List[Dict[str, Any]],
+    stored: List[str],
+    refs: List[Tuple[Any, ...]],
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """Append records turning `stored` digests into `items`; return the new digests and refs."""
+    if len(items) < len(stored):
+        records.append({"op": trunc_op, "n": len(items)})
+    digests: List[str] = []
+    new_refs: List[Tuple[Any, ...]] = []
+    for idx, item in enumerate(items):
+        ref = tuple(item.items())
+        if idx < len(refs) and idx < len(stored) and _same_objects(refs[idx], ref):
+            digest = stored[idx]
+        else:
+            digest = _digest(item)
+            if idx >= len(stored) or stored[idx] != digest:
+                records.append({"op": op, "i": idx, key: item})
+        digests.append(digest)
+        new_refs.append(ref)
+    return digests, new_refs
+
+
+def _same_objects(old: Tuple[Any, ...], new: Tuple[Any, ...]) -> bool:
+    return len(old) == len(new) and all(a[0] == b[0] and a[1] is b[1] for a, b in zip(old, new))
@@ -0,0 +1,308 @@
+"""SQLite session backend (stdlib sqlite3, WAL mode).
+
+Enable with DND_SESSION_BACKEND=sqlite. The database lives at <store>/sessions.sqlite3.
+
+Messages and versions are stored one row each, so saving a session after one new chat turn
+costs an insert per new message instead of re-serializing the whole history. WAL mode lets
+several Streamlit worker processes read while one writes; writes take an immediate
+transaction so concurrent saves serialize instead of interleaving.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from session_store import PageCursor, SessionBackend, SessionPage, SessionSummary, _now_iso
+
+DB_FILENAME = "sessions.sqlite3"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    title      TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    params     TEXT NOT NULL DEFAULT '{}',
+    extra      TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS sessions_by_updated_at ON sessions (updated_at);
+CREATE INDEX IF NOT EXISTS sessions_by_title ON sessions (title);
+
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    role       TEXT NOT NULL,
+    content    TEXT NOT NULL,
+    extra      TEXT,
+    digest     TEXT NOT NULL,
+    PRIMARY KEY (session_id, idx)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS versions (
+    session_id TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    version_id TEXT NOT NULL,
+    record     TEXT NOT NULL,
+    PRIMARY KEY (session_id, idx)
+) WITHOUT ROWID;
+"""
+
+# Top-level payload keys with their own columns/tables; anything else round-trips via `extra`.
+_COLUMNS = ("session_id", "title", "created_at", "updated_at", "params", "messages", "versions")
+_ORDER_COLUMNS = {"updated_at": "updated_at", "title": "title", "session_id": "session_id"}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _message_row(message: Dict[str, Any]) -> tuple:
+    extra = {k: v for k, v in message.items() if k not in ("role", "content")}
+    extra_json = _dumps(extra) if extra else None
+    role = str(message.get("role", ""))
+    content = str(message.get("content") or "")
+    digest = hashlib.sha1(f"{role}\0{content}\0{extra_json or ''}".encode("utf-8")).hexdigest()
+    return role, content, extra_json, digest
+
+
+class SqliteSessionBackend(SessionBackend):
+    name = "sqlite"
+
+    def __init__(self, base: Path) -> None:
+        self.path = Path(base) / DB_FILENAME
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (Streamlit runs each session's script in its own thread)."""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = OFF")
+            self._local.conn = conn
+        return conn
+
+    def save(self, payload: Dict[str, Any]) -> None:
+        session_id = str(payload["session_id"])
+        messages = payload.get("messages") or []
+        versions = payload.get("versions") or []
+        extra = {k: v for k, v in payload.items() if k not in _COLUMNS}
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO sessions (session_id, title, created_at, updated_at, params, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET title = excluded.title, created_at = excluded.created_at, "
+                "updated_at = excluded.updated_at, params = excluded.params, extra = excluded.extra",
+                (
+                    session_id,
+                    str(payload.get("title") or ""),
+                    str(payload.get("created_at") or ""),
+                    str(payload.get("updated_at") or ""),
+                    _dumps(payload.get("params") or {}),
+                    _dumps(extra),
+                ),
+            )
+
+            # Messages: only rows whose content changed (typically the refreshed system prompt)
+            # are rewritten; new turns are plain inserts.
+            stored = dict(conn.execute("SELECT idx, digest FROM messages WHERE session_id = ?", (session_id,)))
+            for idx, message in enumerate(messages):
+                row = _message_row(message)
+                if stored.get(idx) == row[3]:
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO messages (session_id, idx, role, content, extra, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, idx, *row),
+                )
+            if len(stored) > len(messages):
+                conn.execute("DELETE FROM messages WHERE session_id = ? AND idx >= ?", (session_id, len(messages)))
+
+            # Versions are immutable once created: insert the new ones, replace any that differ by id.
+            stored_versions = dict(conn.execute("SELECT idx, version_id FROM versions WHERE session_id = ?", (session_id,)))
+            for idx, version in enumerate(versions):
+                version_id = str(version.get("version_id") or "")
+                if idx in stored_versions and stored_versions[idx] == version_id:
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO versions (session_id, idx, version_id, record) VALUES (?, ?, ?, ?)",
+                    (session_id, idx, version_id, _dumps(version)),
+                )
+            if len(stored_versions) > len(versions):
+                conn.execute("DELETE FROM versions WHERE session_id = ? AND idx >= ?", (session_id, len(versions)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def append_version(self, session_id: str, version: Dict[str, Any]) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (_now_iso(), session_id))
+            if cur.rowcount == 0:
+                raise FileNotFoundError(f"No such session: {session_id}")
+            (next_idx,) = conn.execute(
+                "SELECT COALESCE(MAX(idx) + 1, 0) FROM versions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO versions (session_id, idx, version_id, record) VALUES (?, ?, ?, ?)",
+                (session_id, next_idx, str(version.get("version_id") or ""), _dumps(version)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT title, created_at, updated_at, params, extra FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No such session: {session_id}")
+        title, created_at, updated_at, params, extra = row
+
+        messages = self._message_rows(conn, session_id, 0, 2**62)
+        versions = [
+            json.loads(record)
+            for (record,) in conn.execute("SELECT record FROM versions WHERE session_id = ? ORDER BY idx", (session_id,))
+        ]
+
+        payload: Dict[str, Any] = {
+            "session_id": session_id,
+            "title": title,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "params": json.loads(params),
+            "messages": messages,
+            "versions": versions,
+        }
+        payload.update(json.loads(extra))
+        return payload
+
+    def load_page(
+        self,
+        session_id: str,
+        turns: Optional[int],
+        versions: Optional[int],
+        cursor: Optional[PageCursor],
+    ) -> SessionPage:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT title, created_at, updated_at, params, extra FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No such session: {session_id}")
+        title, created_at, updated_at, params, extra = row
+        meta: Dict[str, Any] = {
+            "session_id": session_id,
+            "title": title,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "params": json.loads(params),
+        }
+        meta.update(json.loads(extra))
+
+        # Rows are indexed 0..n-1, so MAX(idx) is an index lookup where COUNT(*) would scan.
+        (total_messages,) = conn.execute(
+            "SELECT COALESCE(MAX(idx) + 1, 0) FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        (total_versions,) = conn.execute(
+            "SELECT COALESCE(MAX(idx) + 1, 0) FROM versions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        system_rows = self._message_rows(conn, session_id, 0, 1)
+        system = system_rows[0] if system_rows and system_rows[0]["role"] == "system" else None
+        first = 1 if system is not None else 0
+
+        end = cursor.messages_before if cursor is not None else total_messages
+        start = first
+        if turns is not None:
+            if turns <= 0:
+                start = end
+            else:
+                # The turns' first user message, walking the primary key backwards from `end`.
+                found = conn.execute(
+                    "SELECT idx FROM messages WHERE session_id = ? AND idx >= ? AND idx < ? AND role = 'user' "
+                    "ORDER BY idx DESC LIMIT 1 OFFSET ?",
+                    (session_id, first, end, turns - 1),
+                ).fetchone()
+                start = found[0] if found else first
+
+        v_end = cursor.versions_before if cursor is not None else total_versions
+        v_start = 0 if versions is None else max(0, v_end - versions)
+        page_versions = [
+            json.loads(record)
+            for (record,) in conn.execute(
+                "SELECT record FROM versions WHERE session_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (session_id, v_start, v_end),
+            )
+        ]
+        return SessionPage(
+            meta=meta,
+            system=system,
+            messages=self._message_rows(conn, session_id, start, end),
+            versions=page_versions,
+            message_offset=start,
+            version_offset=v_start,
+            total_messages=int(total_messages),
+            total_versions=int(total_versions),
+        )
+
+    def _message_rows(self, conn: sqlite3.Connection, session_id: str, start: int, end: int) -> List[Dict[str, Any]]:
+        messages: List[Dict[str, Any]] = []
+        for role, content, msg_extra in conn.execute(
+            "SELECT role, content, extra FROM messages WHERE session_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+            (session_id, start, end),
+        ):
+            message: Dict[str, Any] = {"role": role, "content": content}
+            if msg_extra:
+                message.update(json.loads(msg_extra))
+            messages.append(message)
+        return messages
+
+    def _where(self, prefix: str, title_contains: str) -> tuple:
+        clauses, args = [], []
+        if prefix:
+            clauses.append("substr(session_id, 1, ?) = ?")
+            args += [len(prefix), prefix]
+        if title_contains.strip():
+            clauses.append("instr(lower(title), ?) > 0")
+            args.append(title_contains.strip().lower())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        prefix: str,
+        title_contains: str,
+        sort_by: str,
+        descending: bool,
+    ) -> List[SessionSummary]:
+        column = _ORDER_COLUMNS[sort_by]
+        direction = "DESC" if descending else "ASC"
+        where, args = self._where(prefix, title_contains)
+        rows = self._connect().execute(
+            f"SELECT session_id, title, updated_at FROM sessions{where} "
+            f"ORDER BY {column} {direction}, session_id {direction} LIMIT ? OFFSET ?",
+            (*args, int(limit), int(offset)),
+        )
+        return [SessionSummary(session_id=sid, title=title.strip(), updated_at=updated_at) for sid, title, updated_at in rows]
+
+    def count(self, prefix: str, title_contains: str) -> int:
+        where, args = self._where(prefix, title_contains)
+        (n,) = self._connect().execute(f"SELECT COUNT(*) FROM sessions{where}", args).fetchone()
+        return int(n)
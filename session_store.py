@@ -3,24 +3,61 @@
 P2 scope: save/load chat sessions + build versions.
 
 Design goals:
-- Zero new dependencies (JSON on disk).
+- Zero new dependencies (JSON on disk by default; SQLite from the stdlib as an option).
 - Safe for CI import/py_compile (no Streamlit access at import time).
 - Works locally by default; storage location can be overridden via env var.
 
 Storage:
 - Default directory: .local/session_store
 - Override with env var: DND_SESSION_STORE_DIR
+- Backend: env var DND_SESSION_BACKEND = "json" (default, one file per session), "journal"
+  (append-only change log per session; see session_journal.py) or "sqlite"
+  (<store>/sessions.sqlite3 in WAL mode; see session_sqlite.py).
+- File format (json backend): env var DND_SESSION_CODEC = "json" (default, pretty-printed
+  <id>.json) or "zlib"/"gzip"/"bz2"/"lzma"/"raw" (<id>.dnds: header line with schema_version +
+  codec, then compressed minified JSON; orjson is used when installed). Both formats always load.
+- Draft dedup (json backend): env var DND_SESSION_DEDUP = "blobs" or "deltas" stores assistant
+  texts once under <store>/_blobs (see blob_store.py).
+- Migrate a JSON store: python session_store.py migrate [--from DIR] [--to DIR]
+- Session catalog (JSON backend): <store>/_catalog/catalog.json (id/title/updated_at per session, so listing
+  never opens session bodies) plus catalog.log, to which each save appends one record; the log
+  is folded into catalog.json once it is long. Both live in a subdirectory so that writing them
+  does not touch the store directory's mtime, which is what the catalog is validated against.
+  Sessions edited in place keep the directory mtime, so every file's mtime is also checked on a
+  process's first listing and then every CATALOG_VERIFY_INTERVAL_S.
+- Tail index (json/journal backends): <store>/_pages/<id>.json holds the newest 20 turns and
+  versions, written with every save, so opening a session does not decode the whole file.
+  Paging further back still reads the full session.
 """
 
 from __future__ import annotations
 
+import argparse
+import bisect
+import bz2
+import gzip
 import json
+import lzma
 import os
+import threading
+import time
 import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import blob_store
+import turn_metrics
+
+# Optional faster JSON codec for the compact format.
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
 
 @dataclass(frozen=True)
@@ -30,16 +67,100 @@ class SessionSummary:
     updated_at: str
 
 
+@dataclass(frozen=True)
+class PageCursor:
+    """Where the loaded part of a session starts: everything before these indexes is older."""
+
+    messages_before: int
+    versions_before: int
+
+
+@dataclass
+class SessionPage:
+    """Part of a session: metadata, the system message and the newest turns/versions.
+
+    `message_offset`/`version_offset` are the indexes of messages[0]/versions[0] in the full
+    session; `cursor` pages further back and is None once nothing older remains.
+    """
+
+    meta: Dict[str, Any]
+    system: Optional[Dict[str, Any]]
+    messages: List[Dict[str, Any]]
+    versions: List[Dict[str, Any]]
+    message_offset: int
+    version_offset: int
+    total_messages: int
+    total_versions: int
+
+    @property
+    def cursor(self) -> Optional[PageCursor]:
+        first_message = 1 if self.system is not None else 0
+        if self.message_offset <= first_message and self.version_offset == 0:
+            return None
+        return PageCursor(messages_before=self.message_offset, versions_before=self.version_offset)
+
+
+CATALOG_VERSION = 1
+_CATALOG_DIRNAME = "_catalog"
+_CATALOG_FILENAME = "catalog.json"
+_CATALOG_LOG_FILENAME = "catalog.log"
+# Saves append to catalog.log; it is folded into catalog.json once it holds this many records
+# (or as many as there are sessions, whichever is more), so a save costs O(1) amortized.
+_CATALOG_LOG_MAX_RECORDS = 1000
+# A full per-file mtime check runs on the first listing in a process and then at most this
+# often, so sessions edited in place (which leaves the directory mtime alone) are picked up.
+CATALOG_VERIFY_INTERVAL_S = 60.0
+_CATALOG_ENTRY_KEYS = frozenset({"session_id", "title", "updated_at", "mtime_ns"})
+_SORT_KEYS = ("updated_at", "title", "session_id")
+BACKENDS = ("json", "journal", "sqlite")
+DEDUP_MODES = ("", "blobs", "deltas")
+DEFAULT_PAGE_TURNS = 20
+DEFAULT_PAGE_VERSIONS = 20
+# Per-session tail index: the newest DEFAULT_PAGE_TURNS turns / DEFAULT_PAGE_VERSIONS versions.
+PAGE_INDEX_VERSION = 1
+_PAGES_DIRNAME = "_pages"
+
+# Session payload schema; stored in every payload and in the compact container header.
+SCHEMA_VERSION = 1
+COMPACT_SUFFIX = ".dnds"
+_SESSION_SUFFIXES = (".json", COMPACT_SUFFIX)
+_CONTAINER_MAGIC = b"DNDSESSION "
+_COMPRESSORS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda b: zlib.compress(b, 6), zlib.decompress),
+    "gzip": (lambda b: gzip.compress(b, 6, mtime=0), gzip.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "raw": (lambda b: b, lambda b: b),
+}
+CODECS = ("json",) + tuple(_COMPRESSORS)
+
+
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+_store_dirs: Dict[str, Path] = {}
+
+
 def get_store_dir(store_dir: Optional[str | Path] = None) -> Path:
-    """Return the session store directory, creating it if needed."""
+    """Return the session store directory, creating it if needed.
+
+    An absolute directory is set up once and later calls are a dict lookup. A relative one is
+    resolved against the current working directory on every call (mkdir still runs once per
+    resolved path). If the directory is removed later, save_session recreates it.
+    """
     if store_dir is None:
         store_dir = os.getenv("DND_SESSION_STORE_DIR", ".local/session_store")
+    key = str(store_dir)
+    path = _store_dirs.get(key)
+    if path is not None:
+        return path
     path = Path(store_dir).expanduser().resolve()
-    path.mkdir(parents=True, exist_ok=True)
+    if str(path) not in _store_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _store_dirs[str(path)] = path
+    if os.path.isabs(key):
+        _store_dirs[key] = path
     return path
 
 
@@ -52,15 +173,659 @@ def _session_path(session_id: str, store_dir: Optional[str | Path] = None) -> Pa
     return get_store_dir(store_dir) / f"{session_id}.json"
 
 
-def _atomic_write_json(path: Path, payload: Dict[str, Any]) -> None:
+def _read_json_file(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
     tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+def _atomic_write_json(path: Path, payload: Dict[str, Any], indent: Optional[int] = 2) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    if indent is None:
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(payload, ensure_ascii=False, indent=indent)
     with tmp_path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+        f.write(text)
     tmp_path.replace(path)
 
 
+def _json_bytes(payload: Dict[str, Any]) -> bytes:
+    """Minified UTF-8 JSON (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_from_bytes(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _encode_container(payload: Dict[str, Any], codec: str) -> bytes:
+    """Compact on-disk session: magic + header line + compressed minified JSON."""
+    compress = _COMPRESSORS[codec][0]
+    header = json.dumps(
+        {"schema_version": SCHEMA_VERSION, "codec": codec, "json": "orjson" if orjson is not None else "json"},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return _CONTAINER_MAGIC + header + b"\n" + compress(_json_bytes(payload))
+
+
+def _decode_container(data: bytes) -> Dict[str, Any]:
+    if not data.startswith(_CONTAINER_MAGIC):
+        raise ValueError("not a compact session file")
+    end = data.index(b"\n", len(_CONTAINER_MAGIC))
+    header = json.loads(data[len(_CONTAINER_MAGIC) : end].decode("utf-8"))
+    if int(header.get("schema_version", 0)) > SCHEMA_VERSION:
+        raise ValueError(f"session file schema_version {header['schema_version']} is newer than this app supports")
+    decompress = _COMPRESSORS[header["codec"]][1]
+    return _json_from_bytes(decompress(data[end + 1 :]))
+
+
+def _read_session_file(path: Path) -> Dict[str, Any]:
+    """Read a session file in either format (legacy pretty JSON or compact container)."""
+    if path.suffix == COMPACT_SUFFIX:
+        return _decode_container(path.read_bytes())
+    return _read_json_file(path)
+
+
+class _Catalog:
+    """In-memory session catalog: {file name: entry} plus lazily built sorted views."""
+
+    def __init__(self, dir_mtime_ns: int, entries: Dict[str, Dict[str, Any]]) -> None:
+        self.dir_mtime_ns = dir_mtime_ns
+        self.entries = entries
+        self.log_records = 0  # catalog.log records applied on top of catalog.json
+        self._views: Dict[str, List[SessionSummary]] = {}
+
+    def view(self, sort_by: str) -> List[SessionSummary]:
+        """Summaries sorted ascending by sort_by (cached until the catalog changes)."""
+        cached = self._views.get(sort_by)
+        if cached is None:
+            cached = sorted(
+                (
+                    SessionSummary(session_id=e["session_id"], title=e["title"], updated_at=e["updated_at"])
+                    for e in self.entries.values()
+                ),
+                key=lambda s: (getattr(s, sort_by), s.session_id),
+            )
+            self._views[sort_by] = cached
+        return cached
+
+    def upsert(self, name: str, entry: Dict[str, Any]) -> None:
+        """Insert or replace one entry, keeping any already-built sorted views in order."""
+        self.remove(name)
+        self.entries[name] = entry
+        new = SessionSummary(session_id=entry["session_id"], title=entry["title"], updated_at=entry["updated_at"])
+        for sort_by, view in self._views.items():
+            bisect.insort(view, new, key=lambda s, sort_by=sort_by: (getattr(s, sort_by), s.session_id))
+
+    def remove(self, name: str) -> None:
+        old = self.entries.pop(name, None)
+        if old is None:
+            return
+        prev = SessionSummary(session_id=old["session_id"], title=old["title"], updated_at=old["updated_at"])
+        for sort_by, view in self._views.items():
+            key = lambda s, sort_by=sort_by: (getattr(s, sort_by), s.session_id)  # noqa: E731
+            i = bisect.bisect_left(view, key(prev), key=key)
+            if i < len(view) and view[i] == prev:
+                del view[i]
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        """Replay one catalog.log record: {"op": "put"|"del", "name": ..., "entry": ..., "dir_mtime_ns": ...}."""
+        if record["op"] == "put":
+            if _CATALOG_ENTRY_KEYS <= record["entry"].keys():
+                self.upsert(record["name"], record["entry"])
+        elif record["op"] == "del":
+            self.remove(record["name"])
+        if "dir_mtime_ns" in record:
+            self.dir_mtime_ns = int(record["dir_mtime_ns"])
+        self.log_records += 1
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"catalog_version": CATALOG_VERSION, "dir_mtime_ns": self.dir_mtime_ns, "entries": self.entries}
+
+
+# Guards the catalog cache and every catalog read-modify-write: Streamlit runs sessions' scripts on
+# concurrent threads, and the cached catalog (with its sorted views) is shared by all of them.
+_catalog_lock = threading.RLock()
+# Parsed catalogs per store directory: (catalog.json mtime, catalog.log bytes applied, catalog).
+_catalog_cache: Dict[Path, Tuple[int, int, _Catalog]] = {}
+# When each store's catalog was last checked file by file (time.monotonic()).
+_catalog_verified: Dict[Path, float] = {}
+
+
+def _catalog_path(base: Path) -> Path:
+    return base / _CATALOG_DIRNAME / _CATALOG_FILENAME
+
+
+def _catalog_log_path(base: Path) -> Path:
+    return base / _CATALOG_DIRNAME / _CATALOG_LOG_FILENAME
+
+
+def _catalog_entry(path: Path, data: Dict[str, Any], mtime_ns: int) -> Dict[str, Any]:
+    return {
+        "session_id": str(data.get("session_id") or path.stem),
+        "title": str(data.get("title") or "").strip(),
+        "updated_at": str(data.get("updated_at") or ""),
+        "mtime_ns": mtime_ns,
+    }
+
+
+def _replay_catalog_log(base: Path, catalog: _Catalog, offset: int) -> int:
+    """Apply catalog.log records from byte `offset`; returns the offset after the last complete record."""
+    try:
+        with _catalog_log_path(base).open("rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return offset
+    end = data.rfind(b"\n") + 1  # a torn final record (crash mid-append) waits for its newline
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            catalog.apply(json.loads(line))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return offset + end
+
+
+def _read_catalog(base: Path) -> Optional[_Catalog]:
+    """Return the stored catalog (catalog.json plus catalog.log), or None if it is missing or corrupt."""
+    path = _catalog_path(base)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    try:
+        log_size = _catalog_log_path(base).stat().st_size
+    except OSError:
+        log_size = 0
+    cached = _catalog_cache.get(base)
+    if cached is not None and cached[0] == mtime_ns and cached[1] <= log_size:
+        catalog = cached[2]
+        if cached[1] < log_size:  # appended by another process: apply just the new records
+            _catalog_cache[base] = (mtime_ns, _replay_catalog_log(base, catalog, cached[1]), catalog)
+        return catalog
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("catalog_version") != CATALOG_VERSION:
+            return None
+        entries = data["entries"]
+        if not all(isinstance(e, dict) and _CATALOG_ENTRY_KEYS <= e.keys() for e in entries.values()):
+            return None
+        catalog = _Catalog(int(data["dir_mtime_ns"]), entries)
+    except Exception:
+        return None
+    _catalog_cache[base] = (mtime_ns, _replay_catalog_log(base, catalog, 0), catalog)
+    return catalog
+
+
+def _write_catalog(base: Path, catalog: _Catalog) -> None:
+    """Write the whole catalog as catalog.json and empty catalog.log (which it now includes)."""
+    path = _catalog_path(base)
+    path.parent.mkdir(exist_ok=True)
+    _atomic_write_json(path, catalog.to_json(), indent=None)
+    _catalog_log_path(base).write_bytes(b"")
+    catalog.log_records = 0
+    _catalog_cache[base] = (path.stat().st_mtime_ns, 0, catalog)
+
+
+def _append_catalog_log(base: Path, catalog: _Catalog, records: List[Dict[str, Any]]) -> None:
+    """Persist changes already applied to `catalog` by appending them to catalog.log (compacting when long)."""
+    if catalog.log_records + len(records) > max(_CATALOG_LOG_MAX_RECORDS, len(catalog.entries)):
+        _write_catalog(base, catalog)
+        return
+    log_path = _catalog_log_path(base)
+    with log_path.open("ab") as f:
+        f.write(b"".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n" for r in records))
+    catalog.log_records += len(records)
+    cached = _catalog_cache.get(base)
+    mtime_ns = cached[0] if cached is not None and cached[2] is catalog else _catalog_path(base).stat().st_mtime_ns
+    _catalog_cache[base] = (mtime_ns, log_path.stat().st_size, catalog)
+
+
+def _reconcile_catalog(
+    base: Path,
+    catalog: Optional[_Catalog],
+    read_payload: Callable[[Path], Dict[str, Any]] = _read_session_file,
+) -> _Catalog:
+    """Bring the catalog in line with the session files, re-reading only files whose mtime changed.
+
+    Stats every session file; the catalog is rewritten only if something changed.
+    """
+    # Create the catalog directory first: doing so bumps the store directory's mtime.
+    (base / _CATALOG_DIRNAME).mkdir(exist_ok=True)
+    dir_mtime_ns = base.stat().st_mtime_ns
+    old_entries = catalog.entries if catalog is not None else {}
+    entries: Dict[str, Dict[str, Any]] = {}
+
+    with os.scandir(base) as it:
+        for de in it:
+            if not de.name.endswith(_SESSION_SUFFIXES) or not de.is_file():
+                continue
+            try:
+                mtime_ns = de.stat().st_mtime_ns
+            except OSError:
+                continue
+            known = old_entries.get(de.name)
+            if known is not None and known.get("mtime_ns") == mtime_ns:
+                entries[de.name] = known
+                continue
+            path = Path(de.path)
+            try:
+                entries[de.name] = _catalog_entry(path, read_payload(path), mtime_ns)
+            except Exception:
+                continue
+
+    _catalog_verified[base] = time.monotonic()
+    if catalog is not None and catalog.dir_mtime_ns == dir_mtime_ns and entries == old_entries:
+        return catalog
+    fresh = _Catalog(dir_mtime_ns, entries)
+    _write_catalog(base, fresh)
+    return fresh
+
+
+def _get_catalog(base: Path, read_payload: Callable[[Path], Dict[str, Any]] = _read_session_file) -> _Catalog:
+    """Return a catalog that matches the session files.
+
+    O(1) while the store directory's mtime is unchanged, except for the periodic per-file check
+    (CATALOG_VERIFY_INTERVAL_S). Call with _catalog_lock held.
+    """
+    catalog = _read_catalog(base)
+    verified = _catalog_verified.get(base)
+    if (
+        catalog is None
+        or catalog.dir_mtime_ns != base.stat().st_mtime_ns
+        or verified is None
+        or time.monotonic() - verified >= CATALOG_VERIFY_INTERVAL_S
+    ):
+        catalog = _reconcile_catalog(base, catalog, read_payload)
+    return catalog
+
+
+def rebuild_catalog(store_dir: Optional[str | Path] = None) -> int:
+    """Rebuild the session catalog from scratch. Returns the number of sessions indexed."""
+    base = get_store_dir(store_dir)
+    with _catalog_lock:
+        return len(_reconcile_catalog(base, None).entries)
+
+
+def _turns_start(roles: List[str], turns: Optional[int]) -> int:
+    """Index in `roles` where the last `turns` turns begin (a turn starts at a user message)."""
+    if turns is None:
+        return 0
+    if turns <= 0:
+        return len(roles)
+    seen = 0
+    for i in range(len(roles) - 1, -1, -1):
+        if roles[i] == "user":
+            seen += 1
+            if seen == turns:
+                return i
+    return 0
+
+
+def _file_signature(paths: List[Path]) -> List[List[Any]]:
+    """[name, size, mtime_ns] of each existing path; changes whenever one of them is rewritten."""
+    signature = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        signature.append([path.name, st.st_size, st.st_mtime_ns])
+    return signature
+
+
+def _tail_start(messages: List[Dict[str, Any]], first: int, turns: int) -> int:
+    """Like _turns_start over messages[first:], scanning back only as far as needed; returns an index into messages."""
+    seen = 0
+    for i in range(len(messages) - 1, first - 1, -1):
+        if messages[i].get("role") == "user":
+            seen += 1
+            if seen == turns:
+                return i
+    return first
+
+
+class SessionBackend(ABC):
+    """Storage backend behind save_session / load_session / list_sessions.
+
+    Backends persist payloads as given: save_session stamps created_at/updated_at before
+    calling save(), so imports (e.g. migrations) can keep their original timestamps.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def save(self, payload: Dict[str, Any]) -> None:
+        """Persist a full session payload (payload["session_id"] is set)."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Dict[str, Any]:
+        """Return the stored payload; raise FileNotFoundError if the session does not exist."""
+
+    @abstractmethod
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        prefix: str,
+        title_contains: str,
+        sort_by: str,
+        descending: bool,
+    ) -> List[SessionSummary]:
+        """Return one page of session summaries."""
+
+    @abstractmethod
+    def count(self, prefix: str, title_contains: str) -> int:
+        """Number of sessions matching the list filters."""
+
+    def load_page(
+        self,
+        session_id: str,
+        turns: Optional[int],
+        versions: Optional[int],
+        cursor: Optional[PageCursor],
+    ) -> SessionPage:
+        """Return one page of a session (see load_session_page); this default slices a full load."""
+        payload = self.load(session_id)
+        messages = list(payload.get("messages") or [])
+        all_versions = list(payload.get("versions") or [])
+        meta = {k: v for k, v in payload.items() if k not in ("messages", "versions")}
+        system = messages[0] if messages and messages[0].get("role") == "system" else None
+        first = 1 if system is not None else 0
+
+        end = cursor.messages_before if cursor is not None else len(messages)
+        start = _turns_start([str(m.get("role", "")) for m in messages[first:end]], turns) + first
+        v_end = cursor.versions_before if cursor is not None else len(all_versions)
+        v_start = 0 if versions is None else max(0, v_end - versions)
+        return SessionPage(
+            meta=meta,
+            system=system,
+            messages=messages[start:end],
+            versions=all_versions[v_start:v_end],
+            message_offset=start,
+            version_offset=v_start,
+            total_messages=len(messages),
+            total_versions=len(all_versions),
+        )
+
+    def append_version(self, session_id: str, version: Dict[str, Any]) -> None:
+        """Append one build version to a stored session."""
+        payload = self.load(session_id)
+        payload.setdefault("versions", []).append(version)
+        payload["updated_at"] = _now_iso()
+        self.save(payload)
+
+
+class JsonSessionBackend(SessionBackend):
+    """One pretty-printed JSON file per session, listed through the session catalog (default).
+
+    dedup="blobs" stores assistant texts once in <store>/_blobs and references them by hash;
+    dedup="deltas" additionally stores each draft as a line delta against the previous one
+    (see blob_store.py). Files written without dedup always load.
+    """
+
+    name = "json"
+
+    def __init__(self, base: Path, dedup: str = "", codec: str = "json") -> None:
+        self.base = base
+        self.dedup = dedup
+        self.codec = codec
+        self.blobs: Optional[blob_store.BlobStore] = None
+        if dedup:
+            self.blobs = blob_store.BlobStore(base / blob_store.BLOB_DIRNAME)
+
+    def save(self, payload: Dict[str, Any]) -> None:
+        json_path = _session_path(session_id=payload["session_id"], store_dir=self.base)
+        compact_path = json_path.with_suffix(COMPACT_SUFFIX)
+        stored = payload
+        if self.blobs is not None:
+            stored = blob_store.externalize(payload, self.blobs, deltas=self.dedup == "deltas")
+
+        if self.codec == "json":
+            path, other = json_path, compact_path
+        else:
+            path, other = compact_path, json_path
+        with self._catalog_update(path, payload, replaces=other):
+            if self.codec == "json":
+                _atomic_write_json(path, stored)
+            else:
+                _atomic_write_bytes(path, _encode_container(stored, self.codec))
+            # A session lives in exactly one format; drop the copy written by another codec.
+            other.unlink(missing_ok=True)
+            self._write_page_index(stored)
+
+    # ---------- tail index ----------
+    def _page_index_path(self, session_id: str) -> Path:
+        return self.base / _PAGES_DIRNAME / f"{session_id}.json"
+
+    def _page_sources(self, session_id: str) -> List[Path]:
+        """Files whose contents the tail index was built from."""
+        json_path = _session_path(session_id=session_id, store_dir=self.base)
+        return [json_path, json_path.with_suffix(COMPACT_SUFFIX)]
+
+    def _write_page_index(self, payload: Dict[str, Any]) -> None:
+        """Store the session's first page (see load_page) next to it, after the session file is written.
+
+        `payload` is the payload as stored, so deduplicated drafts stay blob references here too.
+        Call inside _catalog_update: creating the _pages directory bumps the store dir's mtime.
+        """
+        session_id = str(payload["session_id"])
+        messages = list(payload.get("messages") or [])
+        versions = list(payload.get("versions") or [])
+        system = messages[0] if messages and messages[0].get("role") == "system" else None
+        first = 1 if system is not None else 0
+        start = _tail_start(messages, first, DEFAULT_PAGE_TURNS)
+        v_start = max(0, len(versions) - DEFAULT_PAGE_VERSIONS)
+        index = {
+            "page_version": PAGE_INDEX_VERSION,
+            "sources": _file_signature(self._page_sources(session_id)),
+            "meta": {k: v for k, v in payload.items() if k not in ("messages", "versions")},
+            "system": system,
+            "turns": sum(1 for m in messages[start:] if m.get("role") == "user"),
+            "messages": messages[start:],
+            "versions": versions[v_start:],
+            "message_offset": start,
+            "version_offset": v_start,
+            "total_messages": len(messages),
+            "total_versions": len(versions),
+        }
+        path = self._page_index_path(session_id)
+        path.parent.mkdir(exist_ok=True)
+        _atomic_write_json(path, index, indent=None)
+
+    def _read_page_index(self, session_id: str, turns: Optional[int], versions: Optional[int]) -> Optional[SessionPage]:
+        """The first page from the tail index, or None if it is missing, stale or too short for the request."""
+        try:
+            index = _read_json_file(self._page_index_path(session_id))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("page_version") != PAGE_INDEX_VERSION:
+            return None
+        if index.get("sources") != _file_signature(self._page_sources(session_id)):
+            return None  # the session was written since (by another process or an older version)
+        system = index["system"]
+        tail = self._resolve_blobs({"messages": index["messages"], "versions": index["versions"]})
+        messages, stored_versions = tail["messages"], tail["versions"]
+        message_offset, version_offset = index["message_offset"], index["version_offset"]
+        first = 1 if system is not None else 0
+        if message_offset > first and (turns is None or turns > index["turns"]):
+            return None
+        if version_offset > 0 and (versions is None or versions > len(stored_versions)):
+            return None
+        start = _turns_start([str(m.get("role", "")) for m in messages], turns)
+        v_start = 0 if versions is None else max(0, len(stored_versions) - versions)
+        return SessionPage(
+            meta=index["meta"],
+            system=system,
+            messages=messages[start:],
+            versions=stored_versions[v_start:],
+            message_offset=message_offset + start,
+            version_offset=version_offset + v_start,
+            total_messages=index["total_messages"],
+            total_versions=index["total_versions"],
+        )
+
+    def load_page(
+        self,
+        session_id: str,
+        turns: Optional[int],
+        versions: Optional[int],
+        cursor: Optional[PageCursor],
+    ) -> SessionPage:
+        """First pages come from the tail index without decoding the session file.
+
+        Older pages (a cursor), larger pages than the index holds, and sessions whose index is
+        missing or stale fall back to slicing a full load.
+        """
+        if cursor is None:
+            page = self._read_page_index(session_id, turns, versions)
+            if page is not None:
+                return page
+        return super().load_page(session_id, turns, versions, cursor)
+
+    @contextmanager
+    def _catalog_update(self, path: Path, payload: Dict[str, Any], replaces: Optional[Path] = None) -> Iterator[None]:
+        """Run a write of `path`, then record `payload`'s summary in the catalog (one catalog.log append).
+
+        If the catalog was already out of date, its dir mtime is left stale so the next
+        list_sessions reconciles the rest.
+        """
+        base = self.base
+        with _catalog_lock:
+            catalog = _read_catalog(base)
+            in_sync = catalog is not None and catalog.dir_mtime_ns == base.stat().st_mtime_ns
+            yield
+            if catalog is None:
+                return
+            records: List[Dict[str, Any]] = []
+            if replaces is not None and replaces.name in catalog.entries:
+                catalog.remove(replaces.name)
+                records.append({"op": "del", "name": replaces.name})
+            entry = _catalog_entry(path, payload, path.stat().st_mtime_ns)
+            catalog.upsert(path.name, entry)
+            records.append({"op": "put", "name": path.name, "entry": entry})
+            if in_sync:
+                catalog.dir_mtime_ns = base.stat().st_mtime_ns
+                records[-1]["dir_mtime_ns"] = catalog.dir_mtime_ns
+            _append_catalog_log(base, catalog, records)
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        json_path = _session_path(session_id=session_id, store_dir=self.base)
+        compact_path = json_path.with_suffix(COMPACT_SUFFIX)
+        path = json_path
+        if compact_path.exists():
+            # Both exist only after a crash between writing one format and removing the other.
+            if not json_path.exists() or compact_path.stat().st_mtime_ns >= json_path.stat().st_mtime_ns:
+                path = compact_path
+        return self._resolve_blobs(_read_session_file(path))
+
+    def _resolve_blobs(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        blobs = self.blobs or blob_store.BlobStore(self.base / blob_store.BLOB_DIRNAME)
+        return blob_store.internalize(payload, blobs)
+
+    def _read_payload(self, path: Path) -> Dict[str, Any]:
+        """Full payload for a session file found while reconciling the catalog."""
+        return _read_session_file(path)
+
+    def _filtered_view(self, sort_by: str, prefix: str, title_contains: str) -> List[SessionSummary]:
+        """Matching summaries; unfiltered, this is the catalog's shared view (use with _catalog_lock held)."""
+        view = _get_catalog(self.base, self._read_payload).view(sort_by)
+        if prefix or title_contains:
+            needle = title_contains.strip().lower()
+            view = [s for s in view if s.session_id.startswith(prefix) and needle in s.title.lower()]
+        return view
+
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        prefix: str,
+        title_contains: str,
+        sort_by: str,
+        descending: bool,
+    ) -> List[SessionSummary]:
+        with _catalog_lock:
+            view = self._filtered_view(sort_by, prefix, title_contains)
+            if not descending:
+                return view[offset : offset + limit]
+            end = len(view) - offset
+            if end <= 0:
+                return []
+            return view[max(end - limit, 0) : end][::-1]
+
+    def count(self, prefix: str, title_contains: str) -> int:
+        with _catalog_lock:
+            return len(self._filtered_view("updated_at", prefix, title_contains))
+
+    def iter_payloads(self) -> Iterator[Dict[str, Any]]:
+        """Yield every readable session payload in the store (skips corrupt files)."""
+        for p in sorted(p for p in self.base.iterdir() if p.name.endswith(_SESSION_SUFFIXES)):
+            try:
+                data = self._resolve_blobs(self._read_payload(p))
+            except Exception:
+                continue
+            if isinstance(data, dict):
+                data.setdefault("session_id", p.stem)
+                yield data
+
+
+_backends: Dict[Tuple[str, str, str, Path], SessionBackend] = {}
+
+
+def get_backend(store_dir: Optional[str | Path] = None, kind: Optional[str] = None) -> SessionBackend:
+    """Return the storage backend for store_dir.
+
+    kind defaults to env var DND_SESSION_BACKEND: "json" (default), "journal" or "sqlite".
+    For the json backend, env var DND_SESSION_DEDUP selects "" (off, default), "blobs" or "deltas",
+    and DND_SESSION_CODEC selects the file format: "json" (default) or a compressed codec.
+    """
+    kind = (kind or os.getenv("DND_SESSION_BACKEND", "json")).strip().lower() or "json"
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown session backend: {kind!r} (expected one of {BACKENDS})")
+    dedup, codec = "", "json"
+    if kind == "json":
+        dedup = os.getenv("DND_SESSION_DEDUP", "").strip().lower()
+        if dedup in ("0", "off", "false", "no"):
+            dedup = ""
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown DND_SESSION_DEDUP mode: {dedup!r} (expected one of {DEDUP_MODES})")
+        codec = os.getenv("DND_SESSION_CODEC", "json").strip().lower() or "json"
+        if codec not in CODECS:
+            raise ValueError(f"Unknown DND_SESSION_CODEC: {codec!r} (expected one of {CODECS})")
+    base = get_store_dir(store_dir)
+    key = (kind, dedup, codec, base)
+    backend = _backends.get(key)
+    if backend is None:
+        # Local imports: these backends build on this module.
+        if kind == "sqlite":
+            import session_sqlite
+
+            backend = session_sqlite.SqliteSessionBackend(base)
+        elif kind == "journal":
+            import session_journal
+
+            backend = session_journal.JournalSessionBackend(base)
+        else:
+            backend = JsonSessionBackend(base, dedup=dedup, codec=codec)
+        _backends[key] = backend
+    return backend
+
+
 def save_session(payload: Dict[str, Any], store_dir: Optional[str | Path] = None) -> None:
-    """Persist a full session payload to disk."""
+    """Persist a full session payload."""
     session_id = payload.get("session_id")
     if not session_id:
         raise ValueError("payload.session_id is required")
@@ -68,36 +833,86 @@ def save_session(payload: Dict[str, Any], store_dir: Optional[str | Path] = None
     now = _now_iso()
     payload.setdefault("created_at", now)
     payload["updated_at"] = now
-
-    path = _session_path(session_id=session_id, store_dir=store_dir)
-    _atomic_write_json(path, payload)
+    payload["schema_version"] = SCHEMA_VERSION
+    with turn_metrics.span("store.save"):
+        try:
+            get_backend(store_dir).save(payload)
+        except FileNotFoundError:
+            # The store directory was removed after get_store_dir set it up: recreate it, retry once.
+            get_store_dir(store_dir).mkdir(parents=True, exist_ok=True)
+            get_backend(store_dir).save(payload)
 
 
 def load_session(session_id: str, store_dir: Optional[str | Path] = None) -> Dict[str, Any]:
-    """Load a session payload from disk."""
-    path = _session_path(session_id=session_id, store_dir=store_dir)
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load a session payload."""
+    with turn_metrics.span("store.load"):
+        return get_backend(store_dir).load(session_id)
+
+
+def load_session_page(
+    session_id: str,
+    store_dir: Optional[str | Path] = None,
+    turns: Optional[int] = DEFAULT_PAGE_TURNS,
+    versions: Optional[int] = DEFAULT_PAGE_VERSIONS,
+    cursor: Optional[PageCursor] = None,
+) -> SessionPage:
+    """Load metadata, the system message and the last `turns` turns / `versions` versions.
+
+    Pass a page's `cursor` to get the turns and versions before it; turns=None / versions=None
+    return everything older. On SQLite only the requested rows are read.
+    """
+    with turn_metrics.span("store.load_page"):
+        return get_backend(store_dir).load_page(session_id, turns, versions, cursor)
+
+
+def list_sessions(
+    store_dir: Optional[str | Path] = None,
+    limit: int = 50,
+    offset: int = 0,
+    prefix: str = "",
+    title_contains: str = "",
+    sort_by: str = "updated_at",
+    descending: bool = True,
+) -> List[SessionSummary]:
+    """List sessions without opening session bodies.
+
+    Default order is updated_at (desc). `prefix` filters on session_id, `title_contains` is a
+    case-insensitive title match; `offset`/`limit` page through the result.
+    """
+    if sort_by not in _SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {_SORT_KEYS}")
+    with turn_metrics.span("store.list"):
+        return get_backend(store_dir).list(limit, offset, prefix, title_contains, sort_by, descending)
 
 
-def list_sessions(store_dir: Optional[str | Path] = None, limit: int = 50) -> List[SessionSummary]:
-    """List sessions sorted by updated_at (desc)."""
-    base = get_store_dir(store_dir)
-    summaries: List[SessionSummary] = []
+def count_sessions(store_dir: Optional[str | Path] = None, prefix: str = "", title_contains: str = "") -> int:
+    """Number of sessions matching the same filters as list_sessions."""
+    return get_backend(store_dir).count(prefix, title_contains)
 
-    for p in base.glob("*.json"):
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            session_id = str(data.get("session_id") or p.stem)
-            title = str(data.get("title") or "").strip()
-            updated_at = str(data.get("updated_at") or "")
-            summaries.append(SessionSummary(session_id=session_id, title=title, updated_at=updated_at))
-        except Exception:
-            continue
 
-    summaries.sort(key=lambda s: s.updated_at, reverse=True)
-    return summaries[:limit]
+def append_build_version(session_id: str, version: Dict[str, Any], store_dir: Optional[str | Path] = None) -> None:
+    """Append a version from create_build_version to a stored session (one insert on SQLite)."""
+    get_backend(store_dir).append_version(session_id, version)
+
+
+def migrate_json_store(
+    source_dir: Optional[str | Path] = None,
+    store_dir: Optional[str | Path] = None,
+    kind: str = "sqlite",
+) -> int:
+    """Import every JSON session file from source_dir into the `kind` backend at store_dir.
+
+    Timestamps are kept as stored. Returns the number of sessions imported.
+    """
+    source = JsonSessionBackend(get_store_dir(source_dir))
+    target = get_backend(store_dir if store_dir is not None else source_dir, kind=kind)
+    count = 0
+    for payload in source.iter_payloads():
+        payload.setdefault("created_at", payload.get("updated_at") or _now_iso())
+        payload.setdefault("updated_at", payload["created_at"])
+        target.save(payload)
+        count += 1
+    return count
 
 
 def create_build_version(
@@ -128,3 +943,21 @@ def create_build_version(
         "homebrew": bool(homebrew),
         "assistant_text": latest_assistant,
     }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Session store maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import a JSON session directory into another backend")
+    migrate.add_argument("--from", dest="source", default=None, help="JSON store dir (default: $DND_SESSION_STORE_DIR)")
+    migrate.add_argument("--to", dest="target", default=None, help="target store dir (default: same as --from)")
+    migrate.add_argument("--backend", default="sqlite", choices=[b for b in BACKENDS if b != "json"])
+    args = parser.parse_args(argv)
+
+    count = migrate_json_store(args.source, args.target, kind=args.backend)
+    print(f"Imported {count} session(s) into the {args.backend} backend at {get_store_dir(args.target or args.source)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+"""Offline SRD snapshot bundle.
+
+One versioned file holds every SRD entity the app grounds on, so grounding keeps working
+without the `dnd-srd-mongo` service.
+
+File layout:
+- magic `SRDB1\\n`
+- 8-byte little-endian header length
+- header JSON: format, version (from /meta), created_at, meta, index {entity_type: {name: [offset, length]}}
+- body: compact JSON documents, back to back (offsets are relative to the body start)
+
+Readers memory-map the file and decode only the entity they are asked for.
+
+Usage:
+    python srd_bundle.py dump --base-url http://127.0.0.1:8000 [--out .local/srd_bundle.srdb]
+    python srd_bundle.py info [.local/srd_bundle.srdb]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import srd_client
+
+BUNDLE_FORMAT = 1
+DEFAULT_BUNDLE_PATH = ".local/srd_bundle.srdb"
+
+_MAGIC = b"SRDB1\n"
+_HEADER_LEN = struct.Struct("<Q")
+
+
+def get_bundle_path(path: Optional[str | Path] = None) -> Path:
+    """Return the bundle path (override with env var SRD_BUNDLE_PATH)."""
+    if path is None:
+        path = os.getenv("SRD_BUNDLE_PATH", DEFAULT_BUNDLE_PATH)
+    return Path(path).expanduser()
+
+
+def bundle_version(meta: Dict[str, Any]) -> str:
+    """Version stamp for a /meta payload: its `version` field, else a hash of the payload."""
+    for key in ("version", "srd_version", "data_version"):
+        value = meta.get(key)
+        if isinstance(value, (str, int, float)) and str(value).strip():
+            return str(value).strip()
+    canonical = json.dumps(meta, sort_keys=True, separators=(",", ":"))
+    return "sha1:" + hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def write_bundle(path: str | Path, meta: Dict[str, Any], entities: Dict[str, Dict[str, Any]]) -> Path:
+    """Write {entity_type: {name: payload}} as a bundle stamped with the /meta version."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    body = bytearray()
+    index: Dict[str, Dict[str, List[int]]] = {}
+    for entity_type in sorted(entities):
+        index[entity_type] = {}
+        for name in sorted(entities[entity_type]):
+            doc = json.dumps(entities[entity_type][name], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            index[entity_type][name.strip().lower()] = [len(body), len(doc)]
+            body += doc
+
+    header = json.dumps(
+        {
+            "format": BUNDLE_FORMAT,
+            "version": bundle_version(meta),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "meta": meta,
+            "index": index,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        f.write(body)
+    tmp_path.replace(path)
+    return path
+
+
+class SrdBundle:
+    """Read-only, memory-mapped view of a bundle file. Decoded entities are memoized."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mm[: len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"not an SRD bundle: {self.path}")
+            start = len(_MAGIC) + _HEADER_LEN.size
+            (header_len,) = _HEADER_LEN.unpack(self._mm[len(_MAGIC) : start])
+            header = json.loads(self._mm[start : start + header_len].decode("utf-8"))
+            if header.get("format") != BUNDLE_FORMAT:
+                raise ValueError(f"unsupported SRD bundle format: {header.get('format')}")
+        except Exception:
+            self._mm.close()
+            raise
+
+        self._body_start = start + header_len
+        self.version: str = str(header.get("version", ""))
+        self.created_at: str = str(header.get("created_at", ""))
+        self.meta: Dict[str, Any] = header.get("meta") or {}
+        self._index: Dict[str, Dict[str, List[int]]] = header.get("index") or {}
+        self._decoded: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def entity_types(self) -> List[str]:
+        return sorted(self._index)
+
+    def names(self, entity_type: str) -> List[str]:
+        return sorted(self._index.get(entity_type, {}))
+
+    def get(self, entity_type: str, name: str) -> Optional[Any]:
+        """Return the decoded entity, or None if the bundle does not contain it."""
+        key = (entity_type, name.strip().lower())
+        cached = self._decoded.get(key)
+        if cached is not None:
+            return cached
+        loc = self._index.get(entity_type, {}).get(key[1])
+        if loc is None:
+            return None
+        offset, length = loc
+        begin = self._body_start + offset
+        value = json.loads(self._mm[begin : begin + length].decode("utf-8"))
+        if isinstance(value, dict):
+            value = srd_client.SrdPayload(value)
+        with self._lock:
+            self._decoded[key] = value
+        return value
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def dump_bundle(base_url: str, path: Optional[str | Path] = None) -> Tuple[Optional[Path], Optional[str]]:
+    """Download every entity advertised by /meta into a bundle. Returns (path, error)."""
+    meta, err = srd_client.get_meta(base_url)
+    if err or meta is None:
+        return None, err
+
+    # The grounding API serves classes only; the format is keyed by entity type for later additions.
+    results = srd_client.get_many(base_url, srd_client.meta_class_names(meta))
+    for name, (_, error) in results.items():
+        if error:
+            return None, f"Could not fetch classes/{name}: {error}"
+    entities = {"classes": {name: payload for name, (payload, _) in results.items()}}
+
+    return write_bundle(get_bundle_path(path), meta, entities), None
+
+
+def activate_bundle(base_url: str, path: Optional[str | Path] = None) -> Tuple[Optional[SrdBundle], str]:
+    """Open the local bundle and install it as srd_client's read path if it should be used.
+
+    - Service reachable and versions match: serve from the bundle (no network per turn).
+    - Service reachable and versions differ: keep using the live API.
+    - Service unreachable or not configured: run offline from the bundle.
+
+    Returns (bundle or None, human-readable status).
+    """
+    bundle_path = get_bundle_path(path)
+    if not bundle_path.is_file():
+        return None, "No offline SRD bundle."
+    try:
+        bundle = SrdBundle(bundle_path)
+    except Exception as e:
+        return None, f"Offline SRD bundle unreadable: {e}"
+
+    if base_url:
+        meta, err = srd_client.get_meta(base_url)
+        if not err and meta is not None:
+            live = bundle_version(meta)
+            if live != bundle.version:
+                bundle.close()
+                return None, f"Offline SRD bundle is stale ({bundle.version} != {live}); using live SRD API."
+            srd_client.use_bundle(bundle)
+            return bundle, f"Offline SRD bundle {bundle.version} matches the live SRD API."
+
+    srd_client.use_bundle(bundle)
+    return bundle, f"SRD API unavailable; grounding offline from bundle {bundle.version}."
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline SRD snapshot bundle.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dump = sub.add_parser("dump", help="download the SRD dataset into a bundle")
+    dump.add_argument("--base-url", default=os.getenv("SRD_API_BASE_URL", ""))
+    dump.add_argument("--out", default=None, help=f"bundle path (default: $SRD_BUNDLE_PATH or {DEFAULT_BUNDLE_PATH})")
+
+    info = sub.add_parser("info", help="print bundle version and contents")
+    info.add_argument("path", nargs="?", default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "dump":
+        if not args.base_url:
+            parser.error("--base-url (or SRD_API_BASE_URL) is required")
+        out, err = dump_bundle(args.base_url, args.out)
+        if err:
+            print(f"Dump failed: {err}")
+            return 1
+        print(f"Wrote {out}")
+        return 0
+
+    bundle = SrdBundle(get_bundle_path(args.path))
+    try:
+        print(f"version: {bundle.version}")
+        print(f"created_at: {bundle.created_at}")
+        for entity_type in bundle.entity_types():
+            print(f"{entity_type}: {', '.join(bundle.names(entity_type))}")
+    finally:
+        bundle.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,40 +1,600 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import hashlib
+import http.client
 import json
+import random
+import threading
+import time
 import urllib.error
-import urllib.request
-from typing import Any, Optional, Tuple
+import urllib.parse
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
 
+import turn_metrics
 
+
+# Read timeout (per socket read); connecting gets its own, shorter budget.
 DEFAULT_TIMEOUT_S = 2.5
+DEFAULT_CONNECT_TIMEOUT_S = 0.5
+
+# Retries for transient failures of these idempotent GETs (connection errors, timeouts,
+# 429/5xx), with full-jitter exponential backoff.
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_S = 0.1
+DEFAULT_MAX_BACKOFF_S = 1.0
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Circuit breaker per SRD base URL: after this many consecutive failed fetches, fetches fail
+# fast (no network I/O) for the cool-down; then one probe decides whether to close it again.
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN_S = 30.0
+
+# Keep-alive connection pool (one set of idle connections per scheme/host/port).
+DEFAULT_POOL_MAX_IDLE_PER_HOST = 8
+DEFAULT_POOL_IDLE_TIMEOUT_S = 30.0
+_MAX_REDIRECTS = 3
+_REQUEST_HEADERS = {"Accept": "application/json", "Connection": "keep-alive"}
+
+# Class payload cache (SRD data changes rarely; every chat turn re-grounds).
+DEFAULT_CACHE_MAX_ENTRIES = 64
+DEFAULT_CACHE_TTL_S = 300.0
+# How long past the TTL an entry may still be served while it refreshes in the background.
+DEFAULT_CACHE_STALE_S = 3600.0
+
+# Max concurrent class fetches for the asyncio client (startup warm-up, multiclass grounding).
+DEFAULT_ASYNC_CONCURRENCY = 4
+
+# Background grounding fetches started ahead of the chat turn that needs them.
+_PREFETCH_WORKERS = 4
+
+
+def content_digest(value: Any) -> str:
+    """Stable SHA-1 of a JSON-like value's content (key order does not matter)."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> None:
+    raise TypeError("SRD payloads are shared and read-only; copy with dict(payload) to edit")
+
+
+class SrdPayload(dict):
+    """A payload as served by get_class (network or bundle), with its content digest taken once on load.
+
+    Payloads are shared by every caller of the cache and the bundle, so top-level writes
+    raise TypeError (treat nested values as read-only too). `digest` lets consumers memoize
+    derived data per content without re-hashing the payload on every turn.
+    """
+
+    __slots__ = ("digest",)
+
+    def __init__(self, data: Dict[str, Any], digest: Optional[str] = None) -> None:
+        super().__init__(data)
+        self.digest = digest or content_digest(data)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (SrdPayload, (dict(self), self.digest))
+
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = _read_only  # type: ignore[assignment]
+    __ior__ = _read_only  # type: ignore[assignment]
+
+
+class ConnectionPool:
+    """Per-host pool of reusable HTTP/1.1 keep-alive connections.
+
+    Idle connections are kept per (scheme, host, port) up to max_idle_per_host and closed
+    once they have been idle longer than idle_timeout_s. Thread-safe: a connection is
+    owned by exactly one request between acquire and release.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = DEFAULT_POOL_MAX_IDLE_PER_HOST,
+        idle_timeout_s: float = DEFAULT_POOL_IDLE_TIMEOUT_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_idle_per_host = int(max_idle_per_host)
+        self.idle_timeout_s = float(idle_timeout_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, str, int], Deque[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._stats = {"created": 0, "reused": 0, "discarded": 0, "idle_evicted": 0}
+
+    def request(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        connect_timeout_s: Optional[float] = None,
+    ) -> Tuple[int, str, bytes, Dict[str, str]]:
+        """GET url over a pooled connection. Returns (status, reason, body, headers).
+
+        New connections must connect within connect_timeout_s (default: timeout_s); each read
+        then gets timeout_s. A reused connection that the server has already closed is retried
+        once on a fresh connection (safe: only idempotent GETs go through the pool).
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout_s)
+            try:
+                if conn.sock is None:
+                    conn.timeout = timeout_s if connect_timeout_s is None else connect_timeout_s
+                    conn.connect()
+                    conn.sock.settimeout(timeout_s)
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError) as e:
+                self._discard(conn)
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(e) from e
+            except BaseException:
+                self._discard(conn)
+                raise
+            if resp.will_close:
+                self._discard(conn)
+            else:
+                self._release(key, conn)
+            return resp.status, resp.reason, body, {k.lower(): v for k, v in resp.getheaders()}
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["idle"] = sum(len(c) for c in self._idle.values())
+            return out
+
+    def _acquire(self, key: Tuple[str, str, int], timeout_s: float) -> Tuple[http.client.HTTPConnection, bool]:
+        now = self._clock()
+        expired = []
+        conn = None
+        with self._lock:
+            conns = self._idle.get(key)
+            while conns:
+                candidate, idle_since = conns.pop()  # most recently used first
+                if now - idle_since > self.idle_timeout_s:
+                    expired.append(candidate)
+                    continue
+                conn = candidate
+                break
+            self._stats["idle_evicted"] += len(expired)
+            if conn is not None:
+                self._stats["reused"] += 1
+            else:
+                self._stats["created"] += 1
+        for old in expired:
+            old.close()
+
+        if conn is not None:
+            conn.timeout = timeout_s
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout_s)
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout_s), False
+        return http.client.HTTPConnection(host, port, timeout=timeout_s), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        now = self._clock()
+        evicted = []
+        with self._lock:
+            conns = self._idle.setdefault(key, deque())
+            while conns and now - conns[0][1] > self.idle_timeout_s:
+                evicted.append(conns.popleft()[0])
+            self._stats["idle_evicted"] += len(evicted)
+            if len(conns) < self.max_idle_per_host:
+                conns.append((conn, now))
+                conn = None
+            else:
+                self._stats["discarded"] += 1
+        for old in evicted:
+            old.close()
+        if conn is not None:
+            conn.close()
+
+    def _discard(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._stats["discarded"] += 1
+        conn.close()
+
+
+_pool = ConnectionPool()
+
+
+def configure_pool(
+    max_idle_per_host: int = DEFAULT_POOL_MAX_IDLE_PER_HOST,
+    idle_timeout_s: float = DEFAULT_POOL_IDLE_TIMEOUT_S,
+) -> None:
+    """Replace the process-wide connection pool (closing the old pool's idle connections)."""
+    global _pool
+    old, _pool = _pool, ConnectionPool(max_idle_per_host=max_idle_per_host, idle_timeout_s=idle_timeout_s)
+    old.close()
+
+
+def pool_stats() -> Dict[str, int]:
+    """Counters for the connection pool: created, reused, discarded, idle_evicted, idle."""
+    return _pool.stats()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retries for transient fetch failures; attempt n waits uniform(0, min(max_backoff_s, backoff_s * 2**n))."""
+
+    retries: int = DEFAULT_RETRIES
+    backoff_s: float = DEFAULT_BACKOFF_S
+    max_backoff_s: float = DEFAULT_MAX_BACKOFF_S
+    connect_timeout_s: float = DEFAULT_CONNECT_TIMEOUT_S
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.max_backoff_s, self.backoff_s * 2**attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed -> open (fail fast) -> half_open (one probe).
+
+    Only transient failures count (an HTTP 404 or a malformed body means the service is up).
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        cooldown_s: float = DEFAULT_BREAKER_COOLDOWN_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if threshold < 1:
+            raise ValueError("threshold must be >= 1")
+        self.threshold = int(threshold)
+        self.cooldown_s = float(cooldown_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        """Whether a fetch may go out now. After the cool-down, lets exactly one probe through."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and self._clock() - self._opened_at >= self.cooldown_s:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.threshold):
+                if self._opened_at is None:
+                    self._stats["opened"] += 1
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def state(self) -> str:
+        """One of "closed", "open" (failing fast) or "half_open" (cool-down over, next fetch probes)."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self._clock() - self._opened_at >= self.cooldown_s:
+                return "half_open"
+            return "open"
+
+    def retry_in(self) -> float:
+        """Seconds left in the cool-down (0 when closed or cooled down)."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown_s - (self._clock() - self._opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"state": self.state()}
+        with self._lock:
+            out.update(self._stats, consecutive_failures=self._failures)
+        return out
+
+
+_retry_policy = RetryPolicy()
+_breaker_settings = (DEFAULT_BREAKER_THRESHOLD, DEFAULT_BREAKER_COOLDOWN_S)
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def configure_retries(
+    retries: int = DEFAULT_RETRIES,
+    backoff_s: float = DEFAULT_BACKOFF_S,
+    max_backoff_s: float = DEFAULT_MAX_BACKOFF_S,
+    connect_timeout_s: float = DEFAULT_CONNECT_TIMEOUT_S,
+) -> None:
+    """Replace the process-wide retry policy (retries=0 disables retrying)."""
+    global _retry_policy
+    _retry_policy = RetryPolicy(
+        retries=max(0, int(retries)),
+        backoff_s=float(backoff_s),
+        max_backoff_s=float(max_backoff_s),
+        connect_timeout_s=float(connect_timeout_s),
+    )
+
+
+def configure_breaker(threshold: int = DEFAULT_BREAKER_THRESHOLD, cooldown_s: float = DEFAULT_BREAKER_COOLDOWN_S) -> None:
+    """Set the circuit breaker settings and reset every breaker to closed."""
+    global _breaker_settings
+    if threshold < 1:
+        raise ValueError("threshold must be >= 1")
+    with _breakers_lock:
+        _breaker_settings = (int(threshold), float(cooldown_s))
+        _breakers.clear()
+
+
+def _breaker(base: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(base)
+        if breaker is None:
+            threshold, cooldown_s = _breaker_settings
+            breaker = _breakers[base] = CircuitBreaker(threshold=threshold, cooldown_s=cooldown_s)
+        return breaker
+
+
+def breaker_state(base_url: str) -> str:
+    """Circuit state for an SRD base URL: "closed", "open" or "half_open"."""
+    return _breaker(base_url.rstrip("/")).state()
+
+
+def breaker_stats(base_url: str) -> Dict[str, Any]:
+    """State, consecutive_failures, opened and rejected counters for an SRD base URL."""
+    return _breaker(base_url.rstrip("/")).stats()
 
 
 def fetch_json(base_url: str, path: str, timeout_s: float = DEFAULT_TIMEOUT_S) -> Tuple[Optional[Any], Optional[str]]:
     """
-    Fetch JSON from base_url + path.
+    Fetch JSON from base_url + path over the pooled keep-alive transport.
     Returns: (data, error_message). Exactly one of them is None.
+
+    Transient failures are retried per the retry policy; while the base URL's circuit is
+    open the call returns an error immediately without touching the network.
     """
     base = base_url.rstrip("/")
     p = path if path.startswith("/") else f"/{path}"
-    url = f"{base}{p}"
+    breaker = _breaker(base)
+    if not breaker.allow():
+        turn_metrics.count("srd.breaker_rejections")
+        return None, f"SRD service unavailable for {p}: circuit open (retry in {breaker.retry_in():.0f}s)"
 
+    policy = _retry_policy
+    with turn_metrics.span("srd.fetch", path=p):
+        for attempt in range(policy.retries + 1):
+            data, err, transient = _fetch_json(f"{base}{p}", p, timeout_s, policy.connect_timeout_s)
+            if not transient or attempt == policy.retries:
+                break
+            turn_metrics.count("srd.fetch_retries")
+            time.sleep(policy.delay(attempt))
+    if transient:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if err:
+        turn_metrics.count("srd.fetch_errors")
+    return data, err
+
+
+def _fetch_json(url: str, p: str, timeout_s: float, connect_timeout_s: Optional[float] = None) -> Tuple[Optional[Any], Optional[str], bool]:
+    """(data, error, transient): transient errors are worth retrying and count against the breaker."""
     try:
-        req = urllib.request.Request(url, headers={"Accept": "application/json"})
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            raw = resp.read().decode("utf-8")
-        return json.loads(raw), None
-    except urllib.error.HTTPError as e:
-        try:
-            body = e.read().decode("utf-8")
-        except Exception:
-            body = ""
-        return None, f"HTTP {e.code} for {p}: {body or e.reason}"
+        for _ in range(_MAX_REDIRECTS + 1):
+            status, reason, body, headers = _pool.request(
+                url, _REQUEST_HEADERS, timeout_s=timeout_s, connect_timeout_s=connect_timeout_s
+            )
+            if status in (301, 302, 303, 307, 308) and headers.get("location"):
+                url = urllib.parse.urljoin(url, headers["location"])
+                continue
+            break
+        if status >= 400 or status in (301, 302, 303, 307, 308):
+            text = body.decode("utf-8", errors="replace")
+            return None, f"HTTP {status} for {p}: {text or reason}", status in _RETRYABLE_STATUSES
+        return json.loads(body.decode("utf-8")), None, False
     except urllib.error.URLError as e:
-        return None, f"URL error for {p}: {e.reason}"
+        return None, f"URL error for {p}: {e.reason}", True
     except json.JSONDecodeError as e:
-        return None, f"Invalid JSON for {p}: {e.msg}"
+        return None, f"Invalid JSON for {p}: {e.msg}", False
+    except (OSError, http.client.HTTPException) as e:
+        return None, f"URL error for {p}: {e}", True
     except Exception as e:
-        return None, f"Unexpected error for {p}: {e}"
+        return None, f"Unexpected error for {p}: {e}", False
+
+
+class _Flight:
+    """A single in-flight load that concurrent callers for the same key wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Tuple[Optional[Any], Optional[str]] = (None, "fetch did not complete")
+
+
+class TTLCache:
+    """Bounded LRU cache with TTL, stale-while-revalidate and single-flight loads.
+
+    - Fresh entries (age <= ttl_s) are returned directly.
+    - Stale entries (ttl_s < age <= ttl_s + stale_s) are returned immediately while
+      one background thread refreshes them.
+    - Misses are coalesced: concurrent callers for the same key share one loader call.
+    - Errors are never cached.
+
+    Thread-safe. Cached values are shared between callers; treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        ttl_s: float = DEFAULT_CACHE_TTL_S,
+        stale_s: float = DEFAULT_CACHE_STALE_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = int(max_entries)
+        self.ttl_s = float(ttl_s)
+        self.stale_s = float(stale_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Tuple[Optional[Any], Optional[str]]],
+    ) -> Tuple[Optional[Any], Optional[str]]:
+        """Return (value, error) for key, calling loader() at most once per miss across threads."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = self._clock() - fetched_at
+                if age <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value, None
+                if age <= self.ttl_s + self.stale_s:
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    if key not in self._flights:
+                        flight = self._flights[key] = _Flight()
+                        threading.Thread(
+                            target=self._run_flight,
+                            args=(key, loader, flight, True),
+                            name="srd-cache-refresh",
+                            daemon=True,
+                        ).start()
+                    return value, None
+                # Too old to serve: drop it and load synchronously.
+                del self._entries[key]
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                self._stats["misses"] += 1
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if leader:
+            self._run_flight(key, loader, flight, False)
+        else:
+            flight.done.wait()
+        return flight.result
+
+    def contains(self, key: Hashable) -> bool:
+        """Whether get_or_load(key) would be served from the cache (fresh or stale) without waiting on a load."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and self._clock() - entry[1] <= self.ttl_s + self.stale_s
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or replace a fresh entry (evicting the least recently used one if full)."""
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of hit/miss/eviction counters plus the current size."""
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._entries)
+            return out
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _run_flight(
+        self,
+        key: Hashable,
+        loader: Callable[[], Tuple[Optional[Any], Optional[str]]],
+        flight: _Flight,
+        is_refresh: bool,
+    ) -> None:
+        try:
+            value, err = loader()
+        except Exception as e:  # loaders are expected to return errors, but never wedge waiters
+            value, err = None, f"Unexpected error: {e}"
+
+        with self._lock:
+            if is_refresh:
+                self._stats["refreshes"] += 1
+            if err is None:
+                self._store(key, value)
+            elif is_refresh:
+                # Keep serving the stale entry; the next stale hit retries the refresh.
+                self._stats["refresh_errors"] += 1
+            self._flights.pop(key, None)
+            flight.result = (value, err)
+        flight.done.set()
+
+
+_class_cache = TTLCache()
+# Optional offline SRD bundle (see srd_bundle.py); checked before the cache and the network.
+_bundle: Optional[Any] = None
+
+
+def configure_class_cache(
+    max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+    ttl_s: float = DEFAULT_CACHE_TTL_S,
+    stale_s: float = DEFAULT_CACHE_STALE_S,
+) -> None:
+    """Replace the process-wide class payload cache (drops existing entries and counters)."""
+    global _class_cache
+    _class_cache = TTLCache(max_entries=max_entries, ttl_s=ttl_s, stale_s=stale_s)
+
+
+def class_cache_stats() -> Dict[str, int]:
+    """Counters for the class payload cache: hits, stale_hits, misses, coalesced, evictions, refreshes, size."""
+    return _class_cache.stats()
 
 
 def get_meta(base_url: str) -> Tuple[Optional[dict], Optional[str]]:
@@ -46,10 +606,154 @@ def get_meta(base_url: str) -> Tuple[Optional[dict], Optional[str]]:
     return data, None
 
 
-def get_class(base_url: str, name: str) -> Tuple[Optional[dict], Optional[str]]:
+def _fetch_class(base_url: str, name: str) -> Tuple[Optional[dict], Optional[str]]:
     data, err = fetch_json(base_url, f"/classes/{name}")
     if err:
         return None, err
     if not isinstance(data, dict):
         return None, "Invalid /classes/{name} payload (expected object)"
-    return data, None
+    return SrdPayload(data), None
+
+
+def use_bundle(bundle: Optional[Any]) -> None:
+    """Serve get_class from an offline bundle (anything with .get(entity_type, name)); None to disable."""
+    global _bundle
+    _bundle = bundle
+
+
+def active_bundle() -> Optional[Any]:
+    return _bundle
+
+
+def get_class(base_url: str, name: str, use_cache: bool = True) -> Tuple[Optional[dict], Optional[str]]:
+    """Fetch a class payload.
+
+    Served from the offline bundle when one is installed (no network I/O), otherwise from the
+    process-wide TTL cache unless use_cache is False.
+    """
+    bundle = _bundle
+    if bundle is not None:
+        data = bundle.get("classes", name)
+        if isinstance(data, dict):
+            turn_metrics.count("srd.bundle_hits")
+            return data, None
+        if not base_url:
+            return None, f"Not in offline SRD bundle: /classes/{name}"
+    if not use_cache:
+        return _fetch_class(base_url, name)
+    key = (base_url.rstrip("/"), name.strip().lower())
+    loaded = []
+
+    def load() -> Tuple[Optional[dict], Optional[str]]:
+        loaded.append(True)
+        return _fetch_class(base_url, name)
+
+    result = _class_cache.get_or_load(key, load)
+    turn_metrics.count("srd.cache_misses" if loaded else "srd.cache_hits")
+    return result
+
+
+def class_cached(base_url: str, name: str) -> bool:
+    """Whether get_class(base_url, name) is answered without a blocking fetch (bundle or class cache)."""
+    bundle = _bundle
+    if bundle is not None and isinstance(bundle.get("classes", name), dict):
+        return True
+    return _class_cache.contains((base_url.rstrip("/"), name.strip().lower()))
+
+
+def meta_class_names(meta: dict) -> List[str]:
+    """Extract the class names advertised by /meta (list of names or of {"index"/"name": ...} objects)."""
+    raw = meta.get("classes")
+    if isinstance(raw, dict):
+        raw = list(raw.keys())
+    if not isinstance(raw, list):
+        return []
+
+    names: List[str] = []
+    for item in raw:
+        if isinstance(item, dict):
+            item = item.get("index") or item.get("name")
+        if isinstance(item, str) and item.strip():
+            name = item.strip().lower()
+            if name not in names:
+                names.append(name)
+    return names
+
+
+class AsyncSrdClient:
+    """asyncio facade over the cached, pooled sync client.
+
+    Each fetch runs in a worker thread (the transport is blocking http.client), so it shares
+    the process-wide class cache and connection pool with get_class(). At most `concurrency`
+    fetches per client are in flight at once.
+    """
+
+    def __init__(self, base_url: str, concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.base_url = base_url
+        self.concurrency = int(concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def get_meta(self) -> Tuple[Optional[dict], Optional[str]]:
+        async with self._limit():
+            return await asyncio.to_thread(get_meta, self.base_url)
+
+    async def get_class(self, name: str) -> Tuple[Optional[dict], Optional[str]]:
+        async with self._limit():
+            return await asyncio.to_thread(get_class, self.base_url, name)
+
+    async def get_many(self, names: Iterable[str]) -> Dict[str, Tuple[Optional[dict], Optional[str]]]:
+        """Fetch several classes concurrently. Returns {name: (payload, error)} in input order."""
+        unique = list(dict.fromkeys(names))
+        results = await asyncio.gather(*(self.get_class(n) for n in unique))
+        return dict(zip(unique, results))
+
+    async def warm_up(self) -> Dict[str, Any]:
+        """Read /meta and load every advertised class into the class cache.
+
+        Returns a small report: {"classes": [...], "loaded": n, "errors": {name: error}}.
+        """
+        meta, err = await self.get_meta()
+        if err or meta is None:
+            return {"classes": [], "loaded": 0, "errors": {"/meta": err}}
+        names = meta_class_names(meta)
+        results = await self.get_many(names)
+        errors = {n: e for n, (_, e) in results.items() if e}
+        return {"classes": names, "loaded": len(names) - len(errors), "errors": errors}
+
+
+def get_many(base_url: str, names: Iterable[str], concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> Dict[str, Tuple[Optional[dict], Optional[str]]]:
+    """Sync entry point for AsyncSrdClient.get_many (call from threads without a running event loop)."""
+    return asyncio.run(AsyncSrdClient(base_url, concurrency=concurrency).get_many(names))
+
+
+def warm_up(base_url: str, concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> Dict[str, Any]:
+    """Sync entry point for AsyncSrdClient.warm_up (call from threads without a running event loop)."""
+    return asyncio.run(AsyncSrdClient(base_url, concurrency=concurrency).warm_up())
+
+
+_prefetch_lock = threading.Lock()
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+
+
+def prefetch_many(
+    base_url: str, names: Iterable[str], concurrency: int = DEFAULT_ASYNC_CONCURRENCY
+) -> "Future[Dict[str, Tuple[Optional[dict], Optional[str]]]]":
+    """Run get_many on a background thread and return its future.
+
+    The fetch keeps running if the caller stops waiting (e.g. a grounding deadline passed);
+    its results still land in the class cache, so the next turn is grounded from cache.
+    It runs in a copy of the caller's context, so its fetches are timed in the caller's turn.
+    """
+    global _prefetch_executor
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=_PREFETCH_WORKERS, thread_name_prefix="srd-prefetch")
+        executor = _prefetch_executor
+    return executor.submit(contextvars.copy_context().run, get_many, base_url, list(names), concurrency)
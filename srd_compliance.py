@@ -0,0 +1,239 @@
+"""Streaming SRD-compliance check for assistant output.
+
+The system prompt asks the model to stay SRD-only; this checks what it actually writes.
+A ComplianceChecker consumes the response chunk by chunk as it streams and reports names
+from a denylist of non-SRD publications, settings and options (srd_vocab.Automaton, so each
+character is scanned once: no rescanning of the accumulated text, constant work per chunk
+character). Names that occur inside an allowlisted (grounded) name are exempt.
+
+Modes (DND_SRD_COMPLIANCE, env or st.secrets): "flag" (default; report after the response),
+"cut" (stop the stream before the first violation) or "off"; anything else warns and means "flag".
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from srd_vocab import Automaton
+
+MODES = ("flag", "cut", "off")
+_log = logging.getLogger(__name__)
+_warned_modes: set = set()
+
+# Publication titles/abbreviations and setting names (never SRD).
+DENYLIST_PUBLICATIONS = (
+    "Player's Handbook",
+    "Players Handbook",
+    "PHB",
+    "Dungeon Master's Guide",
+    "Monster Manual",
+    "Xanathar",
+    "Tasha",
+    "Volo",
+    "Mordenkainen",
+    "Fizban",
+    "Sword Coast",
+    "Forgotten Realms",
+    "Faerûn",
+    "Faerun",
+    "Waterdeep",
+    "Baldur's Gate",
+    "Eberron",
+    "Ravenloft",
+    "Theros",
+    "Strixhaven",
+    "Spelljammer",
+    "Wildemount",
+    "Exandria",
+)
+# Non-SRD character options commonly suggested for the shipped classes.
+DENYLIST_OPTIONS = (
+    "Battle Master",
+    "Eldritch Knight",
+    "Arcane Archer",
+    "Echo Knight",
+    "Psi Warrior",
+    "Rune Knight",
+    "Purple Dragon Knight",
+    "Path of the Totem Warrior",
+    "Totem Warrior",
+    "Path of the Zealot",
+    "Ancestral Guardian",
+    "Storm Herald",
+    "Path of Wild Magic",
+    "College of Valor",
+    "College of Swords",
+    "College of Glamour",
+    "College of Whispers",
+    "College of Eloquence",
+    "College of Creation",
+    "Bladesinging",
+    "Bladesinger",
+    "School of Divination",
+    "School of Abjuration",
+    "School of Illusion",
+    "School of Necromancy",
+    "War Magic",
+    "Chronurgy",
+    "Graviturgy",
+    "Order of Scribes",
+    "Great Weapon Master",
+    "Polearm Master",
+    "Sharpshooter",
+    "Crossbow Expert",
+    "War Caster",
+    "Booming Blade",
+    "Green-Flame Blade",
+    "Toll the Dead",
+    "Silvery Barbs",
+    "Healing Spirit",
+    "Tabaxi",
+    "Aasimar",
+    "Goliath",
+    "Firbolg",
+    "Kenku",
+    "Genasi",
+    "Tortle",
+    "Yuan-ti",
+)
+DENYLIST = DENYLIST_PUBLICATIONS + DENYLIST_OPTIONS
+
+
+def get_mode(value: Optional[str] = None) -> str:
+    """The compliance mode from `value` (the app passes its setting) or env DND_SRD_COMPLIANCE.
+
+    An unrecognised value logs a warning and means "flag": a typo must not take the page down.
+    """
+    if value is None:
+        value = os.getenv("DND_SRD_COMPLIANCE", "")
+    mode = value.strip().lower() or "flag"
+    if mode not in MODES:
+        if mode not in _warned_modes:
+            _warned_modes.add(mode)
+            _log.warning("Unknown DND_SRD_COMPLIANCE mode %r (expected one of %s); using 'flag'.", mode, MODES)
+        return "flag"
+    return mode
+
+
+@dataclass(frozen=True)
+class Violation:
+    start: int  # offsets in the original stream (the text passed to feed)
+    end: int
+    name: str
+
+
+class ComplianceMatcher:
+    """Compiled denylist (minus names inside the allowlist); share one per allowlist."""
+
+    def __init__(self, denylist: Iterable[str] = DENYLIST, allowlist: Iterable[str] = ()) -> None:
+        allowed = [a.casefold() for a in allowlist if a and a.strip()]
+        self.names = {}
+        for name in denylist:
+            key = name.casefold()
+            if key and not any(key in a for a in allowed):
+                self.names[key] = name
+        self.automaton = Automaton(self.names)
+        self.max_len = max((len(k) for k in self.names), default=0)
+
+
+@lru_cache(maxsize=32)
+def get_matcher(allowlist: FrozenSet[str] = frozenset()) -> ComplianceMatcher:
+    """Matcher for the default denylist and this allowlist (compiled once per allowlist)."""
+    return ComplianceMatcher(DENYLIST, allowlist)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class ComplianceChecker:
+    """Incremental checker for one streamed response."""
+
+    def __init__(self, matcher: Optional[ComplianceMatcher] = None) -> None:
+        self.matcher = matcher or get_matcher()
+        self.violations: List[Violation] = []
+        self._state = 0
+        self._consumed = 0  # folded characters scanned
+        self._raw_consumed = 0  # original characters scanned
+        # The last few folded characters (enough to test the start boundary of any match) and,
+        # for each, the offset of the original character it was folded from.
+        self._tail = ""
+        self._tail_origin: List[int] = []
+        # Matches that end exactly at the end of the previous chunk: their end boundary
+        # depends on the next character. Offsets are already mapped back to the original.
+        self._pending: List[Tuple[int, int, str]] = []
+
+    def _fold(self, chunk: str) -> Tuple[str, List[int]]:
+        """Case-fold chunk; origin[k] is the stream offset of the character folded[k] came from."""
+        base = self._raw_consumed
+        folded = chunk.casefold()
+        if len(folded) == len(chunk):  # casefold never shrinks a character, so this is 1:1
+            return folded, list(range(base, base + len(chunk)))
+        # Some character expands (e.g. "ß" -> "ss"): fold one at a time to keep the mapping.
+        parts: List[str] = []
+        origin: List[int] = []
+        for i, ch in enumerate(chunk):
+            f = ch.casefold()
+            parts.append(f)
+            origin.extend([base + i] * len(f))
+        return "".join(parts), origin
+
+    def feed(self, chunk: str) -> List[Violation]:
+        """Scan the next chunk; returns violations confirmed by it (also kept in .violations)."""
+        folded, chunk_origin = self._fold(chunk)
+        if not folded:
+            return []
+        new: List[Violation] = []
+        for start, end, key in self._pending:
+            if not _is_word_char(folded[0]):
+                new.append(Violation(start, end, self.matcher.names[key]))
+        self._pending = []
+
+        base = self._consumed
+        window = self._tail + folded  # window[k] is folded stream position (base - len(tail) + k)
+        origin = self._tail_origin + chunk_origin
+        window_start = base - len(self._tail)
+        self._state, matches = self.matcher.automaton.advance(self._state, folded, base)
+        for start, end, key in matches:
+            before = start - 1 - window_start
+            if before >= 0 and _is_word_char(window[before]):
+                continue
+            after = end - window_start
+            raw = (origin[start - window_start], origin[after - 1] + 1, key)
+            if after == len(window):
+                self._pending.append(raw)
+                continue
+            if _is_word_char(window[after]):
+                continue
+            new.append(Violation(raw[0], raw[1], self.matcher.names[key]))
+
+        self._consumed += len(folded)
+        self._raw_consumed += len(chunk)
+        keep = self.matcher.max_len + 1
+        self._tail = window[-keep:]
+        self._tail_origin = origin[-keep:]
+        self.violations.extend(new)
+        return new
+
+    def finish(self) -> List[Violation]:
+        """End of stream: matches that ran up to the last character are violations too."""
+        new = [Violation(start, end, self.matcher.names[key]) for start, end, key in self._pending]
+        self._pending = []
+        self.violations.extend(new)
+        return new
+
+    def names(self) -> List[str]:
+        """Distinct violating names, in order of first occurrence."""
+        return list(dict.fromkeys(v.name for v in self.violations))
+
+
+def check_text(text: str, allowlist: Iterable[str] = ()) -> List[str]:
+    """One-shot helper: distinct denylisted names in a complete text."""
+    checker = ComplianceChecker(get_matcher(frozenset(allowlist)))
+    checker.feed(text)
+    checker.finish()
+    return checker.names()
@@ -0,0 +1,79 @@
+"""BM25 relevance index over SRD payload text (in-process, NumPy scoring).
+
+Used to pick which grounding facts to send for a concept: documents are e.g. one class
+feature each (name + description), the query is the user's prompt. The inverted index is
+built once per document list; a query scores every document with one vectorized update per
+query term.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+K1 = 1.2
+B = 0.75
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have he her his i in is it its level me my of on or she "
+    "that the their them they this to was who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stopwords, with a light plural/-ing strip."""
+    out = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if tok in _STOPWORDS:
+            continue
+        if len(tok) > 4 and tok.endswith("ing"):
+            tok = tok[:-3]
+        elif len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        out.append(tok)
+    return out
+
+
+class BM25Index:
+    def __init__(self, documents: Sequence[str]) -> None:
+        self.size = len(documents)
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            lengths[doc_id] = len(tokens)
+            for tok in tokens:
+                counts = postings.setdefault(tok, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        avgdl = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+        # Per-document length normalization, shared by every term.
+        self._norm = K1 * (1.0 - B + B * lengths / avgdl)
+        # term -> (doc ids, term frequencies, idf)
+        self._postings: Dict[str, tuple] = {}
+        for tok, counts in postings.items():
+            ids = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tfs = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            idf = np.log1p((self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            self._postings[tok] = (ids, tfs, idf)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (zeros when nothing matches)."""
+        scores = np.zeros(self.size, dtype=np.float64)
+        for tok in set(tokenize(query)):
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            ids, tfs, idf = posting
+            scores[ids] += idf * tfs * (K1 + 1.0) / (tfs + self._norm[ids])
+        return scores
+
+    def rank(self, query: str, candidates: Sequence[int]) -> List[int]:
+        """`candidates` (doc ids) best first; ties keep their given order."""
+        if not candidates:
+            return []
+        cand = np.asarray(candidates, dtype=np.intp)
+        order = np.argsort(-self.scores(query)[cand], kind="stable")
+        return cand[order].tolist()
@@ -0,0 +1,431 @@
+"""Local stand-in for the SRD grounding API, with fault injection and a load generator.
+
+StubServer serves GET /meta and GET /classes/{name} on 127.0.0.1 from fixture data (the
+four classes the app ships grounding for, a dict you pass in, or an offline SRD bundle), so
+srd_client can be exercised without `dnd-srd-mongo`. Faults are drawn per request from a
+seeded RNG and can be changed while the server runs:
+
+- latency: a distribution (see constant/uniform/lognormal) sampled before each response
+- error_rate / error_status: answer with an HTTP error instead of the payload
+- malformed_rate: answer 200 with truncated JSON
+- slow_body_rate / slow_body_s: send the headers, then drip the body over slow_body_s
+- reset_rate: close the connection without answering
+
+run_load() drives srd_client.get_class from concurrent threads and reports p50/p95/p99
+latency and throughput, so pooling, caching and retry behaviour can be measured offline.
+
+Usage:
+    python srd_stub.py serve --port 8000 --latency-ms 20 --error-rate 0.05
+    python srd_stub.py load --requests 2000 --concurrency 16 --latency-ms 5 [--no-cache]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import srd_client
+
+Distribution = Callable[[random.Random], float]
+
+_SLOW_BODY_CHUNKS = 8
+
+
+def constant(seconds: float) -> Distribution:
+    """Always `seconds`."""
+    return lambda rng: seconds
+
+
+def uniform(low_s: float, high_s: float) -> Distribution:
+    return lambda rng: rng.uniform(low_s, high_s)
+
+
+def lognormal(median_s: float, sigma: float = 0.5) -> Distribution:
+    """Long-tailed latency with the given median (sigma 0.5: p99 is about 3.2x the median)."""
+    mu = math.log(median_s) if median_s > 0 else 0.0
+    return lambda rng: rng.lognormvariate(mu, sigma) if median_s > 0 else 0.0
+
+
+def _features(levels: Dict[int, Sequence[str]]) -> List[Dict[str, Any]]:
+    out = []
+    for lvl in range(1, 21):
+        names = list(levels.get(lvl, ()))
+        if lvl in (4, 8, 12, 16, 19):
+            names.append("Ability Score Improvement")
+        if names:
+            out.append({"level": lvl, "features": [{"name": n} for n in names]})
+    return out
+
+
+DEFAULT_CLASSES: Dict[str, Dict[str, Any]] = {
+    "barbarian": {
+        "name": "Barbarian",
+        "hit_die": 12,
+        "primary_abilities": ["Strength"],
+        "saving_throw_proficiencies": ["Strength", "Constitution"],
+        "proficiencies": ["Light armor", "Medium armor", "Shields", "Simple weapons", "Martial weapons"],
+        "features_by_level": _features({
+            1: ["Rage", "Unarmored Defense"],
+            2: ["Reckless Attack", "Danger Sense"],
+            3: ["Primal Path"],
+            5: ["Extra Attack", "Fast Movement"],
+            7: ["Feral Instinct"],
+            9: ["Brutal Critical"],
+            11: ["Relentless Rage"],
+            15: ["Persistent Rage"],
+            18: ["Indomitable Might"],
+            20: ["Primal Champion"],
+        }),
+    },
+    "bard": {
+        "name": "Bard",
+        "hit_die": 8,
+        "primary_abilities": ["Charisma"],
+        "saving_throw_proficiencies": ["Dexterity", "Charisma"],
+        "proficiencies": ["Light armor", "Simple weapons", "Hand crossbows", "Longswords", "Rapiers", "Shortswords"],
+        "features_by_level": _features({
+            1: ["Spellcasting", "Bardic Inspiration"],
+            2: ["Jack of All Trades", "Song of Rest"],
+            3: ["Bard College", "Expertise"],
+            5: ["Font of Inspiration"],
+            6: ["Countercharm"],
+            10: ["Magical Secrets"],
+            20: ["Superior Inspiration"],
+        }),
+    },
+    "fighter": {
+        "name": "Fighter",
+        "hit_die": 10,
+        "primary_abilities": ["Strength", "Dexterity"],
+        "saving_throw_proficiencies": ["Strength", "Constitution"],
+        "proficiencies": ["All armor", "Shields", "Simple weapons", "Martial weapons"],
+        "features_by_level": _features({
+            1: ["Fighting Style", "Second Wind"],
+            2: ["Action Surge"],
+            3: ["Martial Archetype"],
+            5: ["Extra Attack"],
+            9: ["Indomitable"],
+        }),
+    },
+    "wizard": {
+        "name": "Wizard",
+        "hit_die": 6,
+        "primary_abilities": ["Intelligence"],
+        "saving_throw_proficiencies": ["Intelligence", "Wisdom"],
+        "proficiencies": ["Daggers", "Darts", "Slings", "Quarterstaffs", "Light crossbows"],
+        "features_by_level": _features({
+            1: ["Spellcasting", "Arcane Recovery"],
+            2: ["Arcane Tradition"],
+            18: ["Spell Mastery"],
+            20: ["Signature Spells"],
+        }),
+    },
+}
+
+
+@dataclass
+class Faults:
+    """Per-request fault injection settings (rates are probabilities in [0, 1])."""
+
+    latency: Distribution = field(default_factory=lambda: constant(0.0))
+    error_rate: float = 0.0
+    error_status: int = 503
+    malformed_rate: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_s: float = 0.0
+    reset_rate: float = 0.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        srv = self.server
+        faults = srv.faults
+        with srv.lock:
+            draws = [srv.rng.random() for _ in range(4)]
+            delay = max(0.0, faults.latency(srv.rng))
+        srv.count("requests")
+        if delay:
+            time.sleep(delay)
+
+        if draws[0] < faults.reset_rate:
+            srv.count("resets")
+            self.close_connection = True
+            return
+
+        status, data = srv.resolve(self.path.split("?", 1)[0])
+        body = json.dumps(data).encode("utf-8")
+        if draws[1] < faults.error_rate:
+            srv.count("errors")
+            status, body = faults.error_status, b'{"detail":"injected failure"}'
+        elif status == 200 and draws[2] < faults.malformed_rate:
+            srv.count("malformed")
+            body = body[: max(1, len(body) // 2)]
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if draws[3] < faults.slow_body_rate and faults.slow_body_s > 0:
+            srv.count("slow_bodies")
+            step = max(1, math.ceil(len(body) / _SLOW_BODY_CHUNKS))
+            for i in range(0, len(body), step):
+                time.sleep(faults.slow_body_s / _SLOW_BODY_CHUNKS)
+                self.wfile.write(body[i : i + step])
+                self.wfile.flush()
+        else:
+            self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """SRD API stand-in on a background thread. Use as a context manager or call start()/stop()."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, Dict[str, Any]]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        faults: Optional[Faults] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.classes = {k.strip().lower(): v for k, v in (classes if classes is not None else DEFAULT_CLASSES).items()}
+        self.meta = meta if meta is not None else {"version": "stub-1", "classes": sorted(self.classes)}
+        self.faults = faults or Faults()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_bundle(cls, path: str | Path, **kwargs: Any) -> "StubServer":
+        """Serve the classes and /meta stored in an offline SRD bundle (see srd_bundle.py)."""
+        import srd_bundle
+
+        bundle = srd_bundle.SrdBundle(path)
+        try:
+            classes = {name: bundle.get("classes", name) for name in bundle.names("classes")}
+            meta = dict(bundle.meta)
+        finally:
+            bundle.close()
+        return cls(classes=classes, meta=meta, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def resolve(self, path: str) -> tuple:
+        """(status, JSON body) for a request path, before faults are applied."""
+        if path.rstrip("/") == "/meta":
+            return 200, self.meta
+        if path.startswith("/classes/"):
+            payload = self.classes.get(path[len("/classes/") :].strip("/").lower())
+            if payload is not None:
+                return 200, payload
+        return 404, {"detail": "Not Found"}
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that time out mid-body hang up on purpose; anything else is reported.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="srd-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+@dataclass
+class LoadReport:
+    """Result of run_load (latencies in seconds)."""
+
+    requests: int
+    errors: int
+    elapsed_s: float
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    mean_s: float
+    error_messages: Dict[str, int]
+
+    @property
+    def throughput_rps(self) -> float:
+        return self.requests / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests in {self.elapsed_s:.2f}s ({self.throughput_rps:.0f} req/s), "
+            f"{self.errors} errors; p50 {self.p50_s * 1e3:.2f} ms  p95 {self.p95_s * 1e3:.2f} ms  "
+            f"p99 {self.p99_s * 1e3:.2f} ms"
+        )
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * pct / 100.0) - 1))]
+
+
+def run_load(
+    base_url: str,
+    names: Iterable[str],
+    requests: int = 1000,
+    concurrency: int = 8,
+    use_cache: bool = True,
+    fetch: Optional[Callable[[str, str], tuple]] = None,
+) -> LoadReport:
+    """Call srd_client.get_class `requests` times from `concurrency` threads, cycling through names.
+
+    `fetch(base_url, name)` replaces get_class (e.g. to measure another client); it must
+    return (payload, error) like get_class.
+    """
+    names = list(names)
+    if not names:
+        raise ValueError("names must not be empty")
+    if fetch is None:
+        fetch = lambda base, name: srd_client.get_class(base, name, use_cache=use_cache)  # noqa: E731
+    lock = threading.Lock()
+    next_index = [0]
+    samples: List[float] = []
+    error_messages: Dict[str, int] = {}
+
+    def worker() -> None:
+        local: List[float] = []
+        local_errors: Dict[str, int] = {}
+        while True:
+            with lock:
+                i = next_index[0]
+                if i >= requests:
+                    break
+                next_index[0] += 1
+            t0 = time.perf_counter()
+            _, err = fetch(base_url, names[i % len(names)])
+            local.append(time.perf_counter() - t0)
+            if err:
+                kind = err.split(" for ", 1)[0]
+                local_errors[kind] = local_errors.get(kind, 0) + 1
+        with lock:
+            samples.extend(local)
+            for kind, n in local_errors.items():
+                error_messages[kind] = error_messages.get(kind, 0) + n
+
+    threads = [threading.Thread(target=worker, name=f"srd-load-{i}") for i in range(max(1, concurrency))]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(samples)
+    return LoadReport(
+        requests=len(ordered),
+        errors=sum(error_messages.values()),
+        elapsed_s=elapsed,
+        p50_s=_percentile(ordered, 50),
+        p95_s=_percentile(ordered, 95),
+        p99_s=_percentile(ordered, 99),
+        mean_s=statistics.fmean(ordered) if ordered else 0.0,
+        error_messages=error_messages,
+    )
+
+
+def _faults_from_args(args: argparse.Namespace) -> Faults:
+    latency = constant(0.0)
+    if args.latency_ms > 0:
+        latency = lognormal(args.latency_ms / 1e3, args.latency_sigma) if args.latency_sigma > 0 else constant(args.latency_ms / 1e3)
+    return Faults(
+        latency=latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        malformed_rate=args.malformed_rate,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_s=args.slow_body_ms / 1e3,
+        reset_rate=args.reset_rate,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local SRD API stand-in with fault injection.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the stub until interrupted")
+    serve.add_argument("--port", type=int, default=8000)
+    load = sub.add_parser("load", help="start the stub and load-test srd_client.get_class against it")
+    load.add_argument("--requests", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--no-cache", action="store_true", help="bypass the class cache (measure the transport)")
+    for p in (serve, load):
+        p.add_argument("--bundle", default=None, help="serve fixtures from an offline SRD bundle")
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--latency-ms", type=float, default=0.0, help="median latency")
+        p.add_argument("--latency-sigma", type=float, default=0.0, help="lognormal spread (0 = constant)")
+        p.add_argument("--error-rate", type=float, default=0.0)
+        p.add_argument("--error-status", type=int, default=503)
+        p.add_argument("--malformed-rate", type=float, default=0.0)
+        p.add_argument("--slow-body-rate", type=float, default=0.0)
+        p.add_argument("--slow-body-ms", type=float, default=0.0)
+        p.add_argument("--reset-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    kwargs: Dict[str, Any] = {"faults": _faults_from_args(args), "seed": args.seed}
+    if args.command == "serve":
+        kwargs["port"] = args.port
+    server = StubServer.from_bundle(args.bundle, **kwargs) if args.bundle else StubServer(**kwargs)
+
+    if args.command == "serve":
+        print(f"SRD stub on {server.base_url} serving {', '.join(sorted(server.classes))}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    with server:
+        report = run_load(server.base_url, sorted(server.classes), args.requests, args.concurrency, use_cache=not args.no_cache)
+    print(report.summary())
+    if report.error_messages:
+        print(f"errors: {report.error_messages}")
+    print(f"server: {server.stats}")
+    print(f"pool: {srd_client.pool_stats()}")
+    print(f"cache: {srd_client.class_cache_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+"""SRD vocabulary matcher: finds every SRD class / feature / alias mentioned in a prompt.
+
+All names are compiled into one Aho-Corasick automaton over case-folded text, so a prompt
+is scanned in a single pass whose cost is linear in its length (plus matches), however
+large the vocabulary grows. Matches must sit on word boundaries ("bard" does not match
+inside "barbarian"); overlapping names all match ("Extra Attack" and "Attack").
+
+Vocabulary sources, first available wins: the active offline bundle (classes from its
+/meta snapshot, features from its class payloads), the service's /meta (classes only), or
+the four classes this app ships grounding for. get_vocabulary() caches the compiled
+automaton per source version and re-reads /meta in the background.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import srd_client
+
+DEFAULT_CLASSES = ("barbarian", "bard", "fighter", "wizard")
+# Extra surface forms per class (plurals are added automatically).
+CLASS_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "barbarian": ("barb",),
+    "wizard": ("wiz",),
+}
+_MAX_CACHED_VOCABULARIES = 8
+
+
+@dataclass(frozen=True)
+class Mention:
+    """One vocabulary hit: text[start:end] names `entity` (a class or feature name)."""
+
+    start: int
+    end: int
+    kind: str  # "class" | "feature"
+    entity: str
+    classes: FrozenSet[str]
+
+
+class Automaton:
+    """Aho-Corasick automaton over case-folded patterns."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        for pattern in patterns:
+            self._add(pattern.casefold())
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if pattern not in self._out[state]:
+            self._out[state] += (pattern,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, str]]:
+        """(start, end, pattern) for every occurrence in text (already case-folded), by end position."""
+        _, matches = self.advance(0, text)
+        return matches
+
+    def advance(self, state: int, text: str, offset: int = 0) -> Tuple[int, List[Tuple[int, int, str]]]:
+        """Continue a scan from `state` over the next piece of a stream.
+
+        Returns the new state and the matches ending inside `text`, with positions counted
+        from the start of the stream (`offset` = characters already consumed).
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        for i, ch in enumerate(text, start=offset + 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in out[state]:
+                matches.append((i - len(pattern), i, pattern))
+        return state, matches
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class SrdVocabulary:
+    def __init__(self, classes: Iterable[str], features: Optional[Dict[str, Iterable[str]]] = None) -> None:
+        self.class_names: List[str] = list(dict.fromkeys(c.strip().casefold() for c in classes if c and c.strip()))
+        # surface form -> (kind, canonical entity, owning classes)
+        self._entries: Dict[str, Tuple[str, str, FrozenSet[str]]] = {}
+        for name, owners in (features or {}).items():
+            key = name.strip().casefold()
+            if key:
+                prev = self._entries.get(key)
+                merged = frozenset(o.casefold() for o in owners) | (prev[2] if prev else frozenset())
+                self._entries[key] = ("feature", name.strip(), merged)
+        for cls in self.class_names:
+            for form in (cls, cls + "s", *CLASS_ALIASES.get(cls, ())):
+                self._entries[form] = ("class", cls, frozenset({cls}))
+        self._automaton = Automaton(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def mentions(self, text: str) -> List[Mention]:
+        """Every vocabulary name in text on word boundaries, in order of position.
+
+        Positions index text.casefold() (the same as text unless folding changed lengths, e.g. "ß").
+        """
+        folded = text.casefold()
+        found = []
+        for start, end, pattern in self._automaton.iter_matches(folded):
+            if start > 0 and _is_word_char(folded[start - 1]):
+                continue
+            if end < len(folded) and _is_word_char(folded[end]):
+                continue
+            kind, entity, owners = self._entries[pattern]
+            found.append(Mention(start, end, kind, entity, owners))
+        found.sort(key=lambda m: (m.start, -m.end))
+        return found
+
+    def rank_classes(self, text: str) -> List[str]:
+        """Classes to ground for this prompt, best first.
+
+        Classes named directly come first, in order of first mention; then classes only
+        implied by their features, by number of feature mentions (ties: first mention).
+        """
+        direct: Dict[str, int] = {}
+        implied: Dict[str, List[int]] = {}
+        for m in self.mentions(text):
+            if m.kind == "class":
+                direct.setdefault(m.entity, m.start)
+            else:
+                for cls in m.classes:
+                    hits = implied.setdefault(cls, [0, m.start])
+                    hits[0] += 1
+        ranked = sorted(direct, key=direct.__getitem__)
+        ranked += sorted((c for c in implied if c not in direct), key=lambda c: (-implied[c][0], implied[c][1]))
+        return ranked
+
+
+def bundle_vocabulary_sources(bundle) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Class names and feature -> classes from an SrdBundle."""
+    classes = srd_client.meta_class_names(bundle.meta) or list(bundle.names("classes"))
+    features: Dict[str, List[str]] = {}
+    for cls in bundle.names("classes"):
+        payload = bundle.get("classes", cls) or {}
+        for entry in payload.get("features_by_level", []) or []:
+            for f in entry.get("features", []) or []:
+                fname = f.get("name") if isinstance(f, dict) else None
+                if isinstance(fname, str) and fname.strip():
+                    features.setdefault(fname.strip(), []).append(cls)
+    return classes, features
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, SrdVocabulary] = {}
+# get_vocabulary source -> (vocabulary, expires_at). A /meta vocabulary is kept for the SRD cache
+# TTL; the DEFAULT_CLASSES fallback after a failed read only for FALLBACK_TTL_S.
+_sources: Dict[Tuple[str, str], Tuple[SrdVocabulary, float]] = {}
+_refreshing: Set[Tuple[str, str]] = set()
+FALLBACK_TTL_S = 10.0
+
+
+def build_vocabulary(classes: Iterable[str], features: Optional[Dict[str, Iterable[str]]] = None) -> SrdVocabulary:
+    """Compiled vocabulary for these names; identical inputs reuse the same automaton."""
+    classes = list(classes)
+    features = {k: sorted(v) for k, v in (features or {}).items()}
+    key = hashlib.sha1(json.dumps([classes, features], sort_keys=True).encode("utf-8")).hexdigest()
+    with _cache_lock:
+        vocab = _cache.get(key)
+    if vocab is not None:
+        return vocab
+    vocab = SrdVocabulary(classes, features)
+    with _cache_lock:
+        if len(_cache) >= _MAX_CACHED_VOCABULARIES:
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = vocab
+    return vocab
+
+
+def get_vocabulary(base_url: str = "", wait: bool = False) -> SrdVocabulary:
+    """Vocabulary from the active bundle, else /meta, else DEFAULT_CLASSES (cached per source).
+
+    /meta is never read on the caller's thread unless wait=True (scripts): a missing or expired
+    entry is served as it is (DEFAULT_CLASSES on the first call) while one background thread
+    re-reads it, like srd_client.TTLCache's stale-while-revalidate.
+    """
+    bundle = srd_client.active_bundle()
+    if bundle is None and base_url:
+        return _meta_vocabulary(base_url, wait)
+    source = ("bundle", f"{id(bundle)}:{bundle.version}") if bundle is not None else ("default", "")
+    with _cache_lock:
+        hit = _sources.get(source)
+    if hit is not None:
+        return hit[0]
+
+    vocab = None
+    if bundle is not None:
+        classes, features = bundle_vocabulary_sources(bundle)
+        if classes:
+            vocab = build_vocabulary(classes, features)
+    if vocab is None:
+        vocab = build_vocabulary(DEFAULT_CLASSES)
+    with _cache_lock:
+        _sources[source] = (vocab, float("inf"))
+    return vocab
+
+
+def _meta_vocabulary(base_url: str, wait: bool) -> SrdVocabulary:
+    source = ("meta", base_url)
+    with _cache_lock:
+        hit = _sources.get(source)
+        if hit is not None and hit[1] > time.monotonic():
+            return hit[0]
+        refresh = source not in _refreshing
+        if refresh:
+            _refreshing.add(source)
+    if wait:
+        if refresh:
+            _refresh_meta(base_url)
+        else:
+            # Another thread is reading /meta: use its result when it lands.
+            while True:
+                time.sleep(0.01)
+                with _cache_lock:
+                    if source not in _refreshing:
+                        break
+        with _cache_lock:
+            hit = _sources.get(source)
+    elif refresh:
+        threading.Thread(target=_refresh_meta, args=(base_url,), name="srd-vocab-refresh", daemon=True).start()
+    return hit[0] if hit is not None else build_vocabulary(DEFAULT_CLASSES)
+
+
+def _refresh_meta(base_url: str) -> None:
+    source = ("meta", base_url)
+    try:
+        meta, err = srd_client.get_meta(base_url)
+        classes = srd_client.meta_class_names(meta) if meta and not err else []
+        if classes:
+            vocab, ttl = build_vocabulary(classes), srd_client.DEFAULT_CACHE_TTL_S
+        else:
+            with _cache_lock:
+                hit = _sources.get(source)
+            # Keep serving the last good /meta vocabulary; retry soon either way.
+            vocab, ttl = (hit[0] if hit is not None else build_vocabulary(DEFAULT_CLASSES)), FALLBACK_TTL_S
+        with _cache_lock:
+            _sources[source] = (vocab, time.monotonic() + ttl)
+    finally:
+        with _cache_lock:
+            _refreshing.discard(source)
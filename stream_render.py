@@ -0,0 +1,75 @@
+"""Throttled rendering of a streamed assistant response.
+
+Streamlit's placeholder.markdown() re-sends the whole growing string on every call, so
+rendering once per token costs O(n^2) bytes over the websocket for an n-char draft.
+StreamRenderer accumulates deltas and re-renders at most every `interval_s` seconds or every
+`min_chars` new characters, whichever comes first, plus one final flush.
+
+Pure Python (no Streamlit import): the render target is any callable taking the full text.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List
+
+DEFAULT_FLUSH_INTERVAL_S = 0.05
+DEFAULT_FLUSH_CHARS = 200
+
+
+class StreamRenderer:
+    def __init__(
+        self,
+        render: Callable[[str], object],
+        interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        min_chars: int = DEFAULT_FLUSH_CHARS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._render = render
+        self.interval_s = interval_s
+        self.min_chars = min_chars
+        self._clock = clock
+        self._parts: List[str] = []
+        self._text = ""
+        self._pending_chars = 0
+        self._last_flush = clock()
+        self.frames = 0
+        self.bytes_rendered = 0
+
+    @property
+    def text(self) -> str:
+        """Everything received so far (rendered or still buffered)."""
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts.clear()
+        return self._text
+
+    def feed(self, delta: str) -> None:
+        if not delta:
+            return
+        self._parts.append(delta)
+        self._pending_chars += len(delta)
+        if self._pending_chars >= self.min_chars or self._clock() - self._last_flush >= self.interval_s:
+            self.flush()
+
+    def flush(self) -> str:
+        """Render the buffered text now (no-op if nothing new arrived); returns the full text."""
+        text = self.text
+        if self._pending_chars:
+            self._render(text)
+            self.frames += 1
+            self.bytes_rendered += len(text)
+            self._pending_chars = 0
+            self._last_flush = self._clock()
+        return text
+
+    def truncate(self, length: int) -> str:
+        """Drop everything after `length` chars and re-render now; returns the kept text."""
+        text = self.text[: max(0, length)]
+        if text != self._text:
+            self._text = text
+            self._pending_chars = max(self._pending_chars, 1)
+        return self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {"frames": self.frames, "chars": len(self.text), "bytes_rendered": self.bytes_rendered}
@@ -1,6 +1,27 @@
 import sys
 from pathlib import Path
+from typing import Iterator
+
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _local_state_in_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep the app's on-disk state (drafts, sessions, metrics) out of the working tree."""
+    monkeypatch.setenv("DND_RESPONSE_CACHE_DIR", str(tmp_path / "_response_cache"))
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path / "_session_store"))
+    monkeypatch.setenv("DND_METRICS_PATH", str(tmp_path / "_metrics" / "turns.jsonl"))
+    _clear_app_resources()
+    yield
+    _clear_app_resources()
+
+
+def _clear_app_resources() -> None:
+    # The draft cache is a Streamlit cache_resource built from the env on first use.
+    app = sys.modules.get("app")
+    if app is not None:
+        app.get_response_cache.clear()
@@ -0,0 +1,78 @@
+"""Benchmarks for prompt assembly and SRD grounding (pytest-benchmark; run with -m bench)."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import app  # noqa: E402
+import srd_client  # noqa: E402
+
+pytestmark = pytest.mark.bench
+
+CONCEPT = "a grim dwarf fighter who shields his allies and never retreats from the wall"
+
+
+def _class_payload() -> dict:
+    """A 20-level class payload shaped like the SRD API's, with descriptions on every feature."""
+    features_by_level = []
+    for lvl in range(1, 21):
+        features = [
+            {
+                "name": f"Feature {lvl}.{i}",
+                "desc": [
+                    f"At level {lvl} you gain feature {i}: when a creature you can see attacks a target "
+                    "other than you within 5 feet, you can use your reaction to impose disadvantage.",
+                    "You can use this feature a number of times equal to your proficiency bonus per long rest.",
+                ],
+            }
+            for i in range(4)
+        ]
+        features_by_level.append({"level": lvl, "features": features})
+    return {
+        "name": "Fighter",
+        "hit_die": 10,
+        "primary_abilities": ["Strength", "Dexterity"],
+        "saving_throw_proficiencies": ["Strength", "Constitution"],
+        "proficiencies": ["All armor", "Shields", "Simple weapons", "Martial weapons", "Athletics", "Intimidation", "Survival", "Perception"],
+        "features_by_level": features_by_level,
+    }
+
+
+def _clear_grounding_tables() -> None:
+    with app._grounding_lock:
+        app._grounding_tables.clear()
+
+
+@pytest.mark.parametrize("homebrew", [False, True])
+def test_build_system_prompt_memoized(benchmark, homebrew: bool) -> None:
+    app.build_system_prompt(20, homebrew)
+    assert benchmark(app.build_system_prompt, 20, homebrew).startswith("You are a D&D 5e assistant")
+
+
+def test_build_system_prompt_uncached(benchmark) -> None:
+    assert "Target level: 20" in benchmark(app.build_system_prompt.__wrapped__, 20, False)
+
+
+@pytest.mark.parametrize("level", [1, 10, 20])
+def test_grounded_block_warm(benchmark, level: int) -> None:
+    payload = srd_client.SrdPayload(_class_payload())  # as served by the class cache / bundle
+    app.build_grounded_srd_block(payload, level)
+    assert benchmark(app.build_grounded_srd_block, payload, level).startswith("Grounded SRD Facts")
+
+
+def test_grounded_block_with_concept(benchmark) -> None:
+    payload = srd_client.SrdPayload(_class_payload())
+    app.build_grounded_srd_block(payload, 20, concept=CONCEPT)
+    assert "- Class: Fighter" in benchmark(app.build_grounded_srd_block, payload, 20, CONCEPT)
+
+
+def test_grounded_block_cold(benchmark) -> None:
+    """A payload seen for the first time: hashing, per-level tables and the block itself."""
+    payload = _class_payload()
+    block = benchmark.pedantic(
+        app.build_grounded_srd_block,
+        args=(payload, 20),
+        setup=_clear_grounding_tables,
+        rounds=200,
+    )
+    assert "Level 20: Feature 20.0" not in block  # capped at 20 lines
@@ -0,0 +1,110 @@
+"""Benchmarks for session persistence (pytest-benchmark; run with -m bench).
+
+Each store holds N short filler sessions plus one long session (LONG_TURNS turns of ~2 KB
+drafts) that the save/load benchmarks use. Fillers are written straight to disk and indexed
+with one catalog rebuild, so building the 100k store takes seconds rather than hours.
+Override the store sizes with DND_BENCH_STORE_SIZES (comma-separated, e.g. "100,10000").
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import session_store  # noqa: E402
+
+pytestmark = pytest.mark.bench
+
+STORE_SIZES = [int(n) for n in os.getenv("DND_BENCH_STORE_SIZES", "100,10000,100000").split(",") if n.strip()]
+LONG_TURNS = 200
+LONG_ID = "long-session"
+
+_DRAFT = (
+    "## Brakka, Level {level} Fighter\n\n"
+    "**Hit Die:** d10. **Armor:** chain mail, shield.\n\n"
+    "### Features\n- Fighting Style: Defense\n- Second Wind\n- Action Surge\n\n"
+    "### Backstory\nBrakka served {turn} years on the northern wall before the garrison fell. "
+    "The sergeant who ordered the retreat is still alive, and Brakka knows where.\n"
+) * 4
+
+
+def _messages(turns: int) -> List[Dict[str, str]]:
+    messages = [{"role": "system", "content": "You are a D&D 5e character builder. " * 40}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Turn {i}: make the backstory grimmer and mention the wall."})
+        messages.append({"role": "assistant", "content": _DRAFT.format(level=1 + i % 20, turn=i)})
+    return messages
+
+
+def _long_session() -> Dict[str, Any]:
+    messages = _messages(LONG_TURNS)
+    versions = [
+        session_store.create_build_version(messages=messages[: 2 * i + 3], build_level=5, homebrew=False)
+        for i in range(0, LONG_TURNS, 10)
+    ]
+    return {"session_id": LONG_ID, "title": "Brakka the grim", "params": {"build_level": 5}, "messages": messages, "versions": versions}
+
+
+@pytest.fixture(scope="module", params=STORE_SIZES, ids=lambda n: f"{n}_sessions")
+def store(request, tmp_path_factory) -> Path:
+    base = tmp_path_factory.mktemp(f"store_{request.param}")
+    filler = _messages(2)
+    for i in range(request.param - 1):
+        payload = {
+            "session_id": f"s{i:06d}",
+            "title": f"Concept {i}",
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": f"2025-01-01T00:00:{i % 60:02d}+00:00",
+            "messages": filler,
+        }
+        (base / f"s{i:06d}.json").write_text(json.dumps(payload), encoding="utf-8")
+    session_store.rebuild_catalog(base)
+    session_store.save_session(_long_session(), store_dir=base)
+    return base
+
+
+def test_save_session(benchmark, store: Path) -> None:
+    payload = _long_session()
+    benchmark(session_store.save_session, payload, store_dir=store)
+    assert (store / f"{LONG_ID}.json").exists()
+
+
+def test_load_session(benchmark, store: Path) -> None:
+    payload = benchmark(session_store.load_session, LONG_ID, store_dir=store)
+    assert len(payload["messages"]) == 1 + 2 * LONG_TURNS
+
+
+def test_load_session_page(benchmark, store: Path) -> None:
+    page = benchmark(session_store.load_session_page, LONG_ID, store_dir=store)
+    assert page.total_messages == 1 + 2 * LONG_TURNS
+
+
+def test_list_sessions_warm(benchmark, store: Path) -> None:
+    session_store.list_sessions(store)
+    assert len(benchmark(session_store.list_sessions, store)) == min(50, session_store.count_sessions(store))
+
+
+def test_list_sessions_filtered(benchmark, store: Path) -> None:
+    session_store.list_sessions(store)
+    assert benchmark(session_store.list_sessions, store, title_contains="grim")[0].session_id == LONG_ID
+
+
+def test_list_sessions_cold(benchmark, store: Path) -> None:
+    """First listing in a fresh process: the catalog file is parsed again."""
+    benchmark.pedantic(
+        session_store.list_sessions,
+        args=(store,),
+        setup=session_store._catalog_cache.clear,
+        rounds=5 if len(os.listdir(store)) > 10_000 else 20,
+    )
+
+
+@pytest.mark.parametrize("turns", [100, 1_000, 10_000])
+def test_create_build_version(benchmark, turns: int) -> None:
+    messages = _messages(turns)
+    version = benchmark(session_store.create_build_version, messages=messages, build_level=20, homebrew=False)
+    assert version["assistant_text"].startswith("## Brakka, Level")
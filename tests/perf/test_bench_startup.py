@@ -0,0 +1,34 @@
+"""Cold start in a fresh interpreter: `import app` and the first AppTest render (run with -m bench)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.bench
+
+ROOT = Path(__file__).resolve().parents[2]
+_FIRST_RENDER = (
+    "from streamlit.testing.v1 import AppTest\n"
+    "at = AppTest.from_string('import app; app.main()', default_timeout=60)\n"
+    "at.secrets['OPENAI_API_KEY'] = 'sk-fake'\n"
+    "at.run()\n"
+    "assert not at.exception, at.exception\n"
+)
+
+
+def _python(*args: str) -> None:
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True)
+
+
+def test_import_app(benchmark) -> None:
+    benchmark.pedantic(_python, args=("-c", "import app"), rounds=5)
+
+
+def test_first_render(benchmark, monkeypatch, tmp_path) -> None:
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path))
+    benchmark.pedantic(_python, args=("-c", _FIRST_RENDER), rounds=3)
@@ -0,0 +1,23 @@
+"""End-to-end chat turn under AppTest with a paced fake OpenAI stream (run with -m bench)."""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import fake_openai  # noqa: E402
+import turn_harness  # noqa: E402
+
+pytestmark = pytest.mark.bench
+
+
+@pytest.mark.parametrize("repeat_draft", [1, 8], ids=["short_draft", "long_draft"])
+def test_chat_turn(benchmark, monkeypatch, repeat_draft: int) -> None:
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    timing = fake_openai.StreamTiming(ttft_s=0.05, inter_chunk_s=0.001, chunk_chars=4)
+    client = fake_openai.FakeOpenAI(fake_openai.SAMPLE_DRAFT * repeat_draft, timing=timing)
+
+    metrics = benchmark.pedantic(turn_harness.run_turns, args=(turn_harness.DEFAULT_PROMPTS[:1], client), kwargs={"trace_memory": False}, rounds=3)
+
+    summary = turn_harness.summarize(metrics)
+    benchmark.extra_info.update(summary)
+    assert summary["frames"] >= 1
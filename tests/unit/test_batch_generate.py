@@ -0,0 +1,180 @@
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+import batch_generate
+import fake_openai
+import session_store
+import srd_client
+import srd_stub
+
+pytestmark = pytest.mark.unit
+
+_FAST = fake_openai.StreamTiming(ttft_s=0.0)
+
+
+class _ApiError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FlakyOpenAI(fake_openai.FakeOpenAI):
+    """Fails the first `failures` calls with the given status, then behaves normally."""
+
+    def __init__(self, failures: int, status_code: int = 429) -> None:
+        super().__init__(timing=_FAST)
+        self.failures = failures
+        self.status_code = status_code
+
+    def _create(self, model, messages, stream):  # type: ignore[no-untyped-def]
+        if self.failures > 0:
+            self.failures -= 1
+            raise _ApiError(self.status_code)
+        return super()._create(model, messages, stream)
+
+
+@pytest.fixture()
+def stub() -> Iterator[srd_stub.StubServer]:
+    srd_client.configure_pool()
+    srd_client.configure_class_cache()
+    with srd_stub.StubServer(seed=1) as server:
+        yield server
+    srd_client.configure_pool()
+    srd_client.configure_class_cache()
+
+
+def _write_jsonl(path: Path, rows: List[dict]) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    return path
+
+
+async def _no_sleep(_: float) -> None:
+    return None
+
+
+def test_read_concepts_jsonl_and_csv(tmp_path: Path) -> None:
+    jsonl = _write_jsonl(
+        tmp_path / "c.jsonl",
+        [
+            {"concept": "A bard who sings to ghosts", "level": 7, "homebrew": True, "class_hint": "Bard"},
+            {"concept": "A bard who sings to ghosts", "level": 7, "homebrew": True, "class_hint": "Bard"},
+            {"concept": "  ", "level": 3},
+            {"id": "w1", "concept": "A tired wizard", "level": 40},
+        ],
+    )
+    concepts = batch_generate.read_concepts(jsonl)
+    assert len(concepts) == 2  # duplicate and blank rows dropped
+    assert concepts[0].level == 7 and concepts[0].homebrew and concepts[0].class_hint == "Bard"
+    assert concepts[1].concept_id == "w1" and concepts[1].level == 20 and concepts[1].class_hint == "(auto)"
+
+    csv_path = tmp_path / "c.csv"
+    csv_path.write_text("concept,level,homebrew,class_hint\nA bard who sings to ghosts,7,yes,Bard\n", encoding="utf-8")
+    assert batch_generate.read_concepts(csv_path)[0] == concepts[0]
+
+
+def test_unsafe_ids_are_hashed_and_bad_rows_are_reported(tmp_path: Path) -> None:
+    path = tmp_path / "c.jsonl"
+    path.write_text(
+        json.dumps({"id": "../../etc/passwd", "concept": "A sly rogue"}) + "\n"
+        + json.dumps({"id": "x", "concept": "A monk", "level": "five"}) + "\n"
+        + "{not json\n"
+        + json.dumps({"id": "ok-1", "concept": "A druid", "level": "4"}) + "\n",
+        encoding="utf-8",
+    )
+    rejected: List[str] = []
+    concepts = batch_generate.read_concepts(path, rejected)
+
+    assert [c.concept for c in concepts] == ["A sly rogue", "A druid"]
+    unsafe = concepts[0].concept_id
+    assert re.fullmatch(r"[A-Za-z0-9_-]+", unsafe) and unsafe.startswith("etc_passwd-")
+    assert concepts[1].concept_id == "ok-1" and concepts[1].level == 4
+    assert batch_generate._concept_from_row({"concept": "A monk", "level": 0}).level == 1
+    assert batch_generate._concept_from_row({"concept": "A monk", "level": "", "build_level": "7"}).level == 7
+    assert rejected == ["line 2: level must be a whole number, got 'five'", "line 3: invalid JSON (Expecting property name enclosed in double quotes)"]
+
+    store = tmp_path / "store"
+    gen = batch_generate.BatchGenerator(fake_openai.FakeOpenAI(timing=_FAST), store_dir=store, progress_path=tmp_path / "p.jsonl")
+    assert asyncio.run(gen.run(concepts[:1])).done == 1
+    assert [p.name for p in store.glob("batch-*")] == [f"batch-{unsafe}.json"]
+
+
+def test_rate_limiter_waits_for_refill() -> None:
+    now = [0.0]
+    slept: List[float] = []
+
+    async def fake_sleep(s: float) -> None:
+        slept.append(s)
+        now[0] += s
+
+    async def run() -> None:
+        limiter = batch_generate.RateLimiter(60, clock=lambda: now[0], sleep=fake_sleep)
+        await limiter.acquire(60)
+        await limiter.acquire(3)
+
+    asyncio.run(run())
+    assert slept == [pytest.approx(3.0)]
+
+
+def test_batch_saves_sessions_grounded_and_resumes(tmp_path: Path, stub: srd_stub.StubServer) -> None:
+    concepts = batch_generate.read_concepts(
+        _write_jsonl(
+            tmp_path / "c.jsonl",
+            [
+                {"id": "a", "concept": "A fighter who guards a bridge", "level": 5, "class_hint": "Fighter"},
+                {"id": "b", "concept": "A wizard obsessed with clocks", "level": 3},
+                {"id": "c", "concept": "A barbarian poet", "level": 8, "homebrew": True},
+            ],
+        )
+    )
+    store = tmp_path / "store"
+    progress = tmp_path / "progress.jsonl"
+    client = fake_openai.FakeOpenAI(timing=_FAST)
+    gen = batch_generate.BatchGenerator(
+        client, srd_base=stub.base_url, concurrency=2, store_dir=store, progress_path=progress
+    )
+    report = asyncio.run(gen.run(concepts))
+
+    assert (report.done, report.failed, report.skipped) == (3, 0, 0)
+    assert report.drafts_per_minute > 0
+    assert {s.session_id for s in session_store.list_sessions(store_dir=store)} == {"batch-a", "batch-b", "batch-c"}
+    saved = session_store.load_session("batch-a", store_dir=store)
+    assert [m["role"] for m in saved["messages"]] == ["system", "user", "assistant"]
+    assert saved["params"]["class_hint"] == "Fighter" and saved["versions"][0]["build_level"] == 5
+    # The fighter request was grounded with SRD data; the stored system prompt is not.
+    fighter_call = next(c for c in client.calls if "guards a bridge" in c.messages[-1]["content"])
+    assert "Second Wind" in fighter_call.messages[0]["content"]
+    assert "Second Wind" not in saved["messages"][0]["content"]
+
+    rerun = batch_generate.BatchGenerator(
+        fake_openai.FakeOpenAI(timing=_FAST), store_dir=store, progress_path=progress
+    )
+    again = asyncio.run(rerun.run(concepts))
+    assert (again.done, again.skipped) == (0, 3)
+
+
+def test_transient_errors_retry_and_permanent_errors_fail(tmp_path: Path) -> None:
+    concepts = [batch_generate.Concept("x", "A rogue with a conscience")]
+    flaky = batch_generate.BatchGenerator(
+        _FlakyOpenAI(failures=2), store_dir=tmp_path, progress_path=tmp_path / "p.jsonl", sleep=_no_sleep
+    )
+    report = asyncio.run(flaky.run(concepts))
+    assert (report.done, report.retries) == (1, 2)
+
+    # Failed attempts are refunded to the token bucket: only the successful one is charged.
+    metered = batch_generate.BatchGenerator(
+        _FlakyOpenAI(failures=2), tpm=100_000, store_dir=tmp_path / "m", sleep=_no_sleep
+    )
+    assert asyncio.run(metered.run(concepts)).done == 1
+    assert 0 < 100_000 - metered.tokens._level < 2 * batch_generate.COMPLETION_TOKEN_ESTIMATE
+
+    denied = batch_generate.BatchGenerator(
+        _FlakyOpenAI(failures=5, status_code=401), store_dir=tmp_path / "d", sleep=_no_sleep
+    )
+    report = asyncio.run(denied.run(concepts))
+    assert (report.done, report.failed, report.retries) == (0, 1, 0)
+    assert "HTTP 401" in report.errors["x"]
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import blob_store
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+def _draft(n: int) -> str:
+    lines = [f"(1) Concept summary: grim dwarf fighter, revision {n}\n"]
+    lines += [f"- Level {lvl}: feature notes for level {lvl}, unchanged between drafts\n" for lvl in range(1, 21)]
+    return "".join(lines).rstrip()
+
+
+def _session(tmp_path: Path, n_versions: int) -> dict:
+    messages = [{"role": "system", "content": "sys"}]
+    versions = []
+    for i in range(n_versions):
+        messages += [{"role": "user", "content": f"refine {i}"}, {"role": "assistant", "content": _draft(i)}]
+        version = session_store.create_build_version(messages=messages, build_level=5, homebrew=False)
+        versions += [version, dict(version, version_id=f"dup{i}")]  # repeated "Save version" clicks
+    return {"session_id": "abc", "title": "t", "params": {}, "messages": messages, "versions": versions}
+
+
+def _disk_bytes(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file() and "_catalog" not in p.parts)
+
+
+@pytest.mark.parametrize("mode", ["blobs", "deltas"])
+def test_dedup_roundtrip_and_disk_usage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mode: str) -> None:
+    payload = _session(tmp_path, n_versions=6)
+
+    plain = tmp_path / "plain"
+    session_store.get_backend(plain, kind="json").save(json.loads(json.dumps(payload)))
+
+    monkeypatch.setenv("DND_SESSION_DEDUP", mode)
+    store = tmp_path / mode
+    session_store.get_backend(store).save(json.loads(json.dumps(payload)))
+
+    stored = json.loads((store / "abc.json").read_text(encoding="utf-8"))
+    assert "content_ref" in stored["messages"][2]
+    assert "assistant_text_ref" in stored["versions"][0]
+    assert session_store.load_session("abc", store_dir=store) == payload
+
+    # Six drafts, each saved once in messages and twice as versions: stored once each (or as deltas).
+    assert len([p for p in (store / "_blobs").rglob("*") if p.is_file()]) == 6
+    assert _disk_bytes(store) < _disk_bytes(plain) / 2
+
+
+def test_deltas_are_smaller_and_chains_are_capped(tmp_path: Path) -> None:
+    full = blob_store.BlobStore(tmp_path / "full")
+    delta = blob_store.BlobStore(tmp_path / "delta")
+    prev = None
+    digests = []
+    for i in range(blob_store.MAX_DELTA_CHAIN + 3):
+        full.put(_draft(i))
+        prev = delta.put(_draft(i), base=prev)
+        digests.append(prev)
+
+    assert _disk_bytes(tmp_path / "delta") < _disk_bytes(tmp_path / "full") / 2
+    fresh = blob_store.BlobStore(tmp_path / "delta")  # no in-memory text cache
+    assert [fresh.get(d) for d in digests] == [_draft(i) for i in range(len(digests))]
+    assert max(fresh._depth(d) for d in digests) == blob_store.MAX_DELTA_CHAIN
+
+
+def test_legacy_inline_files_still_load(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session_store.save_session(
+        {"session_id": "old", "messages": [{"role": "assistant", "content": "draft"}], "versions": []}, store_dir=tmp_path
+    )
+    monkeypatch.setenv("DND_SESSION_DEDUP", "blobs")
+    assert session_store.load_session("old", store_dir=tmp_path)["messages"][0]["content"] == "draft"
@@ -0,0 +1,65 @@
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import fake_openai
+import session_store
+import turn_harness
+
+pytestmark = pytest.mark.unit
+
+ROOT = Path(__file__).resolve().parents[2]
+# Loaded on first use only (see the top of app.py).
+_DEFERRED = ("openai", "streamlit_js_eval", "dotenv", "numpy")
+
+
+def test_importing_app_defers_heavy_modules() -> None:
+    code = f"import json, sys, app; print(json.dumps([m for m in {_DEFERRED!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_store_dir_is_set_up_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path / "store"))
+    first = session_store.get_store_dir()
+    assert first.is_dir()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("store directory set up twice")
+
+    monkeypatch.setattr(Path, "mkdir", fail)
+    assert session_store.get_store_dir() == first
+
+
+def test_relative_store_dirs_follow_the_working_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert session_store.get_store_dir("store") == tmp_path / "store"
+    (tmp_path / "other").mkdir()
+    monkeypatch.chdir(tmp_path / "other")
+    assert session_store.get_store_dir("store") == tmp_path / "other" / "store"
+
+
+@pytest.mark.parametrize("backend", ["json", "journal"])
+def test_save_recreates_a_removed_store_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, backend: str) -> None:
+    monkeypatch.setenv("DND_SESSION_BACKEND", backend)
+    store = tmp_path / "store"
+    session_store.save_session({"session_id": "abc", "title": "One", "messages": []}, store_dir=store)
+    shutil.rmtree(store)
+
+    session_store.save_session({"session_id": "abc", "title": "Two", "messages": []}, store_dir=store)
+    assert session_store.load_session("abc", store_dir=store)["title"] == "Two"
+
+
+def test_chat_turn_does_not_list_saved_sessions(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    calls = []
+    monkeypatch.setattr(session_store, "list_sessions", lambda *a, **k: calls.append(a) or [])
+    client = fake_openai.FakeOpenAI(timing=fake_openai.StreamTiming(ttft_s=0.0, inter_chunk_s=0.0, chunk_chars=50))
+
+    turn_harness.run_turns(["a grim dwarf fighter"], client, trace_memory=False)
+
+    assert calls == []
@@ -0,0 +1,71 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import context_window
+
+pytestmark = pytest.mark.unit
+
+
+def _history(n_turns: int, draft_chars: int = 400) -> list:
+    messages = [{"role": "system", "content": "SYSTEM PROMPT"}]
+    for i in range(n_turns):
+        messages.append({"role": "user", "content": f"Turn {i}: make the dwarf grimmer."})
+        messages.append({"role": "assistant", "content": f"## Brakka v{i}\n**Class:** Fighter\n" + "x" * draft_chars})
+    return messages
+
+
+def test_history_that_fits_is_sent_unchanged_with_grounding() -> None:
+    messages = _history(2)
+    api, stats, cache = context_window.build_context(messages, grounding_block="GROUNDING", budget=10_000)
+    assert api[0]["content"] == "SYSTEM PROMPT\n\nGROUNDING"
+    assert [m["content"] for m in api[1:]] == [m["content"] for m in messages[1:]]
+    assert messages[0]["content"] == "SYSTEM PROMPT"  # stored history untouched
+    assert stats.saved_tokens == 0 and cache is None
+
+
+def test_older_turns_are_summarized_within_budget() -> None:
+    messages = _history(30)
+    api, stats, cache = context_window.build_context(messages, grounding_block="G", budget=1500, keep_turns=3)
+
+    assert api[0]["content"] == "SYSTEM PROMPT\n\nG"
+    assert api[1]["role"] == "system" and "Turn 1: asked: Turn 0: make the dwarf grimmer." in api[1]["content"]
+    assert "draft: Brakka v0; **Class:** Fighter" in api[1]["content"]
+    assert api[2:] == messages[-6:]
+    assert stats.verbatim_turns == 3 and stats.summarized_turns == 27
+    assert stats.sent_tokens <= 1500 < stats.full_tokens
+    assert stats.saved_tokens == stats.full_tokens - stats.sent_tokens
+    assert cache.upto == len(messages) - 6
+
+
+def test_summary_cache_is_extended_incrementally(monkeypatch: pytest.MonkeyPatch) -> None:
+    messages = _history(30)
+    _, _, cache = context_window.build_context(messages, budget=1500, keep_turns=3)
+
+    calls = []
+    real = context_window.summarize_turn
+    monkeypatch.setattr(context_window, "summarize_turn", lambda turn, n: calls.append(n) or real(turn, n))
+    messages += _history(1)[1:]
+    api, _, cache2 = context_window.build_context(messages, budget=1500, keep_turns=3, cache=cache)
+    assert calls == [28]  # only the turn that just left the verbatim window
+    assert cache2.lines[:-1] == cache.lines
+
+    fresh, _, _ = context_window.build_context(messages, budget=1500, keep_turns=3)
+    assert api == fresh
+
+
+def test_verbatim_window_shrinks_but_keeps_the_latest_turn() -> None:
+    api, stats, _ = context_window.build_context(_history(5, draft_chars=4000), budget=1200, keep_turns=4)
+    assert stats.verbatim_turns == 1
+    assert api[-2]["content"].startswith("Turn 4")
+
+
+@pytest.mark.parametrize("name", ["DND_CONTEXT_TOKEN_BUDGET", "SRD_GROUNDING_DEADLINE_S"])
+def test_app_warns_and_uses_the_default_on_a_bad_setting(monkeypatch: pytest.MonkeyPatch, name: str) -> None:
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    monkeypatch.setenv(name, "8k")
+    at = AppTest.from_string("import app; app.main()", default_timeout=30)
+    at.secrets["OPENAI_API_KEY"] = "sk-fake"
+    at.run()
+
+    assert not at.exception
+    assert any(name in w.value for w in at.warning)
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+import fake_openai
+import turn_harness
+
+pytestmark = pytest.mark.unit
+
+
+class _VirtualTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def clock(self) -> float:
+        return self.now
+
+
+def test_stream_has_the_openai_chunk_shape_and_pacing() -> None:
+    vt = _VirtualTime()
+    timing = fake_openai.StreamTiming(ttft_s=0.5, inter_chunk_s=0.01, chunk_chars=3)
+    client = fake_openai.FakeOpenAI(["abcdefgh", "second"], timing=timing, sleep=vt.sleep, clock=vt.clock)
+
+    stream = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}], stream=True)
+    deltas = [c.choices[0].delta.content for c in stream]
+    assert deltas == [None, "abc", "def", "gh", None]
+    call = client.calls[0]
+    assert call.first_chunk - call.started == pytest.approx(0.5)
+    assert call.finished - call.started == pytest.approx(0.52)
+
+    reply = client.chat.completions.create(model="m", messages=[], stream=False)
+    assert reply.choices[0].message.content == "second"
+    assert client.chat.completions.create(model="m", messages=[], stream=False).choices[0].message.content == "second"
+
+
+def test_recordings_round_trip_with_their_timing(tmp_path: Path) -> None:
+    vt = _VirtualTime()
+    live = fake_openai.FakeOpenAI("hello world", timing=fake_openai.StreamTiming(ttft_s=0.2, inter_chunk_s=0.1, chunk_chars=6), sleep=vt.sleep, clock=vt.clock)
+    path = tmp_path / "stream.jsonl"
+    text = fake_openai.record_stream(live.chat.completions.create(model="m", messages=[], stream=True), path, clock=vt.clock)
+    assert text == "hello world"
+
+    recording = fake_openai.load_recording(path)
+    assert [c.content for c in recording] == ["hello ", "world"]
+    assert [c.t for c in recording] == pytest.approx([0.2, 0.3])
+
+    replay = fake_openai.FakeOpenAI([recording], timing=fake_openai.StreamTiming(ttft_s=5.0), sleep=vt.sleep, clock=vt.clock)
+    assert "".join(c.choices[0].delta.content or "" for c in replay.chat.completions.create(model="m", messages=[], stream=True)) == text
+    assert replay.calls[0].finished - replay.calls[0].started == pytest.approx(0.3)
+
+
+def test_harness_runs_whole_turns_through_the_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    timing = fake_openai.StreamTiming(ttft_s=0.0, inter_chunk_s=0.0, chunk_chars=50)
+    client = fake_openai.FakeOpenAI(timing=timing)
+
+    metrics = turn_harness.run_turns(["a grim dwarf fighter", "make it grimmer"], client, trace_memory=False)
+
+    assert len(metrics) == 2
+    assert [m.prompt for m in metrics] == ["a grim dwarf fighter", "make it grimmer"]
+    assert all(m.frames >= 1 and m.reruns == 1 for m in metrics)
+    assert all(0 <= m.time_to_first_render_s <= m.total_render_s <= m.wall_s for m in metrics)
+    # The second request carries the first turn's draft as history.
+    assert any("the sergeant has a new name" in m["content"] for m in client.calls[1].messages)
@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+import app
+import srd_client
+
+pytestmark = pytest.mark.unit
+
+FIGHTER = {
+    "name": "Fighter",
+    "hit_die": 10,
+    # Out of order on purpose: output keeps payload order, filtered by level.
+    "features_by_level": [
+        {"level": 3, "features": [{"name": "Martial Archetype"}]},
+        {"level": 1, "features": [{"name": "Second Wind"}, {"name": " "}]},
+        {"level": 2, "features": [{"name": "Action Surge"}]},
+    ]
+    + [{"level": 4, "features": [{"name": f"Extra {i}"}]} for i in range(25)],
+}
+
+
+def _features(block: str) -> list:
+    return [ln[4:] for ln in block.splitlines() if ln.startswith("  - ")]
+
+
+def test_per_level_tables_match_the_filtering_rule() -> None:
+    assert _features(app.build_grounded_srd_block(FIGHTER, 2)) == ["Level 1: Second Wind", "Level 2: Action Surge"]
+    assert _features(app.build_grounded_srd_block(FIGHTER, 3))[0] == "Level 3: Martial Archetype"
+    assert len(_features(app.build_grounded_srd_block(FIGHTER, 20))) == 20  # capped
+    assert "Features: (not available" in app.build_grounded_srd_block(FIGHTER, 0)
+    assert len(_features(app.build_grounded_srd_block(FIGHTER, 99))) == 20  # outside the table, same rule
+
+
+def test_blocks_are_memoized_by_payload_content() -> None:
+    first = app.build_grounded_srd_block(FIGHTER, 5)
+    assert app.build_grounded_srd_block(FIGHTER, 5) is first
+    assert app.build_grounded_srd_block(copy.deepcopy(FIGHTER), 5) is first  # equal content, new object
+
+    changed = copy.deepcopy(FIGHTER)
+    changed["hit_die"] = 12
+    assert "- Hit Die: d12" in app.build_grounded_srd_block(changed, 5)
+
+
+def test_payloads_edited_in_place_are_not_served_stale_blocks() -> None:
+    payload = copy.deepcopy(FIGHTER)
+    assert "- Hit Die: d10" in app.build_grounded_srd_block(payload, 5)
+    payload["hit_die"] = 12
+    payload["features_by_level"][1]["features"].append({"name": "Fighting Style"})
+    block = app.build_grounded_srd_block(payload, 5)
+    assert "- Hit Die: d12" in block and "Level 1: Fighting Style" in _features(block)
+
+
+def test_srd_payloads_are_not_rehashed_and_concept_blocks_are_memoized(monkeypatch: pytest.MonkeyPatch) -> None:
+    payload = srd_client.SrdPayload(copy.deepcopy(FIGHTER))
+    first = app.build_grounded_srd_block(payload, 5, concept="A  grim fighter who guards a bridge")
+
+    def rehash(value):
+        raise AssertionError("payload hashed again")
+
+    monkeypatch.setattr(srd_client, "content_digest", rehash)
+    assert app.build_grounded_srd_block(payload, 5, concept="a grim fighter who guards a bridge ") is first
+    assert app.build_grounded_srd_block(payload, 6, concept="a grim fighter who guards a bridge") is not first
+    with pytest.raises(TypeError):
+        payload["hit_die"] = 12
+
+
+def test_memo_tables_are_bounded() -> None:
+    for i in range(app._GROUNDING_TABLES_MAX + 10):
+        app.build_grounded_srd_block({"name": f"C{i}", "features_by_level": []}, 1)
+    assert len(app._grounding_tables) <= app._GROUNDING_TABLES_MAX
+
+
+def test_system_prompt_is_cached_per_constraints() -> None:
+    assert app.build_system_prompt(build_level=5, homebrew=False) is app.build_system_prompt(build_level=5, homebrew=False)
+    assert "Target level: 7" in app.build_system_prompt(build_level=7, homebrew=True)
+    assert app.build_system_prompt.cache_info().maxsize == 64
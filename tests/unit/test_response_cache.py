@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import response_cache
+
+pytestmark = pytest.mark.unit
+
+
+def _key(**overrides) -> str:
+    fields = dict(
+        prompt="Grim dwarf fighter level 5",
+        build_level=5,
+        homebrew=False,
+        class_hint="(auto)",
+        openai_model="gpt-4.1-mini",
+        system_prompt="sys",
+        grounding_block="",
+        history=[{"role": "system", "content": "sys"}],
+    )
+    fields.update(overrides)
+    return response_cache.make_key(**fields)
+
+
+def test_key_normalizes_prompt_but_not_inputs() -> None:
+    assert _key() == _key(prompt="  grim   DWARF fighter level 5!! ")
+    assert _key() != _key(build_level=6)
+    assert _key() != _key(homebrew=True)
+    assert _key() != _key(class_hint="Fighter")
+    assert _key() != _key(openai_model="gpt-4.1")
+    assert _key() != _key(grounding_block="Grounded SRD Facts")
+    assert _key() != _key(history=[{"role": "user", "content": "a wizard"}, {"role": "assistant", "content": "draft"}])
+
+
+def test_hit_miss_ttl_and_persistence(tmp_path: Path) -> None:
+    now = [1000.0]
+    cache = response_cache.ResponseCache(tmp_path, ttl_s=60, clock=lambda: now[0])
+    assert cache.get("k") is None
+    cache.put("k", "## Draft")
+    assert cache.get("k") == "## Draft"
+
+    reopened = response_cache.ResponseCache(tmp_path, ttl_s=60, clock=lambda: now[0])
+    assert reopened.get("k") == "## Draft"
+
+    now[0] += 61
+    assert reopened.get("k") is None
+    assert not (tmp_path / "k.json").exists()
+    assert reopened.stats()["expired"] == 1
+
+
+def test_lru_eviction_by_count_and_bytes(tmp_path: Path) -> None:
+    cache = response_cache.ResponseCache(tmp_path, max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # b is now least recently used
+    cache.put("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "c.json"]
+
+    small = response_cache.ResponseCache(tmp_path / "small", max_bytes=200)
+    small.put("x", "x" * 100)
+    small.put("y", "y" * 100)
+    assert small.get("x") is None and small.get("y") == "y" * 100
+    assert small.stats()["bytes"] <= 200
+
+
+def test_index_restores_lru_order_from_mtimes(tmp_path: Path) -> None:
+    cache = response_cache.ResponseCache(tmp_path)
+    cache.put("old", "1")
+    cache.put("new", "2")
+    os.utime(tmp_path / "old.json", ns=(1, 1))
+    reopened = response_cache.ResponseCache(tmp_path, max_entries=1)
+    assert reopened.get("old") is None and reopened.get("new") == "2"
+
+
+@pytest.mark.parametrize("use_cache, stored", [(False, 0), (True, 1)], ids=["bypassed", "cached"])
+def test_app_stores_drafts_only_when_the_cache_is_used(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, use_cache: bool, stored: int
+) -> None:
+    import app
+    import fake_openai
+    import turn_harness
+
+    cache_dir = tmp_path / "drafts"
+    monkeypatch.setenv("DND_RESPONSE_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    app.get_response_cache.clear()
+    client = fake_openai.FakeOpenAI(timing=fake_openai.StreamTiming(ttft_s=0.0, inter_chunk_s=0.0, chunk_chars=50))
+    turn_harness.run_turns(["a grim dwarf fighter"], client, use_response_cache=use_cache, trace_memory=False)
+
+    assert response_cache.ResponseCache(cache_dir).stats()["size"] == stored
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+def _save(store: Path, sid: str, title: str, updated_at: str) -> None:
+    session_store.save_session({"session_id": sid, "title": title, "messages": []}, store_dir=store)
+    # Pin updated_at so ordering is deterministic.
+    path = store / f"{sid}.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["updated_at"] = updated_at
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_catalog_supports_paging_filtering_and_sorting(tmp_path: Path) -> None:
+    for i in range(5):
+        _save(tmp_path, f"s{i}", f"Title {4 - i}", f"2025-01-0{i + 1}T00:00:00")
+    _save(tmp_path, "other", "Grim dwarf", "2025-02-01T00:00:00")
+
+    ids = [s.session_id for s in session_store.list_sessions(tmp_path, limit=3)]
+    assert ids == ["other", "s4", "s3"]
+    ids = [s.session_id for s in session_store.list_sessions(tmp_path, limit=3, offset=3)]
+    assert ids == ["s2", "s1", "s0"]
+    assert session_store.list_sessions(tmp_path, offset=10) == []
+
+    assert [s.session_id for s in session_store.list_sessions(tmp_path, prefix="s", limit=2, descending=False)] == ["s0", "s1"]
+    assert [s.title for s in session_store.list_sessions(tmp_path, title_contains="DWARF")] == ["Grim dwarf"]
+    assert [s.title for s in session_store.list_sessions(tmp_path, sort_by="title", descending=False, limit=2)] == [
+        "Grim dwarf",
+        "Title 0",
+    ]
+    assert session_store.count_sessions(tmp_path) == 6
+    assert session_store.count_sessions(tmp_path, prefix="s") == 5
+
+    with pytest.raises(ValueError):
+        session_store.list_sessions(tmp_path, sort_by="messages")
+
+
+def test_unchanged_session_bodies_are_not_reopened(tmp_path: Path) -> None:
+    session_store.save_session({"session_id": "a", "title": "first", "messages": []}, store_dir=tmp_path)
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["first"]
+
+    # Rewrite the body but keep its mtime: the catalog entry is still trusted.
+    path = tmp_path / "a.json"
+    st = path.stat()
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["title"] = "edited outside"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["first"]
+
+
+def test_catalog_tracks_saves_and_external_changes(tmp_path: Path) -> None:
+    session_store.save_session({"session_id": "a", "title": "one", "messages": []}, store_dir=tmp_path)
+    assert session_store.count_sessions(tmp_path) == 1
+
+    session_store.save_session({"session_id": "b", "title": "two", "messages": []}, store_dir=tmp_path)
+    assert {s.session_id for s in session_store.list_sessions(tmp_path)} == {"a", "b"}
+
+    # Files copied in or deleted by hand are picked up on the next listing.
+    (tmp_path / "c.json").write_text(json.dumps({"session_id": "c", "title": "three"}), encoding="utf-8")
+    (tmp_path / "a.json").unlink()
+    assert {s.session_id for s in session_store.list_sessions(tmp_path)} == {"b", "c"}
+
+
+def test_corrupt_catalog_is_rebuilt(tmp_path: Path) -> None:
+    session_store.save_session({"session_id": "a", "title": "one", "messages": []}, store_dir=tmp_path)
+    assert session_store.rebuild_catalog(tmp_path) == 1
+
+    catalog = tmp_path / "_catalog" / "catalog.json"
+    catalog.write_text("{not json", encoding="utf-8")
+    assert [s.session_id for s in session_store.list_sessions(tmp_path)] == ["a"]
+    assert json.loads(catalog.read_text(encoding="utf-8"))["entries"]["a.json"]["title"] == "one"
+
+
+def test_saves_append_to_the_catalog_log_instead_of_rewriting_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(session_store, "_CATALOG_LOG_MAX_RECORDS", 8)
+    for i in range(5):
+        session_store.save_session({"session_id": f"s{i}", "title": f"t{i}", "messages": []}, store_dir=tmp_path)
+    assert session_store.count_sessions(tmp_path) == 5
+    snapshot = tmp_path / "_catalog" / "catalog.json"
+    log = tmp_path / "_catalog" / "catalog.log"
+    before = snapshot.read_bytes()
+
+    session_store.save_session({"session_id": "s1", "title": "renamed", "messages": []}, store_dir=tmp_path)
+    assert snapshot.read_bytes() == before
+    assert json.loads(log.read_text(encoding="utf-8").splitlines()[-1])["entry"]["title"] == "renamed"
+
+    # A fresh process (no cached catalog) sees catalog.json plus the log, without rescanning.
+    session_store._catalog_cache.clear()
+    assert {s.title for s in session_store.list_sessions(tmp_path)} == {"t0", "renamed", "t2", "t3", "t4"}
+
+    # Once the log is long enough it is folded into catalog.json.
+    for i in range(10):
+        session_store.save_session({"session_id": "s0", "title": f"v{i}", "messages": []}, store_dir=tmp_path)
+    assert len(log.read_text(encoding="utf-8").splitlines()) < 8
+    assert json.loads(snapshot.read_text(encoding="utf-8"))["entries"]["s1.json"]["title"] == "renamed"
+
+
+def test_sessions_edited_in_place_are_picked_up_by_the_periodic_check(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session_store.save_session({"session_id": "a", "title": "first", "messages": []}, store_dir=tmp_path)
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["first"]
+
+    # Editing a file in place changes its mtime but not the store directory's.
+    path = tmp_path / "a.json"
+    dir_mtime_ns = tmp_path.stat().st_mtime_ns
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["title"] = "edited in place"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert tmp_path.stat().st_mtime_ns == dir_mtime_ns
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["first"]  # within the interval
+
+    monkeypatch.setattr(session_store, "CATALOG_VERIFY_INTERVAL_S", 0.0)
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["edited in place"]
+
+
+def test_concurrent_saves_and_listings_share_the_catalog_safely(tmp_path: Path) -> None:
+    session_store.save_session({"session_id": "seed", "title": "seed", "messages": []}, store_dir=tmp_path)
+    session_store.list_sessions(tmp_path, sort_by="title")  # build a shared sorted view
+    errors = []
+
+    def work(n: int) -> None:
+        try:
+            for i in range(20):
+                session_store.save_session({"session_id": f"w{n}-{i}", "title": f"{n}/{i}", "messages": []}, store_dir=tmp_path)
+                session_store.list_sessions(tmp_path, sort_by="title", limit=5)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    titles = [s.title for s in session_store.list_sessions(tmp_path, sort_by="title", descending=False, limit=1000)]
+    assert len(titles) == 81 and titles == sorted(titles)
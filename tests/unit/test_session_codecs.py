@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+def _payload(sid: str = "s1") -> dict:
+    return {
+        "session_id": sid,
+        "title": "Dwarf fighter — Ünïcode",
+        "params": {"class_hint": "fighter"},
+        "messages": [{"role": "user", "content": f"turn {i}"} for i in range(20)],
+        "versions": [],
+    }
+
+
+@pytest.mark.parametrize("codec", ["zlib", "gzip", "bz2", "lzma", "raw"])
+def test_compact_codecs_roundtrip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, codec: str) -> None:
+    monkeypatch.setenv("DND_SESSION_CODEC", codec)
+    session_store.save_session(_payload(), store_dir=tmp_path)
+
+    path = tmp_path / "s1.dnds"
+    assert path.exists() and not (tmp_path / "s1.json").exists()
+    header = path.read_bytes().split(b"\n", 1)[0]
+    assert json.loads(header[len(b"DNDSESSION ") :])["codec"] == codec
+
+    loaded = session_store.load_session("s1", store_dir=tmp_path)
+    assert loaded["schema_version"] == session_store.SCHEMA_VERSION
+    assert loaded["messages"] == _payload()["messages"]
+    assert [s.title for s in session_store.list_sessions(tmp_path)] == ["Dwarf fighter — Ünïcode"]
+
+
+def test_legacy_json_files_still_load_and_list(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    legacy = {"session_id": "old", "title": "Before schema_version", "messages": [], "versions": []}
+    (tmp_path / "old.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+    monkeypatch.setenv("DND_SESSION_CODEC", "zlib")
+
+    assert session_store.load_session("old", store_dir=tmp_path) == legacy
+    assert [s.session_id for s in session_store.list_sessions(tmp_path)] == ["old"]
+
+
+def test_switching_codec_replaces_the_session_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session_store.save_session(_payload(), store_dir=tmp_path)
+    assert (tmp_path / "s1.json").exists()
+    assert session_store.count_sessions(tmp_path) == 1
+
+    monkeypatch.setenv("DND_SESSION_CODEC", "zlib")
+    session_store.save_session(_payload(), store_dir=tmp_path)
+    assert (tmp_path / "s1.dnds").exists() and not (tmp_path / "s1.json").exists()
+    assert session_store.count_sessions(tmp_path) == 1
+
+    monkeypatch.setenv("DND_SESSION_CODEC", "json")
+    session_store.save_session(_payload(), store_dir=tmp_path)
+    assert (tmp_path / "s1.json").exists() and not (tmp_path / "s1.dnds").exists()
+    assert session_store.load_session("s1", store_dir=tmp_path)["title"] == _payload()["title"]
+
+
+def test_newer_schema_and_unknown_codec_are_rejected(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "future.dnds").write_bytes(b'DNDSESSION {"schema_version":99,"codec":"raw"}\n{}')
+    with pytest.raises(ValueError):
+        session_store.load_session("future", store_dir=tmp_path)
+
+    monkeypatch.setenv("DND_SESSION_CODEC", "snappy")
+    with pytest.raises(ValueError):
+        session_store.save_session(_payload(), store_dir=tmp_path)
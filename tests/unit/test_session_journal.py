@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import session_journal
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def journal_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path))
+    monkeypatch.setenv("DND_SESSION_BACKEND", "journal")
+    return tmp_path
+
+
+def _payload(sid: str = "abc") -> dict:
+    return {
+        "session_id": sid,
+        "title": "journal",
+        "params": {"build_level": 5},
+        "messages": [{"role": "system", "content": "sys"}],
+        "versions": [],
+    }
+
+
+def _journal_records(store: Path, sid: str = "abc") -> list:
+    text = (store / f"{sid}.journal").read_text(encoding="utf-8")
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_saves_append_only_new_records(journal_store: Path) -> None:
+    payload = _payload()
+    session_store.save_session(payload)
+    assert not (journal_store / "abc.journal").exists()  # first save writes the snapshot
+
+    payload["messages"].append({"role": "user", "content": "grim dwarf fighter"})
+    payload["messages"].append({"role": "assistant", "content": "draft"})
+    session_store.save_session(payload)
+    ops = [(r["op"], r.get("i")) for r in _journal_records(journal_store)]
+    assert ops == [("meta", None), ("msg", 1), ("msg", 2)]
+
+    payload["messages"][0]["content"] = "sys v2"
+    payload["versions"].append(
+        session_store.create_build_version(messages=payload["messages"], build_level=5, homebrew=False)
+    )
+    session_store.save_session(payload)
+    ops = [(r["op"], r.get("i")) for r in _journal_records(journal_store)][3:]
+    assert ops == [("meta", None), ("msg", 0), ("ver", 0)]
+
+    assert session_store.load_session("abc") == json.loads(json.dumps(payload))
+    assert [s.session_id for s in session_store.list_sessions()] == ["abc"]
+
+
+def test_replay_survives_torn_tail_and_snapshot_crash(journal_store: Path) -> None:
+    payload = _payload()
+    session_store.save_session(payload)
+    payload["messages"].append({"role": "user", "content": "one"})
+    session_store.save_session(payload)
+
+    # Crash mid-append: a partial record at the end of the journal is ignored ...
+    with (journal_store / "abc.journal").open("a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "op": "msg", "i": 2, "m": {"role"')
+    fresh = session_journal.JournalSessionBackend(journal_store)
+    assert len(fresh.load("abc")["messages"]) == 2
+
+    # ... and trimmed before the next append.
+    payload["messages"].append({"role": "assistant", "content": "two"})
+    fresh.save(payload)
+    assert [m["content"] for m in fresh.load("abc")["messages"]] == ["sys", "one", "two"]
+
+    # Crash after the snapshot was replaced but before the journal was emptied: records already
+    # folded into the snapshot are skipped on replay.
+    journal = (journal_store / "abc.journal").read_bytes()
+    fresh.compact("abc")
+    (journal_store / "abc.journal").write_bytes(journal)
+    assert [m["content"] for m in session_journal.JournalSessionBackend(journal_store).load("abc")["messages"]] == [
+        "sys",
+        "one",
+        "two",
+    ]
+
+
+def test_journal_compacts_into_snapshot(journal_store: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(session_journal, "COMPACT_EVERY_RECORDS", 4)
+    payload = _payload()
+    session_store.save_session(payload)
+    for i in range(6):
+        payload["messages"].append({"role": "user", "content": f"turn {i}"})
+        session_store.save_session(payload)
+
+    snapshot = json.loads((journal_store / "abc.json").read_text(encoding="utf-8"))
+    assert snapshot["_journal_seq"] > 0
+    assert len(_journal_records(journal_store)) < 4
+    loaded = session_store.load_session("abc")
+    assert "_journal_seq" not in loaded
+    assert [m["content"] for m in loaded["messages"]][1:] == [f"turn {i}" for i in range(6)]
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+def _payload(n_turns: int) -> dict:
+    messages = [{"role": "system", "content": "sys"}]
+    versions = []
+    for i in range(n_turns):
+        messages.append({"role": "user", "content": f"concept {i}"})
+        messages.append({"role": "assistant", "content": f"draft {i}"})
+        versions.append({"version_id": f"v{i}", "assistant_text": f"draft {i}"})
+    return {"session_id": "big", "title": "Big", "params": {"build_level": 3}, "messages": messages, "versions": versions}
+
+
+@pytest.fixture(params=["json", "journal", "sqlite"])
+def store(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("DND_SESSION_BACKEND", request.param)
+    return tmp_path
+
+
+def test_page_returns_meta_system_and_last_turns(store: Path) -> None:
+    session_store.save_session(_payload(10), store_dir=store)
+
+    page = session_store.load_session_page("big", store_dir=store, turns=3, versions=2)
+    assert page.meta["title"] == "Big" and page.meta["params"] == {"build_level": 3}
+    assert page.system == {"role": "system", "content": "sys"}
+    assert [m["content"] for m in page.messages] == ["concept 7", "draft 7", "concept 8", "draft 8", "concept 9", "draft 9"]
+    assert [v["version_id"] for v in page.versions] == ["v8", "v9"]
+    assert (page.total_messages, page.total_versions) == (21, 10)
+
+
+def test_cursor_pages_back_to_the_full_history(store: Path) -> None:
+    payload = _payload(10)
+    session_store.save_session(payload, store_dir=store)
+
+    page = session_store.load_session_page("big", store_dir=store, turns=4, versions=4)
+    messages, versions = page.messages, page.versions
+    while page.cursor is not None:
+        page = session_store.load_session_page("big", store_dir=store, turns=4, versions=4, cursor=page.cursor)
+        messages = page.messages + messages
+        versions = page.versions + versions
+    assert [page.system] + messages == payload["messages"]
+    assert versions == payload["versions"]
+
+    # turns=None / versions=None fetch everything before the cursor at once.
+    first = session_store.load_session_page("big", store_dir=store, turns=2, versions=1)
+    older = session_store.load_session_page("big", store_dir=store, turns=None, versions=None, cursor=first.cursor)
+    assert [older.system] + older.messages + first.messages == payload["messages"]
+    assert older.cursor is None
+
+
+def test_short_sessions_load_whole(store: Path) -> None:
+    session_store.save_session(_payload(2), store_dir=store)
+    page = session_store.load_session_page("big", store_dir=store)
+    assert len(page.messages) == 4 and page.cursor is None
+    with pytest.raises(FileNotFoundError):
+        session_store.load_session_page("missing", store_dir=store)
+
+
+@pytest.fixture(params=["json", "journal"])
+def file_store(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("DND_SESSION_BACKEND", request.param)
+    return tmp_path
+
+
+def test_file_backends_open_the_first_page_from_the_tail_index(file_store: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    payload = _payload(50)
+    session_store.save_session(payload, store_dir=file_store)
+    backend = session_store.get_backend(file_store)
+    expected = session_store.SessionBackend.load_page(backend, "big", session_store.DEFAULT_PAGE_TURNS, 5, None)
+
+    def full_load(self, session_id):
+        raise AssertionError("first page decoded the whole session")
+
+    monkeypatch.setattr(type(backend), "load", full_load)
+    page = session_store.load_session_page("big", store_dir=file_store, versions=5)
+    assert page == expected
+    assert page.message_offset == 61 and page.cursor is not None
+
+    # Older pages, and pages larger than the index holds, still read the full session.
+    with pytest.raises(AssertionError):
+        session_store.load_session_page("big", store_dir=file_store, cursor=page.cursor)
+    with pytest.raises(AssertionError):
+        session_store.load_session_page("big", store_dir=file_store, turns=session_store.DEFAULT_PAGE_TURNS + 1)
+
+
+def test_a_stale_tail_index_falls_back_to_the_session_file(file_store: Path) -> None:
+    payload = _payload(30)
+    session_store.save_session(payload, store_dir=file_store)
+    # Another writer (or an older version of the app) rewrites the session without the index.
+    payload["messages"].append({"role": "user", "content": "written elsewhere"})
+    session_store._atomic_write_json(file_store / "big.json", {**payload, "versions": []})
+    (file_store / "big.journal").unlink(missing_ok=True)
+
+    page = session_store.load_session_page("big", store_dir=file_store, turns=1, versions=1)
+    assert [m["content"] for m in page.messages] == ["written elsewhere"]
+    assert page.versions == [] and page.total_messages == 62
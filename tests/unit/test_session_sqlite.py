@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import session_store
+
+pytestmark = pytest.mark.unit
+
+
+def _payload(sid: str, n_turns: int = 2) -> dict:
+    messages = [{"role": "system", "content": "sys"}]
+    for i in range(n_turns):
+        messages.append({"role": "user", "content": f"concept {i}"})
+        messages.append({"role": "assistant", "content": f"draft {i}"})
+    return {
+        "session_id": sid,
+        "title": f"Session {sid}",
+        "params": {"build_level": 5, "homebrew": False, "openai_model": "gpt-4.1-mini", "class_hint": "(auto)"},
+        "messages": messages,
+        "versions": [],
+    }
+
+
+@pytest.fixture()
+def sqlite_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path))
+    monkeypatch.setenv("DND_SESSION_BACKEND", "sqlite")
+    return tmp_path
+
+
+def test_sqlite_roundtrip_matches_json_shape(sqlite_store: Path) -> None:
+    payload = _payload("abc")
+    payload["versions"].append(
+        session_store.create_build_version(messages=payload["messages"], build_level=5, homebrew=False, label="v1")
+    )
+    payload["messages"][1]["name"] = "player"  # extra message keys survive
+    payload["app_version"] = "0.1"  # extra top-level keys survive
+    session_store.save_session(payload)
+
+    loaded = session_store.load_session("abc")
+    assert loaded == json.loads(json.dumps(payload))
+    assert (sqlite_store / "sessions.sqlite3").is_file()
+    assert session_store.get_backend().name == "sqlite"
+
+    with pytest.raises(FileNotFoundError):
+        session_store.load_session("missing")
+
+
+def test_sqlite_save_only_writes_changed_rows(sqlite_store: Path) -> None:
+    payload = _payload("abc", n_turns=50)
+    session_store.save_session(payload)
+    backend = session_store.get_backend()
+    conn = backend._connect()
+
+    payload["messages"].append({"role": "user", "content": "one more"})
+    payload["messages"][0]["content"] = "refreshed system prompt"
+    before = conn.total_changes
+    session_store.save_session(payload)
+    # 1 session upsert + 1 new message + 1 rewritten system message.
+    assert conn.total_changes - before == 3
+
+    payload["messages"] = payload["messages"][:3]
+    session_store.save_session(payload)
+    assert len(session_store.load_session("abc")["messages"]) == 3
+
+
+def test_sqlite_list_count_and_append_version(sqlite_store: Path) -> None:
+    for sid in ("a1", "a2", "b1"):
+        session_store.save_session(_payload(sid))
+
+    assert [s.session_id for s in session_store.list_sessions(limit=2, sort_by="session_id", descending=False)] == ["a1", "a2"]
+    assert [s.session_id for s in session_store.list_sessions(prefix="a", offset=1, sort_by="session_id", descending=False)] == ["a2"]
+    assert [s.session_id for s in session_store.list_sessions(title_contains="SESSION B")] == ["b1"]
+    assert session_store.count_sessions(prefix="a") == 2
+
+    version = session_store.create_build_version(messages=_payload("x")["messages"], build_level=3, homebrew=True)
+    session_store.append_build_version("a1", version)
+    assert session_store.load_session("a1")["versions"] == [version]
+    assert session_store.list_sessions(limit=1)[0].session_id == "a1"
+
+
+def test_migrate_json_store_into_sqlite(tmp_path: Path) -> None:
+    src = tmp_path / "json_store"
+    for sid in ("s1", "s2"):
+        session_store.save_session(_payload(sid), store_dir=src)
+    (src / "broken.json").write_text("{", encoding="utf-8")
+    original = session_store.load_session("s1", store_dir=src)
+
+    assert session_store.migrate_json_store(src, tmp_path / "db", kind="sqlite") == 2
+
+    backend = session_store.get_backend(tmp_path / "db", kind="sqlite")
+    assert backend.load("s1") == original
+    assert backend.count("", "") == 2
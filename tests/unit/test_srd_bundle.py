@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import srd_bundle
+import srd_client
+
+pytestmark = pytest.mark.unit
+
+FIGHTER = {"name": "Fighter", "hit_die": 10, "features_by_level": [{"level": 1, "features": [{"name": "Second Wind"}]}]}
+WIZARD = {"name": "Wizard", "hit_die": 6}
+
+
+@pytest.fixture(autouse=True)
+def _no_bundle() -> Iterator[None]:
+    srd_client.use_bundle(None)
+    yield
+    bundle = srd_client.active_bundle()
+    srd_client.use_bundle(None)
+    if bundle is not None:
+        bundle.close()
+
+
+def _offline_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+    return None, f"URL error for {path}: [Errno 111] Connection refused"
+
+
+def test_bundle_roundtrip(tmp_path: Path) -> None:
+    path = srd_bundle.write_bundle(tmp_path / "srd.srdb", {"version": "2024.1"}, {"classes": {"Fighter": FIGHTER, "wizard": WIZARD}})
+
+    bundle = srd_bundle.SrdBundle(path)
+    try:
+        assert bundle.version == "2024.1"
+        assert bundle.names("classes") == ["fighter", "wizard"]
+        assert bundle.get("classes", "FIGHTER") == FIGHTER
+        assert bundle.get("classes", "rogue") is None
+    finally:
+        bundle.close()
+
+
+def test_bundle_version_falls_back_to_meta_hash() -> None:
+    v1 = srd_bundle.bundle_version({"classes": ["fighter"]})
+    assert v1.startswith("sha1:")
+    assert v1 == srd_bundle.bundle_version({"classes": ["fighter"]})
+    assert v1 != srd_bundle.bundle_version({"classes": ["wizard"]})
+
+
+def test_dump_then_serve_get_class_offline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        if path == "/meta":
+            return {"version": "7", "classes": ["fighter", "wizard"]}, None
+        return {"fighter": FIGHTER, "wizard": WIZARD}[path.rsplit("/", 1)[-1]], None
+
+    monkeypatch.setattr(srd_client, "fetch_json", fake_fetch)
+    srd_client.configure_class_cache()
+    out, err = srd_bundle.dump_bundle("http://srd.local", tmp_path / "srd.srdb")
+    assert err is None
+
+    monkeypatch.setattr(srd_client, "fetch_json", _offline_fetch)
+    bundle, status = srd_bundle.activate_bundle("http://srd.local", out)
+    assert bundle is not None
+    assert "offline" in status
+
+    assert srd_client.get_class("", "wizard") == (WIZARD, None)
+    assert srd_client.get_class("http://srd.local", "Fighter") == (FIGHTER, None)
+    payload, err = srd_client.get_class("", "rogue")
+    assert payload is None and "offline SRD bundle" in err
+
+
+def test_stale_bundle_is_not_used_when_service_is_reachable(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = srd_bundle.write_bundle(tmp_path / "srd.srdb", {"version": "1"}, {"classes": {"fighter": FIGHTER}})
+    monkeypatch.setattr(srd_client, "fetch_json", lambda base_url, path, timeout_s=2.5: ({"version": "2"}, None))
+
+    bundle, status = srd_bundle.activate_bundle("http://srd.local", path)
+    assert bundle is None
+    assert "stale" in status
+    assert srd_client.active_bundle() is None
+
+
+def test_missing_or_corrupt_bundle_is_ignored(tmp_path: Path) -> None:
+    assert srd_bundle.activate_bundle("", tmp_path / "missing.srdb")[0] is None
+    bad = tmp_path / "bad.srdb"
+    bad.write_bytes(b"not a bundle at all")
+    bundle, status = srd_bundle.activate_bundle("", bad)
+    assert bundle is None
+    assert "unreadable" in status
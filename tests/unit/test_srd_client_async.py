@@ -0,0 +1,89 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import srd_client
+
+pytestmark = pytest.mark.unit
+
+
+def test_meta_class_names_accepts_names_and_objects() -> None:
+    assert srd_client.meta_class_names({"classes": ["Fighter", "wizard", "fighter"]}) == ["fighter", "wizard"]
+    assert srd_client.meta_class_names({"classes": [{"index": "bard"}, {"name": "Barbarian"}, {}]}) == ["bard", "barbarian"]
+    assert srd_client.meta_class_names({"version": "1"}) == []
+
+
+def test_warm_up_fetches_every_meta_class_with_bounded_concurrency(monkeypatch: pytest.MonkeyPatch) -> None:
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def fake_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        if path == "/meta":
+            return {"classes": ["barbarian", "bard", "fighter", "wizard", "rogue"]}, None
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        if path.endswith("rogue"):
+            return None, "HTTP 404 for /classes/rogue: not found"
+        return {"name": path.rsplit("/", 1)[-1].title()}, None
+
+    monkeypatch.setattr(srd_client, "fetch_json", fake_fetch)
+    srd_client.configure_class_cache()
+
+    report = srd_client.warm_up("http://srd.local", concurrency=2)
+
+    assert report["classes"] == ["barbarian", "bard", "fighter", "wizard", "rogue"]
+    assert report["loaded"] == 4
+    assert set(report["errors"]) == {"rogue"}
+    assert peak[0] == 2
+
+    # Warm entries are now served from the shared cache.
+    assert srd_client.get_class("http://srd.local", "Wizard") == ({"name": "Wizard"}, None)
+    assert srd_client.class_cache_stats()["hits"] == 1
+
+
+def test_get_many_runs_classes_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        time.sleep(0.1)
+        return {"path": path}, None
+
+    monkeypatch.setattr(srd_client, "fetch_json", fake_fetch)
+    srd_client.configure_class_cache()
+
+    t0 = time.perf_counter()
+    results = asyncio.run(srd_client.AsyncSrdClient("http://srd.local").get_many(["fighter", "wizard", "fighter"]))
+    elapsed = time.perf_counter() - t0
+
+    assert list(results) == ["fighter", "wizard"]
+    assert results["wizard"] == ({"path": "/classes/wizard"}, None)
+    assert elapsed < 0.19
+
+
+def test_prefetch_past_deadline_still_fills_the_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        calls.append(path)
+        release.wait(2)
+        return {"name": "Fighter"}, None
+
+    monkeypatch.setattr(srd_client, "fetch_json", slow_fetch)
+    srd_client.configure_class_cache()
+
+    future = srd_client.prefetch_many("http://srd.local", ["fighter"])
+    with pytest.raises(concurrent.futures.TimeoutError):
+        future.result(timeout=0.05)  # the turn gives up and answers ungrounded
+
+    release.set()
+    assert future.result(timeout=2) == {"fighter": ({"name": "Fighter"}, None)}
+    # Next turn: served from the cache, no second fetch.
+    assert srd_client.get_class("http://srd.local", "fighter") == ({"name": "Fighter"}, None)
+    assert calls == ["/classes/fighter"]
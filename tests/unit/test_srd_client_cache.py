@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+import srd_client
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_class_serves_warm_turns_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        calls.append(path)
+        return {"name": "Fighter"}, None
+
+    monkeypatch.setattr(srd_client, "fetch_json", fake_fetch)
+    srd_client.configure_class_cache()
+
+    for _ in range(3):
+        payload, err = srd_client.get_class("http://srd.local/", "Fighter")
+        assert err is None
+        assert payload == {"name": "Fighter"}
+
+    assert calls == ["/classes/Fighter"]
+    stats = srd_client.class_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_errors_are_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_fetch(base_url, path, timeout_s=srd_client.DEFAULT_TIMEOUT_S):
+        calls.append(path)
+        return None, "URL error for /classes/bard: refused"
+
+    monkeypatch.setattr(srd_client, "fetch_json", fake_fetch)
+    srd_client.configure_class_cache()
+
+    assert srd_client.get_class("http://srd.local", "bard")[1]
+    assert srd_client.get_class("http://srd.local", "bard")[1]
+    assert len(calls) == 2
+
+
+def test_lru_eviction_and_ttl_expiry() -> None:
+    clock = FakeClock()
+    cache = srd_client.TTLCache(max_entries=2, ttl_s=10, stale_s=0, clock=clock)
+
+    for key in ("a", "b", "c"):
+        cache.get_or_load(key, lambda key=key: (key.upper(), None))
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+    clock.now = 11
+    loads = []
+    value, err = cache.get_or_load("c", lambda: (loads.append(1) or "C2", None))
+    assert (value, err) == ("C2", None)
+    assert loads == [1]
+
+
+def test_stale_entry_is_served_while_refreshing_in_background() -> None:
+    clock = FakeClock()
+    cache = srd_client.TTLCache(max_entries=4, ttl_s=10, stale_s=100, clock=clock)
+    cache.get_or_load("k", lambda: ("v1", None))
+
+    clock.now = 20
+    refreshed = threading.Event()
+
+    def reload():
+        refreshed.set()
+        return "v2", None
+
+    assert cache.get_or_load("k", reload) == ("v1", None)
+    assert refreshed.wait(2)
+    for _ in range(100):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert cache.get_or_load("k", lambda: ("unused", None)) == ("v2", None)
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_concurrent_misses_share_one_fetch() -> None:
+    cache = srd_client.TTLCache()
+    gate = threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        gate.wait(2)
+        return {"name": "Wizard"}, None
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("wizard", slow_load))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for _ in range(200):
+        if cache.stats()["coalesced"] == 7:
+            break
+        time.sleep(0.005)
+    gate.set()
+    for t in threads:
+        t.join(2)
+
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(r == ({"name": "Wizard"}, None) for r in results)
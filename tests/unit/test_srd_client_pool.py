@@ -0,0 +1,112 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+import srd_client
+
+pytestmark = pytest.mark.unit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        self.server.connections.add(self.client_address)  # type: ignore[attr-defined]
+        if self.path == "/classes/fighter":
+            body, status = json.dumps({"name": "Fighter"}).encode(), 200
+        elif self.path in ("/close", "/close-silently"):
+            body, status = b"{}", 200
+            self.close_connection = True
+        else:
+            body, status = b"not found", 404
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/close":
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def server() -> Iterator[ThreadingHTTPServer]:
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.connections = set()  # type: ignore[attr-defined]
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    srd_client.configure_pool()
+    yield srv
+    srd_client.configure_pool()
+    srv.shutdown()
+    srv.server_close()
+
+
+def _base(srv: ThreadingHTTPServer) -> str:
+    host, port = srv.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def test_fetch_json_reuses_keep_alive_connection(server: ThreadingHTTPServer) -> None:
+    for _ in range(5):
+        data, err = srd_client.fetch_json(_base(server), "/classes/fighter")
+        assert err is None
+        assert data == {"name": "Fighter"}
+
+    stats = srd_client.pool_stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 4
+    assert len(server.connections) == 1  # type: ignore[attr-defined]
+
+
+def test_fetch_json_reports_http_errors(server: ThreadingHTTPServer) -> None:
+    data, err = srd_client.fetch_json(_base(server), "classes/nope")
+    assert data is None
+    assert err == "HTTP 404 for /classes/nope: not found"
+    # Error responses still leave a reusable connection behind.
+    assert srd_client.pool_stats()["idle"] == 1
+
+
+def test_connection_closed_by_server_is_not_reused(server: ThreadingHTTPServer) -> None:
+    assert srd_client.fetch_json(_base(server), "/close")[1] is None
+    assert srd_client.pool_stats()["idle"] == 0
+    assert srd_client.fetch_json(_base(server), "/classes/fighter")[1] is None
+    assert srd_client.pool_stats()["created"] == 2
+
+
+def test_stale_pooled_connection_is_retried_once(server: ThreadingHTTPServer) -> None:
+    # The server drops the socket without announcing it, so the pool only finds out on reuse.
+    assert srd_client.fetch_json(_base(server), "/close-silently")[1] is None
+    assert srd_client.pool_stats()["idle"] == 1
+    data, err = srd_client.fetch_json(_base(server), "/classes/fighter")
+    assert err is None
+    assert data == {"name": "Fighter"}
+    assert srd_client.pool_stats()["created"] == 2
+
+
+def test_idle_connections_are_evicted(server: ThreadingHTTPServer) -> None:
+    now = [0.0]
+    pool = srd_client.ConnectionPool(max_idle_per_host=1, idle_timeout_s=5, clock=lambda: now[0])
+    url = f"{_base(server)}/classes/fighter"
+    headers = {"Accept": "application/json"}
+
+    assert pool.request(url, headers)[0] == 200
+    assert pool.stats()["idle"] == 1
+    now[0] = 10.0
+    assert pool.request(url, headers)[0] == 200
+    stats = pool.stats()
+    assert stats["idle_evicted"] == 1
+    assert stats["created"] == 2
+    pool.close()
+
+
+def test_fetch_json_reports_connection_errors() -> None:
+    data, err = srd_client.fetch_json("http://127.0.0.1:9", "/meta", timeout_s=0.5)
+    assert data is None
+    assert err and err.startswith("URL error for /meta:")
@@ -0,0 +1,121 @@
+import time
+from typing import Iterator
+
+import pytest
+
+import app
+import srd_client
+import srd_stub
+
+pytestmark = pytest.mark.unit
+
+_DEAD = "http://127.0.0.1:9"
+
+
+@pytest.fixture(autouse=True)
+def fast_policy() -> Iterator[None]:
+    srd_client.configure_pool()
+    srd_client.configure_retries(retries=2, backoff_s=0.001, max_backoff_s=0.002)
+    srd_client.configure_breaker(threshold=3, cooldown_s=30.0)
+    yield
+    srd_client.configure_pool()
+    srd_client.configure_retries()
+    srd_client.configure_breaker()
+
+
+class _FlakyStub(srd_stub.StubServer):
+    """Answers the first `failures` requests with 503, then serves normally."""
+
+    failures = 2
+
+    def resolve(self, path):  # type: ignore[no-untyped-def]
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                return 503, {"error": "warming up"}
+        return super().resolve(path)
+
+
+def test_transient_errors_are_retried() -> None:
+    with srd_stub.StubServer(seed=1) as stub:
+        stub.faults = srd_stub.Faults(error_rate=1.0)
+        data, err = srd_client.fetch_json(stub.base_url, "/classes/fighter")
+        assert data is None and err.startswith("HTTP 503")
+        assert stub.stats["errors"] == 3  # first try + 2 retries
+
+        stub.faults = srd_stub.Faults()
+        data, err = srd_client.fetch_json(stub.base_url, "/classes/rogue")
+        assert err.startswith("HTTP 404")
+        assert stub.stats["requests"] == 4  # client errors are final
+
+
+def test_retry_recovers_and_keeps_the_breaker_closed() -> None:
+    with _FlakyStub(seed=1) as stub:
+        data, err = srd_client.fetch_json(stub.base_url, "/classes/bard")
+        assert err is None and data["name"] == "Bard"
+        assert srd_client.breaker_stats(stub.base_url)["consecutive_failures"] == 0
+
+
+def test_breaker_opens_after_repeated_failures_and_fails_fast() -> None:
+    for _ in range(3):
+        assert srd_client.fetch_json(_DEAD, "/meta")[1].startswith("URL error")
+    assert srd_client.breaker_state(_DEAD) == "open"
+
+    started = time.perf_counter()
+    data, err = srd_client.fetch_json(_DEAD, "/classes/fighter")
+    assert time.perf_counter() - started < 0.01
+    assert data is None and "circuit open" in err
+    assert srd_client.breaker_stats(_DEAD)["rejected"] == 1
+
+
+def test_breaker_half_open_probe_closes_or_reopens() -> None:
+    now = [0.0]
+    breaker = srd_client.CircuitBreaker(threshold=2, cooldown_s=10.0, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state() == "closed"
+    breaker.record_failure()
+    assert breaker.state() == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.state() == "half_open"
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # everyone else keeps failing fast meanwhile
+    breaker.record_failure()
+    assert breaker.state() == "open" and breaker.retry_in() == 10.0
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state() == "closed" and breaker.allow()
+
+
+def test_connect_timeout_does_not_bound_reads() -> None:
+    srd_client.configure_retries(retries=0, connect_timeout_s=0.05)
+    with srd_stub.StubServer(seed=1, faults=srd_stub.Faults(latency=srd_stub.constant(0.2))) as stub:
+        data, err = srd_client.fetch_json(stub.base_url, "/classes/wizard", timeout_s=1.0)
+    assert err is None and data["name"] == "Wizard"
+
+
+def test_turns_send_a_single_probe_while_the_breaker_is_half_open() -> None:
+    classes = ["fighter", "wizard", "bard"]
+    assert app.grounding_plan(_DEAD, classes) == (classes, False)
+
+    srd_client.configure_breaker(threshold=1, cooldown_s=30.0)
+    srd_client.fetch_json(_DEAD, "/meta")
+    assert app.grounding_plan(_DEAD, classes) == ([], True)
+
+    srd_client.configure_breaker(threshold=1, cooldown_s=0.0)
+    srd_client.fetch_json(_DEAD, "/meta")
+    assert srd_client.breaker_state(_DEAD) == "half_open"
+    assert app.grounding_plan(_DEAD, classes) == (["fighter"], False)
+
+    # Cached classes cost no fetch, so they are still grounded; only uncached ones wait for the probe.
+    srd_client.configure_class_cache()
+    try:
+        srd_client._class_cache.put((_DEAD, "bard"), {"name": "Bard"})
+        assert srd_client.class_cached(_DEAD, "Bard") and not srd_client.class_cached(_DEAD, "wizard")
+        assert app.grounding_plan(_DEAD, classes) == (["fighter", "bard"], False)
+        srd_client._class_cache.put((_DEAD, "fighter"), {"name": "Fighter"})
+        assert app.grounding_plan(_DEAD, classes) == (classes, False)
+    finally:
+        srd_client.configure_class_cache()
@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+
+import srd_compliance
+
+pytestmark = pytest.mark.unit
+
+TEXT = "Take the Battle Master path from Xanathar's Guide; volodymyr is fine, Volo is not. PHB"
+
+
+def _stream(text: str, size: int, allowlist=frozenset()) -> list:
+    checker = srd_compliance.ComplianceChecker(srd_compliance.get_matcher(allowlist))
+    for i in range(0, len(text), size):
+        checker.feed(text[i : i + size])
+    checker.finish()
+    return [(v.start, v.name) for v in checker.violations]
+
+
+def test_same_violations_for_any_chunking() -> None:
+    expected = _stream(TEXT, len(TEXT))
+    assert [name for _, name in expected] == ["Battle Master", "Xanathar", "Volo", "PHB"]
+    for size in (1, 2, 3, 7, 16):
+        assert _stream(TEXT, size) == expected
+
+
+def test_word_boundaries_across_chunks() -> None:
+    checker = srd_compliance.ComplianceChecker()
+    assert checker.feed("The phb") == []  # could continue as "phbx"
+    assert [v.name for v in checker.feed(" says")] == ["PHB"]
+    assert checker.feed(" the phbx") == []
+    assert checker.finish() == []
+    assert checker.violations[0].start == 4
+
+
+def test_allowlisted_grounded_names_are_exempt() -> None:
+    assert srd_compliance.check_text("Path of Wild Magic") == ["Path of Wild Magic"]
+    assert srd_compliance.check_text("Path of Wild Magic", allowlist=["Path of Wild Magic"]) == []
+    assert srd_compliance.check_text("A grim SRD fighter with Second Wind.") == []
+
+
+def test_mode_from_env(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    monkeypatch.delenv("DND_SRD_COMPLIANCE", raising=False)
+    assert srd_compliance.get_mode() == "flag"
+    monkeypatch.setenv("DND_SRD_COMPLIANCE", "cut")
+    assert srd_compliance.get_mode() == "cut"
+    assert srd_compliance.get_mode(" OFF ") == "off"  # a value passed in (e.g. from st.secrets) wins
+    monkeypatch.setenv("DND_SRD_COMPLIANCE", "block")
+    with caplog.at_level(logging.WARNING, logger="srd_compliance"):
+        assert srd_compliance.get_mode() == "flag"
+    assert "DND_SRD_COMPLIANCE" in caplog.text
+
+
+def test_offsets_point_into_the_original_text_when_casefold_expands() -> None:
+    text = "Straße Straße Straße. Then Tasha's cauldron, or İstanbul's Volo."
+    for size in (1, 3, len(text)):
+        checker = srd_compliance.ComplianceChecker()
+        for i in range(0, len(text), size):
+            checker.feed(text[i : i + size])
+        checker.finish()
+        assert [text[v.start : v.end] for v in checker.violations] == ["Tasha", "Volo"]
@@ -0,0 +1,38 @@
+import pytest
+
+import app
+import srd_relevance
+
+pytestmark = pytest.mark.unit
+
+
+def test_bm25_ranks_matching_documents_first() -> None:
+    docs = ["Second Wind regain hit points", "Action Surge take one additional action", "Archery fighting style ranged attacks"]
+    index = srd_relevance.BM25Index(docs)
+    assert index.rank("an archer who prefers ranged attacks", [0, 1, 2])[0] == 2
+    assert index.rank("nothing relevant", [0, 1, 2]) == [0, 1, 2]  # ties keep order
+    assert index.scores("surge").argmax() == 1
+
+
+def _payload() -> dict:
+    features = [{"level": 1, "features": [{"name": f"Generic Feature {i}"} for i in range(30)]}]
+    features.append({"level": 3, "features": [{"name": "Sneak Strike", "desc": ["Deal extra damage to unaware foes from the shadows."]}]})
+    features.append({"level": 9, "features": [{"name": "Shadow Step"}]})
+    return {"name": "Fighter", "proficiencies": ["Shields", "Simple weapons", "Martial weapons", "Light armor", "Medium armor", "Heavy armor", "Stealth", "Shadow tools"], "features_by_level": features}
+
+
+def test_concept_selects_relevant_facts_within_budget() -> None:
+    payload = _payload()
+    plain = app.build_grounded_srd_block(payload, 5)
+    assert "Sneak Strike" not in plain  # the first-20 cut drops it
+
+    txt = app.build_grounded_srd_block(payload, 5, concept="a fighter who strikes unaware foes from the shadows")
+    assert "  - Level 3: Sneak Strike" in txt
+    assert "Shadow Step" not in txt  # above target level
+    assert "Shadow tools" in txt
+    feature_lines = [ln for ln in txt.splitlines() if ln.startswith("  - ")]
+    assert sum(app.context_window.count_tokens(ln[4:]) + 2 for ln in feature_lines) <= app.GROUNDING_FEATURE_TOKEN_BUDGET
+    # Shown in level order, not score order.
+    assert feature_lines.index("  - Level 3: Sneak Strike") == len(feature_lines) - 1
+
+    assert app.build_grounded_srd_block(payload, 5, concept="   ") == plain
@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import srd_bundle
+import srd_client
+import srd_stub
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def stub() -> Iterator[srd_stub.StubServer]:
+    srd_client.configure_pool()
+    srd_client.configure_class_cache()
+    # These tests count injected faults as the client sees them: no retries, no breaker.
+    srd_client.configure_retries(retries=0)
+    srd_client.configure_breaker(threshold=10**6)
+    with srd_stub.StubServer(seed=1) as server:
+        yield server
+    srd_client.configure_pool()
+    srd_client.configure_class_cache()
+    srd_client.configure_retries()
+    srd_client.configure_breaker()
+
+
+def test_serves_meta_and_fixture_classes(stub: srd_stub.StubServer) -> None:
+    meta, err = srd_client.get_meta(stub.base_url)
+    assert err is None
+    assert srd_client.meta_class_names(meta) == ["barbarian", "bard", "fighter", "wizard"]
+
+    fighter, err = srd_client.get_class(stub.base_url, "Fighter")
+    assert err is None
+    assert fighter["hit_die"] == 10
+    assert {"name": "Second Wind"} in fighter["features_by_level"][0]["features"]
+    assert srd_client.get_class(stub.base_url, "rogue")[1].startswith("HTTP 404")
+
+
+def test_injected_errors_and_malformed_bodies(stub: srd_stub.StubServer) -> None:
+    stub.faults = srd_stub.Faults(error_rate=1.0, error_status=502)
+    assert srd_client.get_class(stub.base_url, "bard", use_cache=False)[1].startswith("HTTP 502")
+
+    stub.faults = srd_stub.Faults(malformed_rate=1.0)
+    assert srd_client.get_class(stub.base_url, "bard", use_cache=False)[1].startswith("Invalid JSON")
+
+    stub.faults = srd_stub.Faults(reset_rate=1.0)
+    assert srd_client.get_class(stub.base_url, "bard", use_cache=False)[1].startswith("URL error")
+    assert stub.stats["errors"] == 1 and stub.stats["malformed"] == 1 and stub.stats["resets"] >= 1
+
+
+def test_latency_and_slow_bodies_hit_the_client_timeout(stub: srd_stub.StubServer) -> None:
+    # The socket timeout bounds each read, so a body dripped in 0.1 s pieces outlasts 0.05 s.
+    stub.faults = srd_stub.Faults(slow_body_rate=1.0, slow_body_s=0.8)
+    data, err = srd_client.fetch_json(stub.base_url, "/classes/wizard", timeout_s=0.05)
+    assert data is None
+    assert "timed out" in err
+
+    stub.faults = srd_stub.Faults(latency=srd_stub.constant(0.02))
+    report = srd_stub.run_load(stub.base_url, ["fighter"], requests=10, concurrency=2, use_cache=False)
+    assert report.errors == 0
+    assert report.p50_s >= 0.02
+
+
+def test_run_load_reports_percentiles_and_errors(stub: srd_stub.StubServer) -> None:
+    stub.faults = srd_stub.Faults(error_rate=0.2)
+    report = srd_stub.run_load(stub.base_url, ["fighter", "wizard"], requests=200, concurrency=8, use_cache=False)
+    assert report.requests == 200
+    assert 10 < report.errors < 80
+    assert set(report.error_messages) == {"HTTP 503"}
+    assert report.p50_s <= report.p95_s <= report.p99_s
+    assert report.throughput_rps > 0
+
+    stub.faults = srd_stub.Faults()
+    cached = srd_stub.run_load(stub.base_url, ["fighter", "wizard"], requests=200, concurrency=8)
+    assert cached.errors == 0
+    assert srd_client.class_cache_stats()["misses"] == 2
+
+
+def test_serves_an_offline_bundle(tmp_path: Path) -> None:
+    path = srd_bundle.write_bundle(tmp_path / "srd.srdb", {"version": "9", "classes": ["fighter"]}, {"classes": {"fighter": {"name": "Fighter"}}})
+    with srd_stub.StubServer.from_bundle(path) as server:
+        assert srd_client.get_meta(server.base_url)[0]["version"] == "9"
+        assert srd_client.get_class(server.base_url, "fighter", use_cache=False) == ({"name": "Fighter"}, None)
@@ -0,0 +1,91 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import srd_bundle
+import srd_client
+import srd_vocab
+
+pytestmark = pytest.mark.unit
+
+FEATURES = {"Rage": ["barbarian"], "Extra Attack": ["barbarian", "fighter"], "Arcane Recovery": ["wizard"]}
+
+
+def test_automaton_finds_overlapping_patterns() -> None:
+    ac = srd_vocab.Automaton(["he", "she", "his", "hers"])
+    assert sorted(ac.iter_matches("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_mentions_respect_word_boundaries_and_aliases() -> None:
+    vocab = srd_vocab.build_vocabulary(srd_vocab.DEFAULT_CLASSES, FEATURES)
+    found = [(m.kind, m.entity) for m in vocab.mentions("Two BARDS and a barb; not a barbarianbard, no Extra Attacks")]
+    assert found == [("class", "bard"), ("class", "barbarian")]
+
+
+def test_rank_classes_puts_named_classes_first_then_implied() -> None:
+    vocab = srd_vocab.build_vocabulary(srd_vocab.DEFAULT_CLASSES, FEATURES)
+    assert vocab.rank_classes("A wizard-fighter with arcane recovery") == ["wizard", "fighter"]
+    assert vocab.rank_classes("Bard who flies into a rage, then Rage again, with Extra Attack") == ["bard", "barbarian", "fighter"]
+    assert vocab.rank_classes("a gentle cleric") == []
+
+
+def test_vocabulary_is_built_once_per_source(tmp_path: Path) -> None:
+    a = srd_vocab.build_vocabulary(["fighter"], {"Second Wind": ["fighter"]})
+    assert srd_vocab.build_vocabulary(["fighter"], {"Second Wind": ["fighter"]}) is a
+
+    path = srd_bundle.write_bundle(
+        tmp_path / "srd.srdb",
+        {"version": "9", "classes": ["fighter", "rogue"]},
+        {"classes": {"fighter": {"features_by_level": [{"level": 1, "features": [{"name": "Second Wind"}]}]}, "rogue": {}}},
+    )
+    bundle = srd_bundle.SrdBundle(path)
+    srd_client.use_bundle(bundle)
+    try:
+        vocab = srd_vocab.get_vocabulary("")
+        assert vocab.class_names == ["fighter", "rogue"]
+        assert vocab.rank_classes("needs second wind") == ["fighter"]
+        assert srd_vocab.get_vocabulary("") is vocab
+    finally:
+        srd_client.use_bundle(None)
+        bundle.close()
+
+    assert srd_vocab.get_vocabulary("").class_names == list(srd_vocab.DEFAULT_CLASSES)
+
+
+def _wait_for(predicate, timeout_s: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_meta_is_read_in_the_background_and_failures_are_retried_soon(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    calls = []
+
+    def get_meta(base_url):
+        calls.append(base_url)
+        release.wait(5)
+        return ({"classes": ["rogue", "monk"]}, None) if len(calls) > 1 else (None, "SRD service unavailable")
+
+    monkeypatch.setattr(srd_client, "get_meta", get_meta)
+    base = "http://vocab.invalid"
+    srd_vocab._sources.pop(("meta", base), None)
+
+    # The render path never waits for /meta: it gets the shipped classes while the read runs.
+    assert srd_vocab.get_vocabulary(base).class_names == list(srd_vocab.DEFAULT_CLASSES)
+    assert srd_vocab.get_vocabulary(base).class_names == list(srd_vocab.DEFAULT_CLASSES)
+    release.set()
+    _wait_for(lambda: ("meta", base) not in srd_vocab._refreshing)
+    assert calls == [base]
+
+    # The failure fallback is kept only briefly; the next read after it expires succeeds.
+    fallback, expires_at = srd_vocab._sources[("meta", base)]
+    assert expires_at - time.monotonic() <= srd_vocab.FALLBACK_TTL_S
+    srd_vocab._sources[("meta", base)] = (fallback, 0.0)
+    assert srd_vocab.get_vocabulary(base) is fallback
+    _wait_for(lambda: srd_vocab.get_vocabulary(base).class_names == ["rogue", "monk"])
+    assert len(calls) == 2
+    assert srd_vocab.get_vocabulary(base, wait=True).class_names == ["rogue", "monk"]
@@ -0,0 +1,51 @@
+import pytest
+
+import stream_render
+
+pytestmark = pytest.mark.unit
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_flushes_on_size_or_time_and_once_at_the_end() -> None:
+    frames = []
+    clock = _Clock()
+    r = stream_render.StreamRenderer(frames.append, interval_s=0.05, min_chars=10, clock=clock)
+
+    for _ in range(4):
+        r.feed("abc")  # 12 chars, no time passes: one size-triggered frame
+    assert frames == ["abcabcabcabc"]
+
+    r.feed("d")
+    clock.now = 0.06
+    r.feed("e")  # interval elapsed
+    assert frames[-1] == "abcabcabcabcde"
+
+    r.feed("f")
+    assert r.flush() == "abcabcabcabcdef"
+    assert frames[-1] == "abcabcabcabcdef"
+    assert r.flush() == "abcabcabcabcdef"  # nothing new: no extra frame
+    assert r.stats() == {"frames": 3, "chars": 15, "bytes_rendered": 12 + 14 + 15}
+
+
+def test_empty_stream_renders_nothing() -> None:
+    frames = []
+    r = stream_render.StreamRenderer(frames.append)
+    r.feed("")
+    assert r.flush() == "" and frames == []
+
+
+def test_truncate_rerenders_the_kept_prefix() -> None:
+    frames = []
+    r = stream_render.StreamRenderer(frames.append, min_chars=1)
+    r.feed("keep this, drop that")
+    assert r.truncate(9) == "keep this"
+    assert frames[-1] == "keep this"
+    r.feed(" + note")
+    assert r.flush() == "keep this + note"
@@ -0,0 +1,95 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+import fake_openai
+import srd_client
+import srd_stub
+import turn_harness
+import turn_metrics
+
+pytestmark = pytest.mark.unit
+
+
+def test_disabled_by_default_and_calls_are_no_ops(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    monkeypatch.delenv("DND_METRICS", raising=False)
+    assert turn_metrics.begin("turn") is None
+    with turn_metrics.span("anything"):
+        turn_metrics.count("hits")
+    assert turn_metrics.current() is None
+    assert turn_metrics.finish(None) is None
+
+    monkeypatch.setenv("DND_METRICS", "loud")
+    with caplog.at_level(logging.WARNING, logger="turn_metrics"):
+        assert turn_metrics.get_mode() == "off"
+    assert "DND_METRICS" in caplog.text
+
+
+def test_turn_records_spans_counts_and_background_fetches(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("DND_METRICS", "file")
+    sink = turn_metrics.JsonlSink(tmp_path / "turns.jsonl")
+    srd_client.configure_class_cache()
+    with srd_stub.StubServer() as server:
+        rec = turn_metrics.begin("turn", session_id="abc")
+        with turn_metrics.span("prompt_assembly"):
+            turn_metrics.set_field("prompt_tokens", 42)
+        # Fetched on the prefetch pool: the spans still land in this turn.
+        srd_client.prefetch_many(server.base_url, ["fighter", "wizard"]).result(timeout=5)
+        srd_client.get_class(server.base_url, "fighter")
+        record = turn_metrics.finish(rec, sink)
+    srd_client.configure_class_cache()
+
+    assert turn_metrics.current() is None
+    assert record["kind"] == "turn" and record["session_id"] == "abc" and record["prompt_tokens"] == 42
+    names = [s["name"] for s in record["spans"]]
+    assert names[0] == "prompt_assembly"
+    assert sorted(s["path"] for s in record["spans"] if s["name"] == "srd.fetch") == ["/classes/fighter", "/classes/wizard"]
+    assert record["counts"] == {"srd.cache_misses": 2, "srd.cache_hits": 1}
+    assert json.loads((tmp_path / "turns.jsonl").read_text(encoding="utf-8")) == record
+    assert turn_metrics.read_records(tmp_path / "turns.jsonl") == [record]
+
+
+def test_sink_rotates_by_size(tmp_path: Path) -> None:
+    sink = turn_metrics.JsonlSink(tmp_path / "m.jsonl", max_bytes=200, backups=2)
+    for i in range(20):
+        sink.write({"i": i, "pad": "x" * 50})
+    sink.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["m.jsonl", "m.jsonl.1", "m.jsonl.2"]
+    assert turn_metrics.read_records(tmp_path / "m.jsonl")[-1]["i"] == 19
+
+
+def test_bad_sink_settings_and_write_errors_never_break_a_turn(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("DND_METRICS", "file")
+    monkeypatch.setenv("DND_METRICS_MAX_BYTES", "5MB")
+    monkeypatch.setenv("DND_METRICS_BACKUPS", "three")
+    sink = turn_metrics.get_sink(tmp_path / "bad-settings.jsonl")
+    assert sink._handler.maxBytes == turn_metrics.DEFAULT_MAX_BYTES
+    assert sink._handler.backupCount == turn_metrics.DEFAULT_BACKUPS
+
+    class _Broken:
+        def write(self, record):
+            raise TypeError("not JSON serializable")
+
+    rec = turn_metrics.begin("turn")
+    assert turn_metrics.finish(rec, _Broken())["kind"] == "turn"
+    assert turn_metrics.current() is None
+
+
+def test_app_turn_writes_a_metrics_record(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "turns.jsonl"
+    monkeypatch.setenv("DND_METRICS", "panel")
+    monkeypatch.setenv("DND_METRICS_PATH", str(path))
+    monkeypatch.setenv("DND_SESSION_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.delenv("SRD_API_BASE_URL", raising=False)
+    client = fake_openai.FakeOpenAI(timing=fake_openai.StreamTiming(ttft_s=0.01, inter_chunk_s=0.0, chunk_chars=50))
+
+    turn_harness.run_turns(["a grim dwarf fighter"], client, trace_memory=False)
+
+    (record,) = turn_metrics.read_records(path)
+    names = [s["name"] for s in record["spans"]]
+    assert {"prompt_assembly", "model.ttft", "model.stream"} <= set(names)
+    ttft = next(s for s in record["spans"] if s["name"] == "model.ttft")
+    assert ttft["dur_ms"] >= 10
+    assert record["prompt_tokens"] > 0 and record["completion_tokens"] > 0
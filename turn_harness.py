@@ -0,0 +1,221 @@
+"""End-to-end chat-turn latency harness: app.main() under Streamlit's AppTest with FakeOpenAI.
+
+Each turn submits a prompt through the chat input and measures, from the start of that run:
+
+- time to first render: the first frame the assistant placeholder receives
+- total render time: the final frame of the streamed reply
+- wall time of the whole run (incl. the rest of the script), reruns and render frames
+- peak Python memory allocated during the run (tracemalloc; adds some overhead, see --no-memory)
+
+The response cache is bypassed unless asked otherwise, and grounding uses SRD_API_BASE_URL
+as configured (or a local srd_stub server with --srd-stub).
+
+Usage:
+    python turn_harness.py --turns 5 --ttft-ms 400 --chunk-ms 15 --chunk-chars 4
+    python turn_harness.py --recording stream.jsonl --srd-stub
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import fake_openai
+import stream_render
+
+DEFAULT_PROMPTS = (
+    "A grim dwarf fighter who held the northern wall after the garrison fell",
+    "Make the backstory grimmer and mention the sergeant",
+    "Swap the fighting style for something defensive",
+)
+_RUN_TIMEOUT_S = 120.0
+
+
+@dataclass
+class TurnMetrics:
+    """Timings in seconds from the start of the turn's script run."""
+
+    prompt: str
+    time_to_first_render_s: Optional[float]
+    total_render_s: Optional[float]
+    wall_s: float
+    reruns: int
+    frames: int
+    peak_memory_bytes: int
+    model_ttft_s: Optional[float]
+
+
+class _Probe:
+    """State shared between the harness and the script runs it drives (same process)."""
+
+    def __init__(self, client: fake_openai.FakeOpenAI) -> None:
+        self.client = client
+        self.reset()
+
+    def reset(self) -> None:
+        self.reruns = 0
+        self.frames = 0
+        self.first_frame: Optional[float] = None
+        self.last_frame: Optional[float] = None
+
+    def frame(self) -> None:
+        now = time.perf_counter()
+        self.frames += 1
+        if self.first_frame is None:
+            self.first_frame = now
+        self.last_frame = now
+
+    def renderer_class(self) -> type:
+        """StreamRenderer whose frames are timed by this probe."""
+        probe = self
+
+        class TimedRenderer(stream_render.StreamRenderer):
+            def __init__(self, render: Any, *args: Any, **kwargs: Any) -> None:
+                def timed(text: str) -> object:
+                    out = render(text)
+                    probe.frame()
+                    return out
+
+                super().__init__(timed, *args, **kwargs)
+
+        return TimedRenderer
+
+
+def _app_script(probe) -> None:  # runs standalone under AppTest: no annotations from this module
+    """The AppTest script: app.main() with the probe's fake client and frame-timing renderer."""
+    import app
+    import stream_render
+
+    probe.reruns += 1
+    original_client, original_renderer = app.get_openai_client, stream_render.StreamRenderer
+    app.get_openai_client = lambda: probe.client
+    stream_render.StreamRenderer = probe.renderer_class()
+    try:
+        app.main()
+    finally:
+        app.get_openai_client, stream_render.StreamRenderer = original_client, original_renderer
+
+
+def run_turns(
+    prompts: Sequence[str] = DEFAULT_PROMPTS,
+    client: Optional[fake_openai.FakeOpenAI] = None,
+    use_response_cache: bool = False,
+    trace_memory: bool = True,
+    build_level: int = 5,
+) -> List[TurnMetrics]:
+    """Start a build, then run one chat turn per prompt and measure each."""
+    from streamlit.testing.v1 import AppTest
+
+    probe = _Probe(client or fake_openai.FakeOpenAI())
+    at = AppTest.from_function(_app_script, default_timeout=_RUN_TIMEOUT_S, args=(probe,))
+    at.secrets["OPENAI_API_KEY"] = "sk-fake"  # app.main() checks for a key before any turn
+    at.session_state["build_level"] = int(build_level)
+    at.session_state["bypass_response_cache"] = not use_response_cache
+    at.run()
+    _raise_on_exception(at)
+    next(b for b in at.button if b.label == "Start Build").click().run()
+    _raise_on_exception(at)
+
+    metrics = []
+    for prompt in prompts:
+        probe.reset()
+        calls_before = len(probe.client.calls)
+        at.chat_input[0].set_value(prompt)
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            at.run()
+            wall = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        _raise_on_exception(at)
+
+        call = probe.client.calls[-1] if len(probe.client.calls) > calls_before else None
+        model_ttft = call.first_chunk - call.started if call is not None and call.first_chunk is not None else None
+        metrics.append(
+            TurnMetrics(
+                prompt=prompt,
+                time_to_first_render_s=probe.first_frame - started if probe.first_frame is not None else None,
+                total_render_s=probe.last_frame - started if probe.last_frame is not None else None,
+                wall_s=wall,
+                reruns=probe.reruns,
+                frames=probe.frames,
+                peak_memory_bytes=peak,
+                model_ttft_s=model_ttft,
+            )
+        )
+    return metrics
+
+
+def _raise_on_exception(at: Any) -> None:
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
+
+
+def summarize(metrics: Sequence[TurnMetrics]) -> Dict[str, float]:
+    """Medians over turns (ms / MB); turns without a render are skipped for the render columns."""
+    rendered = [m for m in metrics if m.time_to_first_render_s is not None]
+    return {
+        "turns": float(len(metrics)),
+        "first_render_ms": statistics.median(m.time_to_first_render_s * 1e3 for m in rendered) if rendered else 0.0,
+        "total_render_ms": statistics.median(m.total_render_s * 1e3 for m in rendered) if rendered else 0.0,
+        "wall_ms": statistics.median(m.wall_s * 1e3 for m in metrics) if metrics else 0.0,
+        "reruns": statistics.median(m.reruns for m in metrics) if metrics else 0.0,
+        "frames": statistics.median(m.frames for m in metrics) if metrics else 0.0,
+        "peak_mb": max((m.peak_memory_bytes for m in metrics), default=0) / 1e6,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Chat-turn latency under AppTest with a fake OpenAI stream.")
+    parser.add_argument("--turns", type=int, default=len(DEFAULT_PROMPTS))
+    parser.add_argument("--ttft-ms", type=float, default=fake_openai.DEFAULT_TTFT_S * 1e3)
+    parser.add_argument("--chunk-ms", type=float, default=fake_openai.DEFAULT_INTER_CHUNK_S * 1e3)
+    parser.add_argument("--chunk-chars", type=int, default=fake_openai.DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--repeat-draft", type=int, default=1, help="repeat the sample draft N times (longer replies)")
+    parser.add_argument("--recording", default=None, help="replay a JSONL recording instead of the sample draft")
+    parser.add_argument("--srd-stub", action="store_true", help="ground against a local srd_stub server")
+    parser.add_argument("--use-response-cache", action="store_true")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (less overhead)")
+    args = parser.parse_args(argv)
+
+    timing = fake_openai.StreamTiming(
+        ttft_s=args.ttft_ms / 1e3, inter_chunk_s=args.chunk_ms / 1e3, chunk_chars=args.chunk_chars
+    )
+    response: Any = fake_openai.SAMPLE_DRAFT * max(1, args.repeat_draft)
+    if args.recording:
+        response = fake_openai.load_recording(args.recording)
+    client = fake_openai.FakeOpenAI([response], timing=timing)
+    prompts = [DEFAULT_PROMPTS[i % len(DEFAULT_PROMPTS)] for i in range(args.turns)]
+
+    stub = None
+    if args.srd_stub:
+        import srd_stub
+
+        stub = srd_stub.StubServer().start()
+        os.environ["SRD_API_BASE_URL"] = stub.base_url
+    try:
+        metrics = run_turns(prompts, client, use_response_cache=args.use_response_cache, trace_memory=not args.no_memory)
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(f"{'turn':>4} {'first ms':>9} {'render ms':>10} {'wall ms':>9} {'reruns':>6} {'frames':>6} {'peak MB':>8}")
+    for i, m in enumerate(metrics, 1):
+        first = f"{m.time_to_first_render_s * 1e3:9.1f}" if m.time_to_first_render_s is not None else f"{'-':>9}"
+        total = f"{m.total_render_s * 1e3:10.1f}" if m.total_render_s is not None else f"{'-':>10}"
+        print(f"{i:>4} {first} {total} {m.wall_s * 1e3:9.1f} {m.reruns:>6} {m.frames:>6} {m.peak_memory_bytes / 1e6:8.2f}")
+    print("median:", ", ".join(f"{k} {v:.1f}" for k, v in summarize(metrics).items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
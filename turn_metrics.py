@@ -0,0 +1,257 @@
+"""Per-turn timing spans and counters for the chat pipeline, written to a rotating JSONL file.
+
+A chat turn (or a Save) is bracketed by begin()/finish(). In between, span()/add_span() record
+monotonic-clock stages (SRD fetch, prompt assembly, model time-to-first-token, streaming,
+session store I/O) and count()/set_field() record token counts and cache hits. The active turn is
+held in a context variable, so Streamlit sessions running side by side stay apart;
+srd_client's background fetches carry it along (contextvars.copy_context).
+
+Settings:
+- DND_METRICS = "off" (default), "file" (append one JSON line per turn) or "panel" (also
+  show the last turn in a sidebar debug panel); any other value logs a warning and means "off"
+- DND_METRICS_PATH (default .local/metrics/turns.jsonl), rotated at DND_METRICS_MAX_BYTES
+  (default 5 MB) keeping DND_METRICS_BACKUPS old files (default 3); a malformed number logs a
+  warning and the default is used
+
+When off, begin() returns None and every other call is a context-variable lookup that
+finds no turn, so instrumented code pays well under a microsecond per call.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+MODES = ("off", "file", "panel")
+DEFAULT_METRICS_PATH = ".local/metrics/turns.jsonl"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+_log = logging.getLogger(__name__)
+_warned_modes: set = set()
+
+_current: "contextvars.ContextVar[Optional[TurnRecorder]]" = contextvars.ContextVar("dnd_turn_metrics", default=None)
+
+
+def get_mode() -> str:
+    mode = os.getenv("DND_METRICS", "off").strip().lower() or "off"
+    if mode in ("0", "false", "no"):
+        mode = "off"
+    if mode not in MODES:
+        # Metrics are a debugging aid: a typo must not take the page down.
+        if mode not in _warned_modes:
+            _warned_modes.add(mode)
+            _log.warning("Unknown DND_METRICS mode %r (expected one of %s); metrics are off.", mode, MODES)
+        return "off"
+    return mode
+
+
+class TurnRecorder:
+    """Spans and counters for one turn. Thread-safe; spans are relative to the turn start."""
+
+    def __init__(self, kind: str = "turn", clock: Callable[[], float] = time.monotonic, **fields: Any) -> None:
+        self.kind = kind
+        self.fields: Dict[str, Any] = dict(fields)
+        self.spans: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = clock()
+        self.ended: Optional[float] = None
+        self._token: Optional[contextvars.Token] = None
+        self.ts = datetime.now(timezone.utc).isoformat()
+
+    def now(self) -> float:
+        return self._clock()
+
+    def add_span(self, name: str, start: float, end: float, **attrs: Any) -> None:
+        span = {"name": name, "start_ms": round((start - self.started) * 1e3, 3), "dur_ms": round((end - start) * 1e3, 3)}
+        span.update(attrs)
+        with self._lock:
+            if self.ended is None:
+                self.spans.append(span)
+
+    def span(self, name: str, **attrs: Any) -> "_Span":
+        return _Span(self, name, attrs)
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.fields[key] = value
+
+    def to_record(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.ended if self.ended is not None else self._clock()
+            return {
+                "ts": self.ts,
+                "kind": self.kind,
+                **self.fields,
+                "duration_ms": round((end - self.started) * 1e3, 3),
+                "spans": list(self.spans),
+                "counts": dict(self.counts),
+            }
+
+
+class _Span:
+    __slots__ = ("_rec", "_name", "_attrs", "_start")
+
+    def __init__(self, rec: TurnRecorder, name: str, attrs: Dict[str, Any]) -> None:
+        self._rec = rec
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self) -> "_Span":
+        self._start = self._rec.now()
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            self._attrs["error"] = exc_type.__name__
+        self._rec.add_span(self._name, self._start, self._rec.now(), **self._attrs)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class JsonlSink:
+    """Appends one JSON object per line to a size-rotated file (safe across threads)."""
+
+    def __init__(self, path: str | Path, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=int(max_bytes), backupCount=int(backups), encoding="utf-8", delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        self._handler.emit(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+    def close(self) -> None:
+        self._handler.close()
+
+
+_sinks: Dict[Path, JsonlSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def _int_setting(name: str, default: int) -> int:
+    """Integer env setting; a malformed value logs a warning and the default is used."""
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        _log.warning("Ignoring %s=%r: not a whole number. Using the default (%s).", name, raw, default)
+        return default
+
+
+def get_sink(path: Optional[str | Path] = None) -> JsonlSink:
+    """Process-wide sink for path (default DND_METRICS_PATH)."""
+    path = Path(path or os.getenv("DND_METRICS_PATH", DEFAULT_METRICS_PATH)).expanduser()
+    with _sinks_lock:
+        sink = _sinks.get(path)
+        if sink is None:
+            sink = _sinks[path] = JsonlSink(
+                path,
+                max_bytes=_int_setting("DND_METRICS_MAX_BYTES", DEFAULT_MAX_BYTES),
+                backups=_int_setting("DND_METRICS_BACKUPS", DEFAULT_BACKUPS),
+            )
+        return sink
+
+
+def begin(kind: str = "turn", **fields: Any) -> Optional[TurnRecorder]:
+    """Start recording a turn in this context; None (and nothing recorded) when DND_METRICS is off."""
+    if get_mode() == "off":
+        return None
+    rec = TurnRecorder(kind, **fields)
+    rec._token = _current.set(rec)
+    return rec
+
+
+def finish(rec: Optional[TurnRecorder], sink: Optional[JsonlSink] = None) -> Optional[Dict[str, Any]]:
+    """End the turn, write its record to the sink and return it. Late spans are dropped."""
+    if rec is None:
+        return None
+    try:
+        _current.reset(rec._token)
+    except ValueError:  # finished from another context
+        _current.set(None)
+    with rec._lock:
+        rec.ended = rec._clock()
+    record = rec.to_record()
+    try:
+        (sink or get_sink()).write(record)
+    except Exception:  # metrics must never break a turn
+        _log.warning("Could not write the turn metrics record", exc_info=True)
+    return record
+
+
+def current() -> Optional[TurnRecorder]:
+    return _current.get()
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """Context manager timing a stage of the current turn (no-op without one)."""
+    rec = _current.get()
+    if rec is None:
+        return _NO_SPAN
+    return _Span(rec, name, attrs)
+
+
+def add_span(name: str, start: float, end: float, **attrs: Any) -> None:
+    """Record a stage measured with time.monotonic() (no-op without a current turn)."""
+    rec = _current.get()
+    if rec is not None:
+        rec.add_span(name, start, end, **attrs)
+
+
+def count(key: str, n: int = 1) -> None:
+    rec = _current.get()
+    if rec is not None:
+        rec.count(key, n)
+
+
+def set_field(key: str, value: Any) -> None:
+    rec = _current.get()
+    if rec is not None:
+        rec.set(key, value)
+
+
+def read_records(path: Optional[str | Path] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """The last `limit` records of the current metrics file (rotated files are not read)."""
+    path = Path(path or os.getenv("DND_METRICS_PATH", DEFAULT_METRICS_PATH)).expanduser()
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    out = []
+    for line in lines[-limit:]:
+        try:
+            out.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return out